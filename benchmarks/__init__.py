@@ -0,0 +1 @@
+"""Benchmark suite for json2dot."""
@@ -0,0 +1,189 @@
+import io
+import json
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+from json2dot.build import Accumulator, GroupHierarchy, GroupNameMap, NodeNameMap, build_nodemap, build_stat
+from json2dot.command import Debug, Draw
+from json2dot.mathx import Clamp
+from json2dot.reader import open_lines
+from json2dot.scale import ClampSetting, Scaler
+from json2dot.stat import Ranking, Stat
+
+from .generate import generate
+
+T = TypeVar("T")
+
+Result = dict[str, dict[str, dict[str, float]]]
+"""Seconds by edges, variant and phase."""
+
+
+class Timer:
+    """Keep the best time of each phase over repeats."""
+
+    def __init__(self) -> None:
+        self.__best: dict[str, float] = {}
+
+    @property
+    def best(self) -> dict[str, float]:
+        return self.__best
+
+    def __call__(self, phase: str, f: Callable[[], T]) -> T:
+        """Call f and record the time as phase."""
+        start = time.perf_counter()
+        r = f()
+        elapsed = time.perf_counter() - start
+        self.__best[phase] = min(elapsed, self.__best.get(phase, elapsed))
+        return r
+
+
+def new_scaler(ranking: Ranking) -> Scaler:
+    """Return a new Scaler with the default settings of CLI."""
+    return Scaler(
+        ranking=ranking,
+        penwidth=ClampSetting(Clamp.new(1, 5)),
+        arrowsize=ClampSetting(Clamp.new(1, 2)),
+        weight=ClampSetting(Clamp.new(1, 100)),
+        fontsize=ClampSetting(Clamp.new(8, 48)),
+    )
+
+
+def run(source: Path, timer: Timer, group_keys: list[str]) -> None:
+    """Run each phase once on source."""
+    with open(source) as f:
+        nodemap = timer("build_nodemap", lambda: build_nodemap(f))
+    with open(source, "rb") as fb:
+        acc = timer("accumulate", lambda: Accumulator(ignore_selfloop=True).consume(fb))
+    with open_lines(source) as lines:
+        timer("accumulate.mmap", lambda: Accumulator(ignore_selfloop=True).consume(lines))
+    timer("build_stat", lambda: build_stat(nodemap.source, ignore_selfloop=True))
+    ranking = timer("ranking", lambda: Ranking.new(acc.stat))
+    scaler = timer("scale", lambda: new_scaler(ranking))
+    node_name_map = NodeNameMap.from_nodes(acc.nodes, "name")
+
+    groups: GroupHierarchy | None = None
+    grouped_stats: list[Stat] = []
+    grouped_rankings: list[Ranking] = []
+    if group_keys:
+        key = group_keys[0]
+        timer(
+            "group.build_stat",
+            lambda: GroupNameMap.build_stat(nodemap, key=lambda x: x.desc.get(key), ignore_selfloop=True),
+        )
+        groups = GroupHierarchy.from_nodes(acc.nodes, group_keys)
+        grouped_stats = timer("group.collapse_stat", lambda: groups.collapse_stat(acc.stat, True))
+        grouped_rankings = timer("group.ranking", lambda: [Ranking.new(x) for x in grouped_stats])
+
+    draw = Draw(
+        nodes=acc.nodes,
+        scaler=scaler,
+        stat=acc.stat,
+        node_name_map=node_name_map,
+        groups=groups,
+        grouped_stats=grouped_stats,
+        grouped_scalers=[new_scaler(x) for x in grouped_rankings],
+        ignore_selfloop=True,
+    )
+    timer("draw.run", lambda: draw.run().source)
+    timer("draw.write", lambda: draw.write(io.StringIO()))
+    timer(
+        "debug.run",
+        lambda: Debug(
+            nodes=acc.nodes,
+            node_name_map=node_name_map,
+            groups=groups,
+            grouped_rankings=grouped_rankings,
+            ranking=ranking,
+        ).run(),
+    )
+
+
+@contextmanager
+def synthetic(edges: int, seed: int = 0) -> Iterator[Path]:
+    """Yield a temporary jsonl file of a synthetic graph."""
+    with tempfile.TemporaryDirectory() as d:
+        p = Path(d) / "source.jsonl"
+        with open(p, "w") as f:
+            f.writelines(generate(edges, seed=seed))
+        yield p
+
+
+variants: dict[str, list[str]] = {"plain": [], "group": ["group"], "nested": ["group", "subgroup"]}
+"""Group keys by variant."""
+
+
+def bench(sizes: list[int], repeat: int) -> Result:
+    """Return the best times of phases by size and variant."""
+    r: Result = {}
+    for edges in sizes:
+        with synthetic(edges) as source:
+            r[str(edges)] = {}
+            for variant, group_keys in variants.items():
+                timer = Timer()
+                for _ in range(repeat):
+                    run(source, timer, group_keys)
+                r[str(edges)][variant] = timer.best
+                print(f"{edges} {variant} {json.dumps(timer.best)}", file=sys.stderr)
+    return r
+
+
+def compare(baseline: Result, result: Result, tolerance: float, min_delta: float) -> list[str]:
+    """
+    Return regressions of result against baseline.
+
+    A phase regresses if it is slower than baseline by more than tolerance (ratio)
+    and by more than min_delta seconds, the latter to ignore noise of tiny phases.
+    """
+    r = []
+    for edges, by_variant in result.items():
+        for variant, phases in by_variant.items():
+            for phase, t in phases.items():
+                b = baseline.get(edges, {}).get(variant, {}).get(phase)
+                if b is None:
+                    continue
+                if t > b * (1 + tolerance) and t - b > min_delta:
+                    r.append(f"{edges} {variant} {phase}: {b:.4f}s -> {t:.4f}s ({t / b:.2f}x)")
+    return r
+
+
+def main() -> int:
+    """Entry point of benchmarks."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="benchmarks",
+        description="Time phases of json2dot on synthetic power-law graphs, with and without group keys.",
+    )
+    parser.add_argument(
+        "--edges",
+        "-n",
+        action="append",
+        type=int,
+        help="number of edges (rows) of a graph, repeatable. Default: 1000, 10000, 100000",
+    )
+    parser.add_argument("--repeat", "-r", action="store", type=int, default=3, help="keep the best of. Default: 3")
+    parser.add_argument("--baseline", "-b", action="store", type=Path, help="compare with the baseline json")
+    parser.add_argument("--save", action="store", type=Path, help="save the result as a baseline json")
+    parser.add_argument("--tolerance", action="store", type=float, default=0.2, help="Default: 0.2")
+    parser.add_argument("--min_delta", action="store", type=float, default=0.005, help="seconds. Default: 0.005")
+
+    args = parser.parse_args()
+
+    result = bench(args.edges or [1000, 10000, 100000], args.repeat)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(result, f, indent=2, sort_keys=True)
+            f.write("\n")
+    if args.baseline is None:
+        return 0
+
+    with open(args.baseline) as f:
+        baseline: dict[str, Any] = json.load(f)
+    regressions = compare(baseline, result, args.tolerance, args.min_delta)
+    for x in regressions:
+        print(f"regression: {x}", file=sys.stderr)
+    return 1 if regressions else 0
@@ -0,0 +1,34 @@
+import json
+import random
+from itertools import accumulate
+from typing import Iterator
+
+
+def generate(
+    edges: int, nodes: int | None = None, groups: int = 10, alpha: float = 1.2, seed: int = 0
+) -> Iterator[str]:
+    """
+    Generate jsonl lines of a synthetic graph.
+
+    Both ends of an edge are drawn from a Zipf-like distribution over nodes,
+    so the degrees follow a power law, a few hubs and a long tail.
+    nodes defaults to edges / 10.
+    Each node has a name, a group (one of groups) and a subgroup (5 per group) in its description.
+    """
+    n = nodes if nodes is not None else max(10, edges // 10)
+    rand = random.Random(seed)
+    cum_weights = list(accumulate(1 / (i + 1) ** alpha for i in range(n)))
+    ids = list(range(n))
+    rand.shuffle(ids)  # hubs should not be n0, n1, ...
+
+    def node(i: int) -> dict[str, str]:
+        x = ids[i]
+        return {"id": f"n{x}", "name": f"node{x}", "group": f"g{x % groups}", "subgroup": f"s{x % (groups * 5)}"}
+
+    batch = 10000
+    for start in range(0, edges, batch):
+        k = min(batch, edges - start)
+        src = rand.choices(range(n), cum_weights=cum_weights, k=k)
+        dst = rand.choices(range(n), cum_weights=cum_weights, k=k)
+        for s, d in zip(src, dst):
+            yield json.dumps({"src": node(s), "dst": node(d)}) + "\n"
@@ -0,0 +1,89 @@
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+from .prune import Pruning, fold_leaves
+from .stat import Stat
+
+if TYPE_CHECKING:
+    from .cache import RenderCache
+
+
+class RenderTimeout(Exception):
+    pass
+
+
+def size(stat: Stat) -> tuple[int, int]:
+    """Return the number of nodes and edges of stat."""
+    return sum(1 for _ in stat.nodes.indexes()), len(stat.edges)
+
+
+@dataclass
+class Budget:
+    """
+    Limits of the graph to render.
+
+    The graph is coarsened until it has at most max_nodes nodes and max_edges edges:
+    leaves are folded first, then the low ranked nodes are folded into the node other,
+    then the low ranked edges are dropped.
+    If timeout, each engine has timeout seconds to render, the next engine is tried on timeout,
+    and the graph is shrunk by shrink when all engines time out, up to attempts times.
+    If cache, images are rendered through it.
+    """
+
+    max_nodes: int | None = None
+    max_edges: int | None = None
+    timeout: float | None = None
+    engines: list[str] = field(default_factory=lambda: ["dot", "sfdp"])
+    other: str = "other"
+    shrink: float = 0.5
+    attempts: int = 3
+    cache: "RenderCache | None" = None
+
+    def fits(self, stat: Stat) -> bool:
+        """Return True if stat is within the limits."""
+        nodes, edges = size(stat)
+        return (self.max_nodes is None or nodes <= self.max_nodes) and (
+            self.max_edges is None or edges <= self.max_edges
+        )
+
+    def coarsen(self, stat: Stat, ignore_selfloop: bool = False) -> Stat:
+        """Build a new stat within the limits, return stat itself if it fits."""
+        if self.fits(stat):
+            return stat
+        stat = fold_leaves(stat, ignore_selfloop=ignore_selfloop)
+        if self.fits(stat):
+            return stat
+        if self.max_nodes is not None and size(stat)[0] > self.max_nodes:
+            stat = Pruning(top_nodes=max(self.max_nodes - 1, 0), other=self.other).run(stat, ignore_selfloop)
+        if self.max_edges is not None and size(stat)[1] > self.max_edges:
+            stat = Pruning(top_edges=self.max_edges).run(stat, ignore_selfloop)
+        return stat
+
+    def render(self, stat: Stat, draw: Callable[[Stat], str], outs: list[Path], ignore_selfloop: bool = False) -> Stat:
+        """
+        Render the dot source of stat by draw to outs within timeout, return the rendered stat.
+
+        Raise RenderTimeout if all attempts time out.
+        """
+        import subprocess
+
+        from .dot import render_all
+
+        for attempt in range(self.attempts):
+            if attempt > 0:
+                nodes, edges = size(stat)
+                stat = Budget(
+                    max_nodes=int(nodes * self.shrink), max_edges=int(edges * self.shrink), other=self.other
+                ).coarsen(stat, ignore_selfloop)
+                print(f"coarsened to {size(stat)[0]} nodes and {size(stat)[1]} edges", file=sys.stderr)
+            source = draw(stat)
+            for engine in self.engines:
+                try:
+                    render = render_all if self.cache is None else self.cache.render_all
+                    render(source, outs, engine=engine, timeout=self.timeout)
+                    return stat
+                except subprocess.TimeoutExpired:
+                    print(f"render by {engine} timed out after {self.timeout}s", file=sys.stderr)
+        raise RenderTimeout(f"render timed out {self.attempts} times")
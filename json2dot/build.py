@@ -1,7 +1,12 @@
-from typing import Any, Callable, Iterator
+from array import array
+from collections import Counter
+from itertools import chain
+from typing import Any, Callable, Iterable, Iterator, Self, Sequence
 
-from .row import Node, NodeMap, Row
-from .stat import Stat
+from .columnar import Batch
+from .decoder import Decoder, JSONDecoder
+from .row import MergePolicy, Node, NodeMap, Row, parse_weight
+from .stat import Interner, Stat
 
 
 def build_nodemap(source: Iterator[str]) -> NodeMap:
@@ -12,6 +17,125 @@ def build_nodemap(source: Iterator[str]) -> NodeMap:
     return nodes
 
 
+class Accumulator:
+    """
+    Fold rows into NodeMap and Stat one by one.
+
+    Rows are discarded after folding unless keep_source,
+    so memory scales with the size of the graph, not with the number of rows.
+    If ignore_selfloop, edges that have the same head and tail are not added to stat.
+    If weight_key, a row is added to stat the value of weight_key of the row times, see Row.weight,
+    decoder should keep weight_key in Row.attrs.
+    """
+
+    def __init__(
+        self,
+        ignore_selfloop: bool = False,
+        keep_source: bool = False,
+        policy: MergePolicy = MergePolicy.LAST,
+        decoder: Decoder | None = None,
+        weight_key: str | None = None,
+    ) -> None:
+        self.__ignore_selfloop = ignore_selfloop
+        self.__weight_key = weight_key
+        self.__decoder = decoder if decoder is not None else JSONDecoder([weight_key] if weight_key else [])
+        self.__nodes = NodeMap(keep_source=keep_source, policy=policy)
+        self.__stat = Stat.default()
+
+    @property
+    def nodes(self) -> NodeMap:
+        return self.__nodes
+
+    @property
+    def stat(self) -> Stat:
+        return self.__stat
+
+    @property
+    def ignore_selfloop(self) -> bool:
+        return self.__ignore_selfloop
+
+    @property
+    def decoder(self) -> Decoder:
+        return self.__decoder
+
+    @property
+    def weight_key(self) -> str | None:
+        return self.__weight_key
+
+    def add(self, row: Row) -> None:
+        """
+        Fold a row.
+
+        Raise RowException if the weight is invalid, the row is not folded then.
+        """
+        count = row.weight(self.__weight_key)
+        self.__nodes.add(row)
+        if self.__ignore_selfloop and row.src.id == row.dst.id:
+            return
+        if count:
+            self.__stat.add(row.src.id, row.dst.id, count)
+
+    def consume(self, source: Iterable[str | bytes]) -> Self:
+        """Fold rows from text."""
+        loads = self.__decoder.loads
+        for line in source:
+            self.add(loads(line))
+        return self
+
+    def add_batch(self, batch: Batch) -> None:
+        """
+        Fold rows of a batch, rows are not built unless keep_source.
+
+        Edges are counted by distinct (src, dst) pair in the batch first,
+        so node ids are interned and stat is updated once per distinct edge, not once per row.
+        The order of nodes and edges is the same as adding the rows one by one.
+        Raise RowException if a weight is invalid, nothing of the batch is folded then unless keep_source.
+        """
+        if self.__nodes.keep_source:
+            for row in batch.rows():
+                self.add(row)
+            return
+        counts: dict[tuple[str, str], int]
+        weights = batch.attrs.get(self.__weight_key) if self.__weight_key is not None else None
+        if weights is None:
+            counts = Counter(zip(batch.src, batch.dst))
+        else:
+            counts = {}
+            for k, w in zip(zip(batch.src, batch.dst), weights):
+                count = parse_weight(w)
+                if count:  # a pair first seen with weight 0 is not added yet, as when adding rows
+                    counts[k] = counts.get(k, 0) + count
+        if batch.src_desc or batch.dst_desc:
+            add_node = self.__nodes.add_node
+            for node in batch.nodes():
+                add_node(node)
+        else:
+            # nodes without descriptions never change once added, so add only new ids
+            node_map = self.__nodes.map
+            for x in dict.fromkeys(chain.from_iterable(zip(batch.src, batch.dst))):
+                if x not in node_map:
+                    self.__nodes.add_node(Node(id=x))
+
+        intern = self.__stat.interner.intern
+        add_index = self.__stat.add_index
+        for (s, d), c in counts.items():
+            if self.__ignore_selfloop and s == d:
+                continue
+            add_index(intern(s), intern(d), c)
+
+    def consume_batches(self, batches: Iterable[Batch]) -> Self:
+        """Fold rows from batches."""
+        for x in batches:
+            self.add_batch(x)
+        return self
+
+    def merge(self, other: "Accumulator") -> Self:
+        """Fold all rows of other as if they were added after the ones of this."""
+        self.__nodes.merge(other.nodes)
+        self.__stat.merge(other.stat)
+        return self
+
+
 class DescMap:
     """node_id to desc[key] map."""
 
@@ -26,6 +150,14 @@ class DescMap:
             else {}
         )
 
+    @classmethod
+    def from_nodes(cls, nodes: NodeMap, key: str | None = None) -> Self:
+        """Build DescMap from merged node descriptions instead of rows."""
+        d = cls([], key)
+        if key is not None:
+            d.__map.update({k: v.desc[key] for k, v in nodes.map.items() if key in v.desc})
+        return d
+
     @property
     def map(self) -> dict[str, str]:
         """Unwrap DescMap."""
@@ -61,8 +193,31 @@ class GroupNameMap(DescMap):
         """
         return self.map.get(node_id, self.nil_group)
 
+    def node_groups(self, interner: Interner) -> tuple[list[str], Sequence[int]]:
+        """Return group names and the group (index of names) of each node index of interner."""
+        groups = Interner()
+        r = array("q", (groups.intern(self.get(x)) for x in interner.names))
+        return groups.names, r
+
+    def collapse_stat(self, stat: Stat, ignore_selfloop: bool = False) -> Stat:
+        """
+        Build group stat from node stat.
+
+        Visit distinct edges instead of rows, so no extra pass over the input is needed.
+        If ignore_selfloop, ignore edges between nodes of the same group.
+        """
+        names, groups = self.node_groups(stat.interner)
+        return stat.collapse(groups, names, ignore_selfloop=ignore_selfloop)
+
     @classmethod
-    def build_stat(cls, nodes: NodeMap, key: Callable[[Node], str | None], ignore_selfloop: bool = False) -> Stat:
+    def build_stat(
+        cls,
+        nodes: NodeMap,
+        key: Callable[[Node], str | None],
+        ignore_selfloop: bool = False,
+        weight_key: str | None = None,
+    ) -> Stat:
+        """Build group stat from rows, a row is added Row.weight(weight_key) times."""
         rows = nodes.source
         if ignore_selfloop:
             rows = [x for x in rows if x.src.id != x.dst.id]
@@ -78,28 +233,120 @@ class GroupNameMap(DescMap):
                 dv = cls.nil_group
             if ignore_selfloop and sv == dv:
                 continue
-            s.add(sv, dv)
+            s.add(sv, dv, row.weight(weight_key))
         return s
 
 
-def __build_stat(rows: list[Row]) -> Stat:
+class GroupHierarchy:
+    """
+    Nested groups of nodes by group keys, from the outermost.
+
+    The path of a node is its group names up to the first missing key.
+    A group of a level is identified by its path joined by sep, the first level by the group name itself,
+    so groups with the same name under different parents are different groups.
+    With more than one level, sep and backslashes in group names are escaped with a backslash,
+    so a group named a/b and the group b under a are different groups too.
+    A node whose path is shorter than a level stays in its deepest group at that level,
+    or in GroupNameMap.nil_group if it has no group.
+    """
+
+    sep = "/"
+
+    def __init__(self, maps: list[GroupNameMap]) -> None:
+        self.__maps = maps
+
+    @classmethod
+    def from_nodes(cls, nodes: NodeMap, keys: list[str]) -> Self:
+        """Build GroupHierarchy from merged node descriptions."""
+        return cls([GroupNameMap.from_nodes(nodes, k) for k in keys])
+
+    def __len__(self) -> int:
+        """Return the number of levels."""
+        return len(self.__maps)
+
+    @property
+    def maps(self) -> list[GroupNameMap]:
+        """Return node_id to group name maps of levels."""
+        return self.__maps
+
+    def path(self, node_id: str) -> list[str]:
+        """Return group names of node from the outermost."""
+        r = []
+        for m in self.__maps:
+            g = m.map.get(node_id)
+            if g is None:
+                break
+            r.append(g)
+        return r
+
+    @classmethod
+    def escape(cls, name: str) -> str:
+        """Escape sep and backslashes in a group name."""
+        return name.replace("\\", "\\\\").replace(cls.sep, "\\" + cls.sep)
+
+    def key(self, path: list[str], level: int) -> str:
+        """Return the group of path at level."""
+        p = path[: level + 1]
+        if not p:
+            return GroupNameMap.nil_group
+        if len(self.__maps) == 1:  # no paths to tell apart
+            return p[0]
+        return self.sep.join(self.escape(x) for x in p)
+
+    def level_map(self, level: int) -> dict[str, str]:
+        """Return node_id to group map of level, for nodes that have a group at level."""
+        r = {}
+        for node_id in self.__maps[level].map:
+            p = self.path(node_id)
+            if len(p) > level:
+                r[node_id] = self.key(p, level)
+        return r
+
+    def collapse_stat(self, stat: Stat, ignore_selfloop: bool = False) -> list[Stat]:
+        """
+        Build group stats of all levels from node stat, from the outermost.
+
+        The deepest level is collapsed from node stat, then each level is rolled up into its parent level,
+        so the cost scales with distinct edges of the level below, not with rows.
+        If ignore_selfloop, ignore edges between nodes of the same group.
+        """
+        paths = [self.path(x) for x in stat.interner.names]
+        depth = len(self.__maps) - 1
+        groups = Interner()
+        index = [groups.intern(self.key(p, depth)) for p in paths]
+        r = [stat.collapse(index, groups.names, ignore_selfloop=ignore_selfloop)]
+        for level in range(depth, 0, -1):
+            parents = {self.key(p, level): self.key(p, level - 1) for p in paths}
+            groups = Interner()
+            index = [groups.intern(parents[x]) for x in r[0].interner.names]
+            r.insert(0, r[0].collapse(index, groups.names, ignore_selfloop=ignore_selfloop))
+        return r
+
+
+def __build_stat(rows: list[Row], weight_key: str | None) -> Stat:
     s = Stat.default()
     for row in rows:
-        s.add(row.src.id, row.dst.id)
+        s.add(row.src.id, row.dst.id, row.weight(weight_key))
     return s
 
 
-def build_stat(rows: list[Row], key: Callable[[Node], str | None] | None = None, ignore_selfloop: bool = False) -> Stat:
+def build_stat(
+    rows: list[Row],
+    key: Callable[[Node], str | None] | None = None,
+    ignore_selfloop: bool = False,
+    weight_key: str | None = None,
+) -> Stat:
     """
     Build new Stat from rows.
 
     If ignore_selfloop, ignore edges that have the same head and tail.
     If key, replace node_id.
+    A row is added Row.weight(weight_key) times.
     """
     if ignore_selfloop:
         rows = [x for x in rows if x.src.id != x.dst.id]
     if key is None:
-        return __build_stat(rows)
+        return __build_stat(rows, weight_key)
 
     node_map = {
         **{r.src.id: r.src for r in rows},
@@ -113,7 +360,7 @@ def build_stat(rows: list[Row], key: Callable[[Node], str | None] | None = None,
         dv = key(node_map[row.dst.id])
         if dv is None:
             continue
-        s.add(sv, dv)
+        s.add(sv, dv, row.weight(weight_key))
     return s
 
 
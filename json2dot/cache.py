@@ -0,0 +1,102 @@
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+
+class RenderCache:
+    """
+    Content-addressed cache of rendered images in directory.
+
+    An image is keyed by the sha256 of the engine, the format and the dot source,
+    so the same graph is not rendered again even if the input is different.
+    The least recently used images are evicted when the images exceed max_bytes in total.
+    The directory can be shared by processes, files are replaced atomically.
+    """
+
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.__directory = directory
+        self.__max_bytes = max_bytes
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def hits(self) -> int:
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        return self.__misses
+
+    @staticmethod
+    def key(source: str, format: str, engine: str) -> str:
+        """Return the key of the image."""
+        h = hashlib.sha256()
+        h.update(f"{engine}\0{format}\0".encode())
+        h.update(source.encode())
+        return h.hexdigest()
+
+    def __path(self, key: str, format: str) -> Path:
+        return self.__directory / f"{key}.{format}"
+
+    def get(self, key: str, format: str, out: Path) -> bool:
+        """Copy the cached image to out, return False if not cached."""
+        p = self.__path(key, format)
+        try:
+            shutil.copyfile(p, out)
+            os.utime(p)  # mark as recently used
+        except FileNotFoundError:
+            self.__misses += 1
+            return False
+        self.__hits += 1
+        return True
+
+    def put(self, key: str, format: str, image: Path) -> None:
+        """Cache the image, then evict the least recently used images."""
+        self.__directory.mkdir(parents=True, exist_ok=True)
+        p = self.__path(key, format)
+        tmp = p.with_name(f".{p.name}.{os.getpid()}.tmp")
+        shutil.copyfile(image, tmp)
+        os.replace(tmp, p)
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used images until they fit in max_bytes."""
+        entries = []
+        total = 0
+        with os.scandir(self.__directory) as it:
+            for x in it:
+                if x.name.startswith(".") or not x.is_file():
+                    continue
+                st = x.stat()
+                entries.append((st.st_mtime, st.st_size, x.path))
+                total += st.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.__max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def render_all(self, source: str, outs: list[Path], engine: str = "dot", timeout: float | None = None) -> None:
+        """Copy cached images to outs and render the others by render_all, then cache them."""
+        misses = []
+        for out in outs:
+            format = out.suffix.lstrip(".")
+            if not self.get(self.key(source, format, engine), format, out):
+                misses.append(out)
+        if not misses:
+            return
+        from .dot import render_all
+
+        render_all(source, misses, engine=engine, timeout=timeout)
+        for out in misses:
+            format = out.suffix.lstrip(".")
+            self.put(self.key(source, format, engine), format, out)
+
+    def dumps(self) -> str:
+        """Return the hit and miss counts."""
+        return f"render cache: {self.__hits} hits, {self.__misses} misses"
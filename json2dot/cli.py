@@ -1,24 +1,42 @@
 """Entry point of CLI."""
 
+import os
 import sys
+from contextlib import nullcontext
 from pathlib import Path
 from textwrap import dedent
+from typing import TYPE_CHECKING
 
+from . import reader
 from .__version__ import __version__
-from .build import GroupNameMap, NodeNameMap, build_nodemap, build_stat
-from .command import Debug, Draw
-from .mathx import Clamp
-from .row import Node
-from .scale import ClampSetting, FixedSetting, Scaler, Setting
-from .stat import Ranking, Stat
+from .columnar import detect_format, formats
+from .decoder import decoders, new_decoder
+from .row import MergePolicy
 
+# the others are imported when needed, so that the startup (--version, dot source to stdout) stays fast
+if TYPE_CHECKING:
+    from argparse import ArgumentParser, Namespace
 
-def main() -> int:
-    """Entry point of CLI."""
+    from .budget import Budget
+    from .build import Accumulator, GroupHierarchy, NodeNameMap
+    from .command import Debug, Draw
+    from .row import NodeMap
+    from .stat import Ranking, Stat
+    from .timings import Timings
+
+phases = ["load", "parse", "save", "prune", "ranking", "group", "export", "debug", "scale", "draw", "render"]
+"""Phases of CLI, in order."""
+
+debug_sections = ["map", "source", "name", "stat", "ranking", "group"]
+"""Sections of --debug output, map, source and name are in nodes."""
+
+
+def new_parser(prog: str = "json2dot") -> "ArgumentParser":
+    """Return a new parser of arguments to fold rows and draw."""
     import argparse
 
     parser = argparse.ArgumentParser(
-        prog="json2dot",
+        prog=prog,
         description=dedent("""\
         Generate dot source from jsonl considering node degrees and edge weights.
 
@@ -47,47 +65,387 @@ def main() -> int:
     parser.add_argument("--display_selfloop", "-s", action="store_true")
     parser.add_argument("--no_scale", action="store_true", help="draw nodes and edges with the same size (min)")
     parser.add_argument("--name_key", "-k", action="store", type=str, help="select node name from node desc")
-    parser.add_argument("--group_key", "-g", action="store", type=str, help="select group name from node desc")
-    parser.add_argument("--out", "-o", action="store", type=str, help="filename for saving the rendered image")
+    parser.add_argument(
+        "--group_key",
+        "-g",
+        action="append",
+        type=str,
+        help="select group name from node desc. "
+        "Repeatable, groups of the later keys are nested in the groups of the earlier keys",
+    )
+    parser.add_argument(
+        "--merge_policy",
+        action="store",
+        type=str,
+        choices=[x.value for x in MergePolicy],
+        default=MergePolicy.LAST.value,
+        help="how to merge descriptions of nodes with the same NODE_ID, "
+        "last: later values win, first: the first description wins, new: only new keys are added. Default: last",
+    )
+    parser.add_argument(
+        "--decoder",
+        action="store",
+        type=str,
+        choices=["auto", *decoders.keys()],
+        default="auto",
+        help="json decoder backend, fall back to json if not installed. "
+        "auto selects the first available one of msgspec, orjson and json. Default: auto",
+    )
+    parser.add_argument(
+        "--input",
+        "-i",
+        action="store",
+        type=Path,
+        help="read rows from the file instead of stdin, gzip and zstd compressed files are decompressed. "
+        "A plain file is memory-mapped, and split into byte ranges for --jobs without reading it first",
+    )
+    parser.add_argument(
+        "--input_format",
+        action="store",
+        type=str,
+        choices=["auto", *formats],
+        default="auto",
+        help="format of input. tsv: src node id and dst node id separated by a tab. "
+        "parquet and arrow: src_id and dst_id columns, and src_KEY and dst_KEY columns as node descriptions, "
+        "requires --input and pyarrow. auto selects by the suffix of --input, otherwise jsonl. Default: auto",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        action="store",
+        type=int,
+        default=1,
+        help="number of processes to parse input, 0 means the number of CPUs. "
+        "If greater than 1, read the whole input first unless --input is a plain file. Default: 1",
+    )
+    parser.add_argument(
+        "--snapshot",
+        action="store",
+        type=Path,
+        help="load the graph folded so far from the snapshot file if exists, fold rows from stdin into it, "
+        "and save the updated graph to the file. "
+        "The snapshot should be built with the same --display_selfloop, --merge_policy and --weight_key",
+    )
+    parser.add_argument(
+        "--window",
+        action="store",
+        type=float,
+        help="aggregate only rows within the last WINDOW seconds, the time of a row is given by --time_key. "
+        "Cannot be used with --jobs, --snapshot and tsv",
+    )
+    parser.add_argument(
+        "--slot",
+        action="store",
+        type=float,
+        default=60,
+        help="seconds of a time slot of --window, rows are expired by slot. Default: 60",
+    )
+    parser.add_argument(
+        "--time_key",
+        action="store",
+        type=str,
+        default="time",
+        help="select the time of a row from the row, epoch seconds or ISO 8601 string. Default: time",
+    )
+    parser.add_argument(
+        "--weight_key",
+        action="store",
+        type=str,
+        help="select the weight of a row from the row, a non-negative integer such as a pre-aggregated count. "
+        "A row is counted WEIGHT times, rows without the key are counted once. "
+        "Parquet and Arrow inputs select the column. Cannot be used with tsv",
+    )
+    parser.add_argument("--top_nodes", action="store", type=int, help="draw only the top TOP_NODES nodes by degree")
+    parser.add_argument("--top_edges", action="store", type=int, help="draw only the top TOP_EDGES edges by weight")
+    parser.add_argument(
+        "--node_percentile",
+        action="store",
+        type=float,
+        help="draw only the nodes whose cumulative degree percentile is within NODE_PERCENTILE, see --debug",
+    )
+    parser.add_argument(
+        "--edge_percentile",
+        action="store",
+        type=float,
+        help="draw only the edges whose cumulative weight percentile is within EDGE_PERCENTILE, see --debug",
+    )
+    parser.add_argument(
+        "--min_count", action="store", type=int, default=0, help="draw only the edges of weight MIN_COUNT or more"
+    )
+    parser.add_argument(
+        "--other",
+        action="store",
+        type=str,
+        help="fold the edges of the nodes dropped by --top_nodes and --node_percentile into the node OTHER "
+        "instead of dropping them. Default: other for --max_nodes",
+    )
+    parser.add_argument(
+        "--max_nodes",
+        action="store",
+        type=int,
+        help="coarsen the graph to at most MAX_NODES nodes by folding leaves and then low ranked nodes into --other",
+    )
+    parser.add_argument(
+        "--max_edges",
+        action="store",
+        type=int,
+        help="coarsen the graph to at most MAX_EDGES edges by folding leaves and then dropping low ranked edges",
+    )
+    parser.add_argument(
+        "--render_timeout",
+        action="store",
+        type=float,
+        help="seconds for each layout engine to render --out, try --fallback_engine on timeout, "
+        "and halve the graph when both time out, up to 3 times",
+    )
+    parser.add_argument("--engine", action="store", type=str, default="dot", help="layout engine. Default: dot")
+    parser.add_argument(
+        "--fallback_engine",
+        action="store",
+        type=str,
+        default="sfdp",
+        help="layout engine to try when --engine times out. Default: sfdp",
+    )
+    parser.add_argument(
+        "--out",
+        "-o",
+        action="append",
+        type=Path,
+        help="filename for saving the rendered image, the format is the suffix. "
+        "Repeatable, the graph is laid out once and the formats are rendered from the layout concurrently",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store",
+        type=Path,
+        help="directory to cache rendered images by the hash of the dot source, format and engine, "
+        "an image is copied from the cache without running the engine if cached",
+    )
+    parser.add_argument(
+        "--cache_size",
+        action="store",
+        type=int,
+        default=256,
+        help="megabytes of --cache, the least recently used images are evicted. Default: 256",
+    )
     parser.add_argument("--debug", action="store_true")
+    parser.add_argument(
+        "--debug_format",
+        action="store",
+        type=str,
+        choices=["json", "jsonl"],
+        default="json",
+        help="format of --debug. json: a json object, jsonl: a record per line, "
+        '{"section":SECTION,"key":KEY,"value":VALUE}. Both are written incrementally. Default: json',
+    )
+    parser.add_argument(
+        "--debug_section",
+        action="append",
+        type=str,
+        choices=debug_sections,
+        help="write only the section in --debug output. Repeatable. Default: all sections",
+    )
+    parser.add_argument(
+        "--debug_source_limit",
+        action="store",
+        type=int,
+        help="write at most DEBUG_SOURCE_LIMIT rows in the source section of --debug output",
+    )
+    parser.add_argument(
+        "--export",
+        action="store",
+        type=Path,
+        help="write node ids, degrees, edges, weights and ranking percentiles of the graph and groups "
+        "to EXPORT as NPZ (columnar arrays, see json2dot.export) instead of drawing",
+    )
+    parser.add_argument(
+        "--keep_source", action="store_true", help="keep all input rows in memory to include them in --debug output"
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="print wall time, cpu time, peak rss and peak traced memory of each phase "
+        "as a json object to stderr. Tracing memory slows down phases",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store",
+        type=str,
+        choices=phases,
+        help="run cProfile during the phase and dump the stats to --profile_out",
+    )
+    parser.add_argument(
+        "--profile_out", action="store", type=Path, help="filename for saving the profile. Default: PROFILE.prof"
+    )
     parser.add_argument("--version", action="store_true", help="print version")
 
-    args = parser.parse_args()
+    return parser
+
+
+def main(argv: list[str] | None = None, timings: "Timings | None" = None) -> int:
+    """
+    Entry point of CLI.
+
+    argv defaults to sys.argv[1:], json2dot serve ... runs serve.main.
+    If timings, record the resource usage of each phase into it.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["serve"]:
+        from .serve import main as serve
+
+        return serve(argv[1:])
+
+    parser = new_parser()
+    args = parser.parse_args(argv)
 
     if args.version:
         print(__version__)
         return 0
+    if args.window is not None and (args.jobs != 1 or args.snapshot is not None):
+        parser.error("--window cannot be used with --jobs and --snapshot")
+    if args.input_format == "auto":
+        args.input_format = detect_format(args.input)
+    if args.input_format in ("parquet", "arrow") and args.input is None:
+        parser.error(f"--input required for {args.input_format}")
+    if args.input_format != "jsonl" and args.jobs != 1:
+        parser.error("--jobs can be used only with jsonl")
+    if args.input_format == "tsv" and args.weight_key is not None:
+        parser.error("--weight_key cannot be used with tsv")
+    if args.input_format == "tsv" and args.window is not None:
+        parser.error("--window cannot be used with tsv")
 
-    nodes = build_nodemap(iter(sys.stdin))
-    stat = build_stat(rows=nodes.source, ignore_selfloop=not args.display_selfloop)
-    ranking = Ranking.new(stat)
+    from .timings import Timings
 
-    node_name_map = NodeNameMap(nodes.source, args.name_key)
+    if timings is None:
+        timings = Timings(
+            enabled=args.timings or args.profile is not None,
+            trace_malloc=args.timings,
+            profile=args.profile,
+            profile_out=args.profile_out,
+        )
+    try:
+        return run(args, timings)
+    finally:
+        if args.timings:
+            print(timings.dumps(), file=sys.stderr)
 
-    group_name_map: GroupNameMap | None = None
-    grouped_stat: Stat | None = None
-    grouped_ranking: Ranking | None = None
 
-    if args.group_key:
-        group_name_map = GroupNameMap(nodes.source, args.group_key)
-
-        def group_key(node: Node) -> str | None:
-            return node.desc.get(args.group_key)
-
-        grouped_stat = GroupNameMap.build_stat(nodes=nodes, ignore_selfloop=not args.display_selfloop, key=group_key)
-        grouped_ranking = Ranking.new(grouped_stat)
-
-    if args.debug:
-        print(
-            Debug(
-                nodes=nodes,
-                node_name_map=node_name_map,
-                group_name_map=group_name_map,
-                ranking=ranking,
-                grouped_ranking=grouped_ranking,
-            ).run()
+def row_keys(args: "Namespace") -> list[str]:
+    """Return the keys of rows to keep in Row.attrs by arguments."""
+    keys = [args.time_key] if args.window is not None else []
+    if args.weight_key is not None:
+        keys.append(args.weight_key)
+    return keys
+
+
+def new_accumulator(args: "Namespace") -> "Accumulator":
+    """Return a new empty Accumulator by arguments."""
+    from .build import Accumulator
+
+    if args.window is not None:
+        from .window import WindowAccumulator
+
+        return WindowAccumulator(
+            window=args.window,
+            slot=args.slot,
+            time_key=args.time_key,
+            ignore_selfloop=not args.display_selfloop,
+            keep_source=args.keep_source,
+            policy=MergePolicy(args.merge_policy),
+            decoder=new_decoder(args.decoder, row_keys(args)),
+            weight_key=args.weight_key,
         )
-        return 0
+    return Accumulator(
+        ignore_selfloop=not args.display_selfloop,
+        keep_source=args.keep_source,
+        policy=MergePolicy(args.merge_policy),
+        decoder=new_decoder(args.decoder, row_keys(args)),
+        weight_key=args.weight_key,
+    )
+
+
+def __rank(
+    args: "Namespace", nodes: "NodeMap", stat: "Stat", timings: "Timings"
+) -> tuple["Ranking", "NodeNameMap", "GroupHierarchy | None", list["Stat"], list["Ranking"]]:
+    from .build import GroupHierarchy, NodeNameMap
+    from .stat import Ranking
+
+    with timings.phase("ranking"):
+        ranking = Ranking.new(stat)
+
+    node_name_map = NodeNameMap.from_nodes(nodes, args.name_key)
+
+    groups: GroupHierarchy | None = None
+    grouped_stats: list[Stat] = []
+    grouped_rankings: list[Ranking] = []
+
+    if args.group_key:
+        with timings.phase("group"):
+            groups = GroupHierarchy.from_nodes(nodes, args.group_key)
+            grouped_stats = groups.collapse_stat(stat, ignore_selfloop=not args.display_selfloop)
+            grouped_rankings = [Ranking.new(x) for x in grouped_stats]
+    return ranking, node_name_map, groups, grouped_stats, grouped_rankings
+
+
+def new_debug(args: "Namespace", acc: "Accumulator", timings: "Timings") -> "Debug":
+    """Rank folded rows and return a new Debug."""
+    from .command import Debug
+
+    ranking, node_name_map, groups, _, grouped_rankings = __rank(args, acc.nodes, acc.stat, timings)
+    return Debug(
+        nodes=acc.nodes,
+        node_name_map=node_name_map,
+        groups=groups,
+        ranking=ranking,
+        grouped_rankings=grouped_rankings,
+        sections=args.debug_section,
+        source_limit=args.debug_source_limit,
+    )
+
+
+def new_budget(args: "Namespace") -> "Budget":
+    """Return a new Budget by arguments."""
+    from .budget import Budget
+    from .cache import RenderCache
+
+    return Budget(
+        max_nodes=args.max_nodes,
+        max_edges=args.max_edges,
+        timeout=args.render_timeout,
+        engines=list(dict.fromkeys([args.engine, args.fallback_engine])),
+        other=args.other if args.other is not None else "other",
+        cache=RenderCache(args.cache, args.cache_size << 20) if args.cache is not None else None,
+    )
+
+
+def reduce(args: "Namespace", stat: "Stat", timings: "Timings") -> "Stat":
+    """Prune and coarsen stat to draw."""
+    from .prune import Pruning
+
+    pruning = Pruning(
+        top_nodes=args.top_nodes,
+        top_edges=args.top_edges,
+        node_percentile=args.node_percentile,
+        edge_percentile=args.edge_percentile,
+        min_count=args.min_count,
+        other=args.other,
+    )
+    budget = new_budget(args)
+    if not pruning.enabled and budget.fits(stat):
+        return stat
+    with timings.phase("prune"):
+        stat = pruning.run(stat, ignore_selfloop=not args.display_selfloop)
+        return budget.coarsen(stat, ignore_selfloop=not args.display_selfloop)
+
+
+def new_draw(args: "Namespace", nodes: "NodeMap", stat: "Stat", timings: "Timings") -> "Draw":
+    """Rank and scale stat and return a new Draw."""
+    from .command import Draw
+    from .mathx import Clamp
+    from .scale import ClampSetting, FixedSetting, Scaler, Setting
+    from .stat import Ranking
+
+    ranking, node_name_map, groups, grouped_stats, grouped_rankings = __rank(args, nodes, stat, timings)
 
     def new_setting(x: int, y: int) -> Setting:
         c = Clamp.new(x, y)
@@ -95,36 +453,141 @@ def main() -> int:
             return FixedSetting(clamp=c)
         return ClampSetting(clamp=c)
 
-    scaler = Scaler(
-        ranking=ranking,
-        penwidth=new_setting(args.penwidth_min, args.penwidth_max),
-        arrowsize=new_setting(args.arrowsize_min, args.arrowsize_max),
-        weight=new_setting(args.weight_min, args.weight_max),
-        fontsize=new_setting(args.fontsize_min, args.fontsize_max),
-    )
-    grouped_scaler: Scaler | None = None
-    if grouped_ranking:
-        grouped_scaler = Scaler(
-            ranking=grouped_ranking,
+    def new_scaler(ranking: Ranking) -> Scaler:
+        return Scaler(
+            ranking=ranking,
             penwidth=new_setting(args.penwidth_min, args.penwidth_max),
             arrowsize=new_setting(args.arrowsize_min, args.arrowsize_max),
             weight=new_setting(args.weight_min, args.weight_max),
             fontsize=new_setting(args.fontsize_min, args.fontsize_max),
         )
-    g = Draw(
+
+    with timings.phase("scale"):
+        scaler = new_scaler(ranking)
+        grouped_scalers = [new_scaler(x) for x in grouped_rankings]
+    return Draw(
         nodes=nodes,
         scaler=scaler,
         stat=stat,
         node_name_map=node_name_map,
-        group_name_map=group_name_map,
-        grouped_stat=grouped_stat,
-        grouped_scaler=grouped_scaler,
+        groups=groups,
+        grouped_stats=grouped_stats,
+        grouped_scalers=grouped_scalers,
         ignore_selfloop=not args.display_selfloop,
-    ).run()
+    )
+
+
+def run(args: "Namespace", timings: "Timings") -> int:
+    """Run CLI with parsed arguments."""
+    jobs = args.jobs if args.jobs > 0 else os.cpu_count() or 1
+    if args.snapshot is not None and args.snapshot.exists():
+        from . import snapshot
+
+        with timings.phase("load"):
+            acc = snapshot.load(
+                args.snapshot,
+                ignore_selfloop=not args.display_selfloop,
+                keep_source=args.keep_source,
+                policy=MergePolicy(args.merge_policy),
+                decoder=new_decoder(args.decoder, row_keys(args)),
+                weight_key=args.weight_key,
+            )
+    else:
+        acc = new_accumulator(args)
+    with timings.phase("parse"):
+        if args.input_format == "tsv":
+            from .columnar import tsv_batches
+
+            with reader.open_lines(args.input) if args.input is not None else nullcontext(sys.stdin.buffer) as lines:
+                acc.consume_batches(tsv_batches(lines))
+        elif args.input_format in ("parquet", "arrow"):
+            from .columnar import arrow_batches
+
+            acc.consume_batches(arrow_batches(args.input, args.input_format, acc.decoder.keys))
+        elif jobs > 1 and args.input is not None:
+            from .parallel import consume_file
+
+            acc.merge(
+                consume_file(
+                    path=args.input,
+                    jobs=jobs,
+                    ignore_selfloop=not args.display_selfloop,
+                    keep_source=args.keep_source,
+                    policy=MergePolicy(args.merge_policy),
+                    decoder=args.decoder,
+                    keys=row_keys(args),
+                    weight_key=args.weight_key,
+                )
+            )
+        elif jobs > 1:
+            from .parallel import consume
+
+            acc.merge(
+                consume(
+                    data=sys.stdin.buffer.read(),
+                    jobs=jobs,
+                    ignore_selfloop=not args.display_selfloop,
+                    keep_source=args.keep_source,
+                    policy=MergePolicy(args.merge_policy),
+                    decoder=args.decoder,
+                    keys=row_keys(args),
+                    weight_key=args.weight_key,
+                )
+            )
+        elif args.input is not None:
+            with reader.open_lines(args.input) as lines:
+                acc.consume(lines)
+        else:
+            acc.consume(sys.stdin.buffer)
+    if args.snapshot is not None:
+        from . import snapshot
+
+        with timings.phase("save"):
+            snapshot.save(acc, args.snapshot)
+
+    if args.debug or args.export is not None:
+        debug = new_debug(args, acc, timings)
+        if args.export is not None:
+            from . import export
+
+            with timings.phase("export"):
+                export.save(args.export, debug.ranking, debug.grouped_rankings)
+        if args.debug:
+            with timings.phase("debug"):
+                debug.write(sys.stdout, jsonl=args.debug_format == "jsonl")
+        return 0
+
+    stat = reduce(args, acc.stat, timings)
     if args.out is None:
-        print(g.source)
+        draw = new_draw(args, acc.nodes, stat, timings)
+        with timings.phase("draw"):
+            draw.write(sys.stdout)
+        return 0
+    if args.render_timeout is not None or len(args.out) > 1 or args.cache is not None:
+        from .budget import RenderTimeout
+
+        budget = new_budget(args)
+        # the budget ranks and draws each attempt itself
+        with timings.phase("render"):
+            try:
+                budget.render(
+                    stat,
+                    lambda x: new_draw(args, acc.nodes, x, Timings.disabled()).run().source,
+                    args.out,
+                    ignore_selfloop=not args.display_selfloop,
+                )
+            except RenderTimeout as e:
+                print(e, file=sys.stderr)
+                return 1
+            finally:
+                if budget.cache is not None:
+                    print(budget.cache.dumps(), file=sys.stderr)
         return 0
-    g.render(Path(args.out))
+    draw = new_draw(args, acc.nodes, stat, timings)
+    with timings.phase("draw"):
+        g = draw.run()
+    with timings.phase("render"):
+        g.render(args.out[0], engine=args.engine)
     return 0
 
 
@@ -0,0 +1,133 @@
+"""
+Edge lists in columns.
+
+Rows of tsv, Parquet and Arrow inputs are read in batches of columns
+and folded by Accumulator.add_batch without building a dict and a Row per row.
+
+tsv: src node id and dst node id separated by a tab, no header, extra fields are ignored.
+Parquet and Arrow: src_id and dst_id columns are required.
+Columns src_KEY and dst_KEY are the descriptions KEY of src and dst nodes, nulls are missing keys.
+Other columns are kept in Row.attrs if selected by keys.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Collection, Iterable, Iterator
+
+from .reader import ReaderException
+from .row import Node, Row, RowException
+
+BATCH_SIZE = 65536
+
+formats = ["jsonl", "tsv", "parquet", "arrow"]
+"""Input formats."""
+
+suffix_formats = {".tsv": "tsv", ".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow"}
+"""Input formats by suffix, others are jsonl."""
+
+
+def detect_format(path: Path | None) -> str:
+    """Return the input format of path by suffix, ignoring .gz and .zst."""
+    if path is None:
+        return "jsonl"
+    exts = [x for x in path.suffixes if x not in (".gz", ".zst")]
+    return suffix_formats.get(exts[-1], "jsonl") if exts else "jsonl"
+
+
+@dataclass
+class Batch:
+    """Edges in columns, descriptions and attrs are columns by key, None is missing."""
+
+    src: list[str]
+    dst: list[str]
+    src_desc: dict[str, list[Any]] = field(default_factory=dict)
+    dst_desc: dict[str, list[Any]] = field(default_factory=dict)
+    attrs: dict[str, list[Any]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return len(self.src)
+
+    @staticmethod
+    def __desc(columns: dict[str, list[Any]], i: int) -> dict[str, Any]:
+        return {k: v[i] for k, v in columns.items() if v[i] is not None}
+
+    def nodes(self) -> Iterator[Node]:
+        """Yield src and dst nodes of each row."""
+        src_desc = self.src_desc
+        dst_desc = self.dst_desc
+        for i, (s, d) in enumerate(zip(self.src, self.dst)):
+            yield Node(id=s, desc=self.__desc(src_desc, i) if src_desc else {})
+            yield Node(id=d, desc=self.__desc(dst_desc, i) if dst_desc else {})
+
+    def rows(self) -> Iterator[Row]:
+        """Yield rows."""
+        nodes = self.nodes()
+        for i, (s, d) in enumerate(zip(nodes, nodes)):
+            yield Row(src=s, dst=d, attrs=self.__desc(self.attrs, i))
+
+
+def tsv_batches(lines: Iterable[bytes], size: int = BATCH_SIZE) -> Iterator[Batch]:
+    """Yield batches of tab separated src and dst node ids, skip blank lines."""
+    src: list[str] = []
+    dst: list[str] = []
+    for line in lines:
+        fields = line.rstrip(b"\r\n").split(b"\t", 2)
+        if len(fields) < 2:
+            if not line.strip():
+                continue
+            raise RowException(f"src and dst separated by a tab required, {line!r}")
+        src.append(fields[0].decode())
+        dst.append(fields[1].decode())
+        if len(src) >= size:
+            yield Batch(src=src, dst=dst)
+            src = []
+            dst = []
+    if src:
+        yield Batch(src=src, dst=dst)
+
+
+def __record_batch(batch: Any, keys: Collection[str]) -> Batch:
+    names: list[str] = batch.schema.names
+    for x in ["src_id", "dst_id"]:
+        if x not in names:
+            raise RowException(f'"{x}" column required')
+    columns = {x: batch.column(x).to_pylist() for x in names}
+    for x in ["src_id", "dst_id"]:
+        if None in columns[x]:
+            raise RowException(f'"{x}" should not be null')
+    return Batch(
+        src=[str(x) for x in columns["src_id"]],
+        dst=[str(x) for x in columns["dst_id"]],
+        src_desc={k[4:]: v for k, v in columns.items() if k.startswith("src_") and k != "src_id"},
+        dst_desc={k[4:]: v for k, v in columns.items() if k.startswith("dst_") and k != "dst_id"},
+        attrs={k: columns[k] for k in keys if k in columns},
+    )
+
+
+def arrow_batches(path: Path, format: str, keys: Collection[str] = (), size: int = BATCH_SIZE) -> Iterator[Batch]:
+    """
+    Yield batches of the Parquet or Arrow IPC (file or stream) file.
+
+    Raise ReaderException if pyarrow is not installed.
+    """
+    try:
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ReaderException(f"install pyarrow to read {format}") from e
+
+    if format == "parquet":
+        for x in pyarrow.parquet.ParquetFile(path).iter_batches(batch_size=size):
+            yield __record_batch(x, keys)
+        return
+    with pyarrow.memory_map(str(path)) as source:
+        try:
+            reader: Any = pyarrow.ipc.open_file(source)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        except pyarrow.ArrowInvalid:
+            source.seek(0)
+            batches = pyarrow.ipc.open_stream(source)
+        for x in batches:
+            for i in range(0, x.num_rows, size):
+                yield __record_batch(x.slice(i, size), keys)
@@ -1,15 +1,26 @@
-import json
-from collections import defaultdict
-from dataclasses import asdict, dataclass
-from typing import Any, cast
+import io
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Collection, Iterator, TextIO, cast
 
-import graphviz
-
-from .build import GroupNameMap, NodeNameMap, build_label, build_tooltip
-from .dot import Graph
+from .build import GroupHierarchy, GroupNameMap, NodeNameMap, build_label, build_tooltip
+from .prune import fold_label
 from .row import NodeMap
 from .scale import Scaler
 from .stat import Ranking, Stat
+from .writer import DotWriter, Sink, Streamed, write_json, write_jsonl
+
+if TYPE_CHECKING:
+    from .dot import Graph
+
+
+@dataclass
+class Cluster:
+    """Nodes and nested clusters of a group, nodes are kept in the child of GroupNameMap.nil_group."""
+
+    label: str
+    children: dict[str, "Cluster"] = field(default_factory=dict)
+    nodes: list[str] = field(default_factory=list)
 
 
 @dataclass
@@ -18,47 +29,56 @@ class Draw:
     scaler: Scaler
     stat: Stat
     node_name_map: NodeNameMap
-    group_name_map: GroupNameMap | None
-    grouped_stat: Stat | None
-    grouped_scaler: Scaler | None
+    groups: GroupHierarchy | None
+    grouped_stats: list[Stat]
+    grouped_scalers: list[Scaler]
     ignore_selfloop: bool
 
+    cluster_colors = ["lightgrey", "grey90"]
+    """Fill colors of clusters by level, cycled."""
+
     @property
     def __is_grouped(self) -> bool:
-        return None not in [self.group_name_map, self.grouped_stat, self.grouped_scaler]
+        return self.groups is not None and len(self.groups) > 0
 
-    def __add_grouped_nodes(
-        self, g: graphviz.Digraph, group_name_map: GroupNameMap, grouped_stat: Stat, grouped_scaler: Scaler
-    ) -> None:
-        groups: dict[str, set[str]] = defaultdict(set)
-        for node_id in self.stat.nodes.nodes.keys():
-            group = group_name_map.get(node_id)
-            groups[group].add(node_id)
+    def __add_grouped_nodes(self, g: Sink, groups: GroupHierarchy) -> None:
+        root = Cluster(label="")
+        for node_id, _ in self.stat.nodes.items():
+            c = root
+            path = groups.path(node_id)
+            for level, label in enumerate(path):
+                c = c.children.setdefault(groups.key(path, level), Cluster(label=label))
+            c.children.setdefault(GroupNameMap.nil_group, Cluster(label="")).nodes.append(node_id)
+        self.__add_cluster(g, root, 0)
 
-        for group, node_id_set in groups.items():
+    def __add_cluster(self, g: Sink, cluster: Cluster, level: int) -> None:
+        for group, c in cluster.children.items():
             if group == GroupNameMap.nil_group:
-                for node_id in node_id_set:
+                for node_id in c.nodes:
                     self.__add_node(g, node_id)
                 continue
 
             subgraph_name = f"cluster_{group}"  # as a cluster subgraph
-            tooltip = build_tooltip(asdict(grouped_stat.report(group)))
+            tooltip = build_tooltip(asdict(self.grouped_stats[level].report(group)))
             subgraph_attrs = {
-                "color": "lightgrey",
+                "color": self.cluster_colors[level % len(self.cluster_colors)],
                 "style": "filled",
-                "label": group,
+                "label": c.label,
                 "tooltip": tooltip,
-                "fontsize": str(grouped_scaler.get_fontsize(group)),
+                "fontsize": str(self.grouped_scalers[level].get_fontsize(group)),
             }
-            with g.subgraph(name=subgraph_name, graph_attr=subgraph_attrs) as c:
-                for node_id in node_id_set:
-                    self.__add_node(c, node_id)
+            with g.subgraph(name=subgraph_name, graph_attr=subgraph_attrs) as sg:
+                self.__add_cluster(sg, c, level + 1)
+
+    def __name(self, node_id: str) -> str:
+        label = fold_label(node_id)
+        return label if label is not None else self.node_name_map.get(node_id)
 
-    def __add_node(self, g: graphviz.dot.Dot, node_id: str) -> None:
-        node = self.nodes.map[node_id]
-        name = self.node_name_map.get(node_id)
+    def __add_node(self, g: Sink, node_id: str) -> None:
+        node = self.nodes.map.get(node_id)  # not found if folded by Pruning
+        name = self.__name(node_id)
         label_args = {"name": name}
-        if node.desc:
+        if node is not None and node.desc:
             label_args.update(node.desc)
         if self.node_name_map.key in label_args:
             del label_args[self.node_name_map.key]
@@ -66,7 +86,10 @@ class Draw:
             label = build_label(label_args)
         else:
             label = name
-        tooltip = build_tooltip(asdict(self.stat.report(node_id)))
+        report = asdict(self.stat.report(node_id))
+        if node is None and fold_label(node_id) is not None:
+            report["node_id"] = name
+        tooltip = build_tooltip(report)
         args = {
             "name": node_id,
             "color": "white",
@@ -78,17 +101,17 @@ class Draw:
         }
         g.node(**args)
 
-    def __add_nodes(self, g: graphviz.Digraph) -> None:
-        for node_id in self.stat.nodes.nodes.keys():
+    def __add_nodes(self, g: Sink) -> None:
+        for node_id, _ in self.stat.nodes.items():
             self.__add_node(g, node_id)
 
-    def __add_edges(self, g: graphviz.Digraph) -> None:
-        for (src_node_id, dst_node_id), w in self.stat.edges.edges.items():
+    def __add_edges(self, g: Sink) -> None:
+        for (src_node_id, dst_node_id), w in self.stat.edges.items():
             if self.ignore_selfloop and src_node_id == dst_node_id:
                 continue
 
-            src_name = self.node_name_map.get(src_node_id)
-            dst_name = self.node_name_map.get(dst_node_id)
+            src_name = self.__name(src_node_id)
+            dst_name = self.__name(dst_node_id)
             args = {
                 "tail_name": src_node_id,
                 "head_name": dst_node_id,
@@ -105,56 +128,131 @@ class Draw:
             args["labeltooltip"] = tooltip
             g.edge(**args)
 
-    def run(self) -> Graph:
-        g = graphviz.Digraph(strict=True)
+    def __draw(self, g: Sink) -> None:
         if self.__is_grouped:
-            self.__add_grouped_nodes(
-                g,
-                group_name_map=cast(GroupNameMap, self.group_name_map),
-                grouped_stat=cast(Stat, self.grouped_stat),
-                grouped_scaler=cast(Scaler, self.grouped_scaler),
-            )
+            self.__add_grouped_nodes(g, cast(GroupHierarchy, self.groups))
         else:
             self.__add_nodes(g)
         self.__add_edges(g)
+
+    def run(self) -> "Graph":
+        """Build a graphviz graph, for rendering."""
+        import graphviz
+
+        from .dot import Graph
+
+        g = graphviz.Digraph(strict=True)
+        self.__draw(g)
         return Graph(g)
 
+    def write(self, out: TextIO) -> None:
+        """Write dot source to out as nodes and edges are drawn."""
+        with DotWriter(out, strict=True) as g:
+            self.__draw(g)
+
 
 @dataclass
 class Debug:
+    """
+    Dump of folded rows, stat and ranking as json.
+
+    Only sections are written, all if None: map, source and name (in nodes), stat, ranking and group.
+    source (kept rows) is capped at source_limit rows if given.
+    The document is written item by item, so it is not built in memory.
+    """
+
     nodes: NodeMap
     node_name_map: NodeNameMap
-    group_name_map: GroupNameMap | None
-    grouped_ranking: Ranking | None
+    groups: GroupHierarchy | None
+    grouped_rankings: list[Ranking]
     ranking: Ranking
+    sections: Collection[str] | None = None
+    source_limit: int | None = None
+
+    def __selected(self, section: str) -> bool:
+        return self.sections is None or section in self.sections
+
+    @staticmethod
+    def __stat(ranking: Ranking) -> Streamed:
+        return Streamed(
+            [
+                ("nodes", Streamed(ranking.stat.nodes.items())),
+                ("edges", Streamed((f"{s}|{d}", v) for (s, d), v in ranking.stat.edges.items())),
+            ]
+        )
+
+    @staticmethod
+    def __ranking(ranking: Ranking) -> Streamed:
+        nodes = ranking.named_nodes()
+        edges = ranking.named_edges()
+
+        def edge(i: int) -> tuple[str, dict[str, Any]]:
+            x = edges.elem(i)
+            s, d = x.key
+            return f"{s}|{d}", asdict(x)
+
+        return Streamed(
+            [
+                ("nodes", Streamed((asdict(nodes.elem(i)) for i in range(len(nodes))), array=True)),
+                ("edges", Streamed(edge(i) for i in range(len(edges)))),
+            ]
+        )
+
+    def __nodes(self) -> Iterator[tuple[str, Any]]:
+        if self.__selected("map"):
+            yield "map", Streamed((k, asdict(v)) for k, v in self.nodes.map.items())
+        if self.__selected("source") and self.nodes.keep_source:
+            rows = islice(self.nodes.source, self.source_limit)
+            yield "source", Streamed(({"src": asdict(x.src), "dst": asdict(x.dst)} for x in rows), array=True)
+        if self.__selected("name"):
+            yield "name", Streamed(self.node_name_map.map.items())
+
+    def __group(self) -> Iterator[tuple[str, Any]]:
+        if self.groups:
+            yield "name", Streamed(self.groups.maps[0].map.items())
+        if self.grouped_rankings:
+            yield "stat", self.__stat(self.grouped_rankings[0])
+            yield "ranking", self.__ranking(self.grouped_rankings[0])
+        if self.groups and len(self.groups) > 1:
+            groups = self.groups
+            yield "levels", Streamed(
+                (
+                    Streamed(
+                        [
+                            ("key", m.key),
+                            ("name", Streamed(groups.level_map(i).items())),
+                            ("stat", self.__stat(x)),
+                            ("ranking", self.__ranking(x)),
+                        ]
+                    )
+                    for i, (m, x) in enumerate(zip(groups.maps, self.grouped_rankings))
+                ),
+                array=True,
+            )
+
+    def document(self) -> Streamed:
+        """Return the document of sections."""
+        r: list[tuple[str, Any]] = []
+        if any(self.__selected(x) for x in ["map", "source", "name"]):
+            r.append(("nodes", Streamed(self.__nodes())))
+        if self.__selected("stat"):
+            r.append(("stat", self.__stat(self.ranking)))
+        if self.__selected("ranking"):
+            r.append(("ranking", self.__ranking(self.ranking)))
+        if self.__selected("group"):
+            r.append(("group", Streamed(self.__group())))
+        return Streamed(r)
+
+    def write(self, out: TextIO, jsonl: bool = False) -> None:
+        """Write the document to out as a json object, or as records per line if jsonl, see write_jsonl."""
+        if jsonl:
+            write_jsonl(out, self.document())
+            return
+        write_json(out, self.document())
+        out.write("\n")
 
     def run(self) -> str:
-        r = {
-            "nodes": {
-                "map": {k: asdict(v) for k, v in self.nodes.map.items()},
-                "source": [{"src": asdict(x.src), "dst": asdict(x.dst)} for x in self.nodes.source],
-                "name": self.node_name_map.map,
-            },
-            "stat": {
-                "nodes": self.ranking.stat.nodes.nodes,
-                "edges": {f"{s}|{d}": v for (s, d), v in self.ranking.stat.edges.edges.items()},
-            },
-            "ranking": {
-                "nodes": [asdict(x) for x in self.ranking.nodes.elems],
-                "edges": {f"{s}|{d}": asdict(v) for (s, d), v in self.ranking.edges.elem_map.items()},
-            },
-        }
-        g: dict[str, Any] = {}
-        if self.group_name_map:
-            g["name"] = self.group_name_map.map
-        if self.grouped_ranking:
-            g["stat"] = {
-                "nodes": self.grouped_ranking.stat.nodes.nodes,
-                "edges": {f"{s}|{d}": v for (s, d), v in self.grouped_ranking.stat.edges.edges.items()},
-            }
-            g["ranking"] = {
-                "nodes": [asdict(x) for x in self.grouped_ranking.nodes.elems],
-                "edges": {f"{s}|{d}": asdict(v) for (s, d), v in self.grouped_ranking.edges.elem_map.items()},
-            }
-        r["group"] = g
-        return json.dumps(r, separators=(",", ":"))
+        """Return the document as a json object."""
+        out = io.StringIO()
+        write_json(out, self.document())
+        return out.getvalue()
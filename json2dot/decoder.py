@@ -0,0 +1,127 @@
+import json
+import sys
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Collection, NotRequired, TypedDict, cast
+
+from .row import Row, RowException
+
+
+class Decoder(ABC):
+    """
+    Decoder of an input line into Row.
+
+    Values of keys of the row other than src and dst are kept in Row.attrs.
+    Raise RowException if a line is not a valid row, including malformed JSON.
+    """
+
+    name: str
+
+    def __init__(self, keys: Collection[str] = ()) -> None:
+        self.keys = keys
+
+    @abstractmethod
+    def loads(self, s: str | bytes) -> Row:
+        """Decode a line."""
+
+
+class JSONDecoder(Decoder):
+    """Decoder using the standard library."""
+
+    name = "json"
+
+    def loads(self, s: str | bytes) -> Row:
+        """Decode a line."""
+        try:
+            obj = json.loads(s)
+        except json.JSONDecodeError as e:
+            raise RowException(str(e)) from e
+        return Row.new(obj, self.keys)
+
+
+class OrjsonDecoder(Decoder):
+    """
+    Decoder using orjson.
+
+    Raise ImportError if orjson is not installed.
+    """
+
+    name = "orjson"
+
+    def __init__(self, keys: Collection[str] = ()) -> None:
+        import orjson
+
+        super().__init__(keys)
+        self.__loads = orjson.loads
+        self.__decode_error = orjson.JSONDecodeError
+
+    def loads(self, s: str | bytes) -> Row:
+        """Decode a line."""
+        try:
+            obj = self.__loads(s)
+        except self.__decode_error as e:
+            raise RowException(str(e)) from e
+        return Row.new(obj, self.keys)
+
+
+class RowSchema(TypedDict):
+    """Shape of a row."""
+
+    src: dict[str, Any]
+    dst: dict[str, Any]
+
+
+class MsgspecDecoder(Decoder):
+    """
+    Decoder using msgspec.
+
+    The shape of the row is validated by the typed schema while decoding.
+    Raise ImportError if msgspec is not installed.
+    """
+
+    name = "msgspec"
+
+    def __init__(self, keys: Collection[str] = ()) -> None:
+        import msgspec
+
+        super().__init__(keys)
+        schema: Any = RowSchema
+        if keys:
+            fields = {**RowSchema.__annotations__, **{k: NotRequired[Any] for k in keys}}
+            schema = cast(Any, TypedDict)("RowSchema", fields)
+        self.__decoder = msgspec.json.Decoder(schema)
+        # ValidationError of the schema is a DecodeError too
+        self.__decode_error = msgspec.DecodeError
+
+    def loads(self, s: str | bytes) -> Row:
+        """Decode a line."""
+        try:
+            obj = self.__decoder.decode(s)
+        except self.__decode_error as e:
+            raise RowException(str(e)) from e
+        src = obj.pop("src")
+        dst = obj.pop("dst")
+        return Row.from_nodes(src, dst, obj)
+
+
+decoders: dict[str, Callable[[Collection[str]], Decoder]] = {
+    x.name: x for x in [MsgspecDecoder, OrjsonDecoder, JSONDecoder]
+}
+
+
+def new_decoder(name: str = "auto", keys: Collection[str] = ()) -> Decoder:
+    """
+    Return a new Decoder by name.
+
+    If name is auto, return the first available one of msgspec, orjson and json.
+    Fall back to json if the backend is not installed.
+    keys are the keys of the row to keep in Row.attrs.
+    """
+    if name != "auto" and name not in decoders:
+        raise ValueError(f"unknown decoder {name}")
+    for d in decoders.values() if name == "auto" else [decoders[name]]:
+        try:
+            return d(keys)
+        except ImportError:
+            if name != "auto":
+                print(f"decoder {name} is not available, fall back to json", file=sys.stderr)
+    return JSONDecoder(keys)
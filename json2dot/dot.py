@@ -1,4 +1,6 @@
+import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import cast
 
@@ -6,14 +8,14 @@ import graphviz
 
 
 class Graph:
-    def __init__(self, g: graphviz.Digraph) -> None:
+    def __init__(self, g: graphviz.Digraph | graphviz.Source) -> None:
         self.__g = g
 
     @property
     def source(self) -> str:
         return cast(str, self.__g.source)
 
-    def render(self, out: Path) -> None:
+    def render(self, out: Path, engine: str = "dot") -> None:
         p = out.absolute()
         filename = p.stem
         directory = str(p.parent)
@@ -22,5 +24,51 @@ class Graph:
             filename=filename,
             directory=directory,
             format=format,
+            engine=engine,
         )
         print(f"rendered to {p} as {format}", file=sys.stderr)
+
+
+def render_source(
+    source: str, out: Path, engine: str = "dot", timeout: float | None = None, neato_no_op: bool = False
+) -> None:
+    """
+    Render dot source to out by the layout engine, the format is the suffix of out.
+
+    Unlike Graph.render, the source is piped to the engine and not saved.
+    If neato_no_op, render the source laid out already by neato -n2, engine is ignored.
+    Raise subprocess.TimeoutExpired if the engine does not finish in timeout seconds, the engine is killed.
+    """
+    p = out.absolute()
+    format = p.suffix.lstrip(".")
+    cmd = ["neato", "-n2"] if neato_no_op else [engine]
+    subprocess.run(
+        [*cmd, f"-T{format}", "-o", str(p)],
+        input=source.encode(),
+        check=True,
+        timeout=timeout,
+    )
+    print(f"rendered to {p} as {format} by {cmd[0]}", file=sys.stderr)
+
+
+def layout(source: str, engine: str = "dot", timeout: float | None = None) -> str:
+    """Return the dot source with positions laid out by the engine, see render_source for timeout."""
+    r = subprocess.run([engine, "-Tdot"], input=source.encode(), stdout=subprocess.PIPE, check=True, timeout=timeout)
+    return r.stdout.decode()
+
+
+def render_all(source: str, outs: list[Path], engine: str = "dot", timeout: float | None = None) -> None:
+    """
+    Render dot source to each of outs, the format is the suffix of each out.
+
+    The source is laid out once by the engine, and the formats are rendered from the layout concurrently.
+    timeout applies to the layout and each render, see render_source.
+    """
+    if len(outs) == 1:
+        render_source(source, outs[0], engine=engine, timeout=timeout)
+        return
+    laid_out = layout(source, engine=engine, timeout=timeout)
+    with ThreadPoolExecutor(max_workers=len(outs)) as executor:
+        futures = [executor.submit(render_source, laid_out, out, timeout=timeout, neato_no_op=True) for out in outs]
+        for f in futures:
+            f.result()
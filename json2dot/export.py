@@ -0,0 +1,130 @@
+"""
+Columnar export of stat and ranking.
+
+An export is an NPZ file, a zip of .npy arrays, so numpy.load reads it without parsing JSON.
+It is written with the standard library, NumPy is not required.
+All arrays are 1-D and little-endian, int64 (i8), float64 (f8) or uint8 (u1).
+
+  names           u1  node ids encoded in UTF-8 and concatenated
+  name_offsets    i8  node id i is names[name_offsets[i]:name_offsets[i + 1]]
+  degrees         i8  degree of node i, 0 if the node has no edges
+  edge_src        i8  src node index of each edge, in the order of the stat
+  edge_dst        i8  dst node index of each edge
+  edge_weights    i8  weight of each edge
+  node_ranking            i8  node indexes in descending order of degrees
+  node_value_percentiles  f8  cumulative degree percentile of each node of node_ranking
+  edge_ranking            i8  edge indexes (of edge_src) in descending order of weights
+  edge_value_percentiles  f8  cumulative weight percentile of each edge of edge_ranking
+
+Group stats of level L are stored in the same layout with the prefix groupL_ (group0_names, ...),
+node ids are group names.
+"""
+
+import ast
+import sys
+import zipfile
+from array import array
+from pathlib import Path
+from typing import IO, Any
+
+from .stat import Ranking
+
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+
+descrs = {"q": "<i8", "d": "<f8", "B": "|u1"}
+"""NumPy dtype by array typecode."""
+
+
+class ExportException(Exception):
+    pass
+
+
+def npy(a: "array[Any]") -> bytes:
+    """Return a 1-D array in .npy format (version 1.0)."""
+    header = f"{{'descr': '{descrs[a.typecode]}', 'fortran_order': False, 'shape': ({len(a)},), }}"
+    # magic, header length and header are aligned to 64 bytes, the header ends with a newline
+    pad = -(len(NPY_MAGIC) + 2 + len(header) + 1) % 64
+    header += " " * pad + "\n"
+    if sys.byteorder == "big" and a.itemsize > 1:
+        a = array(a.typecode, a)
+        a.byteswap()
+    return NPY_MAGIC + len(header).to_bytes(2, "little") + header.encode("latin1") + a.tobytes()
+
+
+def from_npy(data: bytes) -> "array[Any]":
+    """
+    Return the array of .npy data written by npy.
+
+    Raise ExportException if data is not a 1-D array of the supported dtypes.
+    """
+    if not data.startswith(NPY_MAGIC):
+        raise ExportException("not npy version 1.0")
+    n = int.from_bytes(data[8:10], "little")
+    try:
+        header = ast.literal_eval(data[10 : 10 + n].decode("latin1"))
+    except (ValueError, SyntaxError) as e:
+        raise ExportException(f"broken npy header, {e}") from e
+    typecodes = {v: k for k, v in descrs.items()}
+    if header.get("descr") not in typecodes or header.get("fortran_order") or len(header.get("shape", ())) != 1:
+        raise ExportException(f"unsupported npy header {header}")
+    a = array(typecodes[header["descr"]])
+    a.frombytes(data[10 + n :])
+    if sys.byteorder == "big" and a.itemsize > 1:
+        a.byteswap()
+    if len(a) != header["shape"][0]:
+        raise ExportException(f"broken npy, {len(a)} != {header['shape'][0]}")
+    return a
+
+
+def arrays(ranking: Ranking, prefix: str = "") -> dict[str, "array[Any]"]:
+    """Return the arrays of the stat and ranking, see the module docstring."""
+    stat = ranking.stat
+    names = array("B")
+    offsets = array("q", [0])
+    for x in stat.interner.names:
+        names.frombytes(x.encode())
+        offsets.append(len(names))
+    edge_index = {k: i for i, (k, _) in enumerate(stat.edges.keys())}
+    edges = list(stat.edges.indexes())
+    r: dict[str, "array[Any]"] = {
+        "names": names,
+        "name_offsets": offsets,
+        "degrees": array("q", (stat.nodes.get_index(i) for i in range(len(stat.interner)))),
+        "edge_src": array("q", (x[0] for x in edges)),
+        "edge_dst": array("q", (x[1] for x in edges)),
+        "edge_weights": array("q", (x[2] for x in edges)),
+        "node_ranking": array("q", ranking.nodes.keys),
+        "node_value_percentiles": array("d", ranking.nodes.value_percentiles),
+        "edge_ranking": array("q", (edge_index[k] for k in ranking.edges.keys)),
+        "edge_value_percentiles": array("d", ranking.edges.value_percentiles),
+    }
+    return {f"{prefix}{k}": v for k, v in r.items()}
+
+
+def dump(f: IO[bytes], ranking: Ranking, grouped_rankings: list[Ranking] | None = None) -> None:
+    """Write the export of ranking and group rankings by level to f."""
+    with zipfile.ZipFile(f, "w", compression=zipfile.ZIP_STORED) as z:
+        r = arrays(ranking)
+        for i, x in enumerate(grouped_rankings or []):
+            r.update(arrays(x, f"group{i}_"))
+        for k, v in r.items():
+            z.writestr(f"{k}.npy", npy(v))
+
+
+def save(path: Path, ranking: Ranking, grouped_rankings: list[Ranking] | None = None) -> None:
+    """Write the export to path, see dump."""
+    with open(path, "wb") as f:
+        dump(f, ranking, grouped_rankings)
+
+
+def load(path: Path) -> dict[str, "array[Any]"]:
+    """
+    Read the arrays of the export by name.
+
+    Raise ExportException if path is not an export.
+    """
+    try:
+        with zipfile.ZipFile(path) as z:
+            return {x.removesuffix(".npy"): from_npy(z.read(x)) for x in z.namelist()}
+    except zipfile.BadZipFile as e:
+        raise ExportException(f"broken export, {e}") from e
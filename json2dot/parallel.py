@@ -0,0 +1,169 @@
+import io
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Collection, Iterable
+
+from . import reader
+from .build import Accumulator
+from .decoder import new_decoder
+from .row import MergePolicy, NodeMap
+from .stat import Stat
+
+
+def split_lines(data: bytes | mmap.mmap, n: int) -> list[tuple[int, int]]:
+    """
+    Split data into at most n byte ranges.
+
+    Each range ends at a line boundary.
+    """
+    size = len(data)
+    ranges = []
+    start = 0
+    for i in range(1, n):
+        end = data.find(b"\n", max(start, size * i // n))
+        end = size if end < 0 else end + 1
+        if end > start:
+            ranges.append((start, end))
+            start = end
+    if start < size:
+        ranges.append((start, size))
+    return ranges
+
+
+def __fold(
+    lines: Iterable[bytes],
+    ignore_selfloop: bool,
+    keep_source: bool,
+    policy: MergePolicy,
+    decoder: str,
+    keys: Collection[str],
+    weight_key: str | None,
+) -> tuple[NodeMap, Stat]:
+    acc = Accumulator(
+        ignore_selfloop=ignore_selfloop,
+        keep_source=keep_source,
+        policy=policy,
+        decoder=new_decoder(decoder, keys),
+        weight_key=weight_key,
+    ).consume(lines)
+    return acc.nodes, acc.stat
+
+
+def __consume(
+    chunk: bytes,
+    ignore_selfloop: bool,
+    keep_source: bool,
+    policy: MergePolicy,
+    decoder: str,
+    keys: Collection[str],
+    weight_key: str | None,
+) -> tuple[NodeMap, Stat]:
+    return __fold(io.BytesIO(chunk), ignore_selfloop, keep_source, policy, decoder, keys, weight_key)
+
+
+def __consume_range(
+    byte_range: tuple[int, int],
+    path: Path,
+    ignore_selfloop: bool,
+    keep_source: bool,
+    policy: MergePolicy,
+    decoder: str,
+    keys: Collection[str],
+    weight_key: str | None,
+) -> tuple[NodeMap, Stat]:
+    with reader.open_mmap(path) as mm:
+        start, end = byte_range
+        lines = reader.mmap_lines(mm, start, end) if isinstance(mm, mmap.mmap) else io.BytesIO(mm[start:end])
+        return __fold(lines, ignore_selfloop, keep_source, policy, decoder, keys, weight_key)
+
+
+def consume(
+    data: bytes,
+    jobs: int,
+    ignore_selfloop: bool = False,
+    keep_source: bool = False,
+    policy: MergePolicy = MergePolicy.LAST,
+    decoder: str = "auto",
+    keys: Collection[str] = (),
+    weight_key: str | None = None,
+) -> Accumulator:
+    """
+    Fold rows from data using jobs processes.
+
+    Data is split into chunks of lines, each chunk is folded in a worker,
+    then partial results are merged in the order of chunks.
+    So the result is the same as folding data by a single Accumulator.
+    keys are the keys of rows to keep in Row.attrs, they should include weight_key.
+    """
+    d = new_decoder(decoder, keys)
+    acc = Accumulator(
+        ignore_selfloop=ignore_selfloop, keep_source=keep_source, policy=policy, decoder=d, weight_key=weight_key
+    )
+    ranges = split_lines(data, jobs)
+    if jobs <= 1 or len(ranges) <= 1:
+        return acc.consume(io.BytesIO(data))
+
+    f = partial(
+        __consume,
+        ignore_selfloop=ignore_selfloop,
+        keep_source=keep_source,
+        policy=policy,
+        decoder=d.name,
+        keys=keys,
+        weight_key=weight_key,
+    )
+    with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+        for nodes, stat in executor.map(f, (data[start:end] for start, end in ranges)):
+            acc.nodes.merge(nodes)
+            acc.stat.merge(stat)
+    return acc
+
+
+def consume_file(
+    path: Path,
+    jobs: int,
+    ignore_selfloop: bool = False,
+    keep_source: bool = False,
+    policy: MergePolicy = MergePolicy.LAST,
+    decoder: str = "auto",
+    keys: Collection[str] = (),
+    weight_key: str | None = None,
+) -> Accumulator:
+    """
+    Fold rows from the file using jobs processes, see consume.
+
+    A plain file is memory-mapped and split into byte ranges at line boundaries,
+    each worker maps the file again and folds its range, so no data is sent to the workers.
+    A compressed file, a pipe or a FIFO cannot be split, it is read (and decompressed) into memory first.
+    """
+    d = new_decoder(decoder, keys)
+    acc = Accumulator(
+        ignore_selfloop=ignore_selfloop, keep_source=keep_source, policy=policy, decoder=d, weight_key=weight_key
+    )
+    if not reader.is_regular(path) or reader.compression(path) is not None:
+        with reader.open_lines(path) as lines:
+            data = b"".join(lines)
+        return acc.merge(consume(data, jobs, ignore_selfloop, keep_source, policy, d.name, keys, weight_key))
+
+    with reader.open_mmap(path) as mm:
+        ranges = split_lines(mm, jobs)
+        if jobs <= 1 or len(ranges) <= 1:
+            return acc.consume(reader.mmap_lines(mm) if isinstance(mm, mmap.mmap) else io.BytesIO(mm))
+
+    f = partial(
+        __consume_range,
+        path=path,
+        ignore_selfloop=ignore_selfloop,
+        keep_source=keep_source,
+        policy=policy,
+        decoder=d.name,
+        keys=keys,
+        weight_key=weight_key,
+    )
+    with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+        for nodes, stat in executor.map(f, ranges):
+            acc.nodes.merge(nodes)
+            acc.stat.merge(stat)
+    return acc
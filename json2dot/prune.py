@@ -0,0 +1,148 @@
+import heapq
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import Iterable
+
+from .stat import EdgeStat, Interner, Stat
+
+fold_prefix = "__json2dot__prune__fold__"
+"""Prefix of the ids of folded nodes, so that they do not collide with the node ids of input."""
+
+
+def fold_id(label: str) -> str:
+    """Return the id of the folded node labelled label."""
+    return fold_prefix + label
+
+
+def fold_label(node_id: str) -> str | None:
+    """Return the label of the folded node, or None if node_id is not a folded node."""
+    return node_id.removeprefix(fold_prefix) if node_id.startswith(fold_prefix) else None
+
+
+def select(items: Iterable[tuple[int, int]], top: int | None = None, percentile: float | None = None) -> set[int]:
+    """
+    Return the keys of (key, value) items to keep.
+
+    If top, keep the top items by value, ties in the order of items, as Ranking.
+    If percentile, keep items whose cumulative value percentile in Ranking is within percentile.
+    The top items are selected by a heap, so items are not fully sorted unless only percentile is given.
+    """
+    items = list(items)
+    if top is not None:
+        order = heapq.nlargest(top, items, key=itemgetter(1))
+    elif percentile is not None:
+        order = sorted(items, key=itemgetter(1), reverse=True)
+    else:
+        return {k for k, _ in items}
+    if percentile is None:
+        return {k for k, _ in order}
+
+    total = sum(v for _, v in items)
+    r = set()
+    acc = 0
+    for k, v in order:
+        acc += v
+        if 100 * acc / total > percentile:
+            break
+        r.add(k)
+    return r
+
+
+@dataclass
+class Pruning:
+    """
+    Drop low ranked nodes and edges before drawing.
+
+    A node or an edge is kept if it meets all of the given conditions, each against the unpruned stat:
+    within the top_* by degree or weight, within the *_percentile of Ranking,
+    and for edges, weight not less than min_count.
+    Edges of dropped nodes are folded into the node labelled other if given, otherwise dropped.
+    The folded node has the id fold_id(other), so it does not merge with a node whose id is other.
+    Nodes without kept edges are dropped.
+    """
+
+    top_nodes: int | None = None
+    top_edges: int | None = None
+    node_percentile: float | None = None
+    edge_percentile: float | None = None
+    min_count: int = 0
+    other: str | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return (
+            self.top_nodes is not None
+            or self.top_edges is not None
+            or self.node_percentile is not None
+            or self.edge_percentile is not None
+            or self.min_count > 0
+        )
+
+    def run(self, stat: Stat, ignore_selfloop: bool = False) -> Stat:
+        """Build a new pruned stat, return stat itself if nothing to prune."""
+        if not self.enabled:
+            return stat
+
+        nodes: set[int] | None = None
+        if self.top_nodes is not None or self.node_percentile is not None:
+            nodes = select(stat.nodes.indexes(), self.top_nodes, self.node_percentile)
+        edges: set[int] | None = None
+        if self.top_edges is not None or self.edge_percentile is not None:
+            edges = select(stat.edges.keys(), self.top_edges, self.edge_percentile)
+
+        r = Stat.default()
+        names = stat.interner.names
+        index = [-1] * len(names)  # node index of stat to node index of r
+        intern = r.interner.intern
+
+        def node(i: int) -> int:
+            if nodes is not None and i not in nodes:
+                return -1 if self.other is None else intern(fold_id(self.other))
+            if index[i] < 0:
+                index[i] = intern(names[i])
+            return index[i]
+
+        for key, c in stat.edges.keys():
+            if c < self.min_count or (edges is not None and key not in edges):
+                continue
+            s, d = EdgeStat.unpack(key)
+            si = node(s)
+            di = node(d)
+            if si < 0 or di < 0 or (ignore_selfloop and si == di):
+                continue
+            r.add_index(si, di, c)
+        return r
+
+
+def fold_leaves(stat: Stat, ignore_selfloop: bool = False) -> Stat:
+    """
+    Build a new stat by folding leaves, the nodes connected to only one other node.
+
+    The leaves of a node are folded into the node labelled "NODE_ID (+N)", N is the number of the leaves,
+    its id is given by fold_id.
+    A node with only one leaf keeps it.
+    If ignore_selfloop, ignore edges between the leaves of the same node.
+    """
+    names = stat.interner.names
+    neighbor = [-1] * len(names)  # the only neighbor, or -2 if more than one
+    for s, d, _ in stat.edges.indexes():
+        if s == d:
+            continue
+        for a, b in ((s, d), (d, s)):
+            if neighbor[a] == -1:
+                neighbor[a] = b
+            elif neighbor[a] != b:
+                neighbor[a] = -2
+
+    leaves = [0] * len(names)
+    for x in neighbor:
+        if x >= 0:
+            leaves[x] += 1
+    groups = Interner()
+    index = [
+        groups.intern(
+            fold_id(f"{fold_label(names[n]) or names[n]} (+{leaves[n]})") if n >= 0 and leaves[n] > 1 else names[i]
+        )
+        for i, n in enumerate(neighbor)
+    ]
+    return stat.collapse(index, groups.names, ignore_selfloop=ignore_selfloop)
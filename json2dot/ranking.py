@@ -1,7 +1,11 @@
+from array import array
 from dataclasses import dataclass
-from typing import Generic, TypeVar
+from typing import Callable, Generic, Sequence, TypeVar
+
+from . import vector
 
 K = TypeVar("K")
+T = TypeVar("T")
 
 
 @dataclass
@@ -13,32 +17,106 @@ class RankingElement(Generic[K]):
     value_percentile: float
 
 
-@dataclass
 class Ranking(Generic[K]):
-    elems: list[RankingElement[K]]
-    elem_map: dict[K, RankingElement[K]]
+    """
+    Ranking of values in descending order.
+
+    Keys, values and cumulative value percentiles are kept in flat lists,
+    RankingElements are built on demand.
+    """
+
+    def __init__(self, keys: list[K], values: Sequence[int], value_percentiles: Sequence[float]) -> None:
+        self.__keys = keys
+        self.__values = values if isinstance(values, array) else array("q", values)
+        self.__value_percentiles = (
+            value_percentiles if isinstance(value_percentiles, array) else array("d", value_percentiles)
+        )
+        self.__index: dict[K, int] = {k: i for i, k in enumerate(keys)}
 
     @staticmethod
     def build(data: dict[K, int]) -> "Ranking[K]":
-        xs = [(k, v) for k, v in data.items()]
-        xs.sort(key=lambda x: x[1], reverse=True)
+        return Ranking.new(list(data.keys()), list(data.values()))
 
-        elems = []
-        elem_map = {}
-        acc = 0
-        card = len(xs)
-        sum_value = sum(x[1] for x in xs)
-        for i, x in enumerate(xs):
-            value = x[1]
-            acc += x[1]
-            elem = RankingElement(
-                key=x[0],
-                value=value,
-                place=i + 1,
-                percentile=100 * (i + 1) / card,
-                value_percentile=100 * acc / sum_value,
+    @staticmethod
+    def new(keys: Sequence[K], values: Sequence[int]) -> "Ranking[K]":
+        """Build a new Ranking from keys and their values."""
+        np = vector.use(len(values))
+        if np is not None:
+            v = np.asarray(values, dtype=np.int64)
+            sorted_index = np.argsort(-v, kind="stable")
+            sorted_values = v[sorted_index]
+            values_array = array("q", sorted_values.tobytes())
+            value_percentiles = array("d", (100 * np.cumsum(sorted_values) / sorted_values.sum()).tobytes())
+            return Ranking(
+                keys=[keys[i] for i in sorted_index.tolist()],
+                values=values_array,
+                value_percentiles=value_percentiles,
             )
-            elems.append(elem)
-            elem_map[x[0]] = elem
 
-        return Ranking(elems=elems, elem_map=elem_map)
+        order = sorted(range(len(values)), key=values.__getitem__, reverse=True)
+        sum_value = sum(values)
+        value_percentiles = array("d")
+        acc = 0
+        for i in order:
+            acc += values[i]
+            value_percentiles.append(100 * acc / sum_value)
+        return Ranking(
+            keys=[keys[i] for i in order],
+            values=[values[i] for i in order],
+            value_percentiles=value_percentiles,
+        )
+
+    def __len__(self) -> int:
+        """Return the number of keys."""
+        return len(self.__keys)
+
+    @property
+    def keys(self) -> list[K]:
+        """Return keys in descending order of values."""
+        return self.__keys
+
+    def map_keys(self, f: Callable[[K], T]) -> "Ranking[T]":
+        """Return a new Ranking with keys replaced by f."""
+        return Ranking(
+            keys=[f(k) for k in self.__keys],
+            values=self.__values,
+            value_percentiles=self.__value_percentiles,
+        )
+
+    @property
+    def value_percentiles(self) -> Sequence[float]:
+        """Return cumulative value percentiles in descending order of values."""
+        return self.__value_percentiles
+
+    def index(self, key: K) -> int | None:
+        """Return the index of the key (place - 1), or None if not found."""
+        return self.__index.get(key)
+
+    def value_percentile(self, key: K, value: float = 100) -> float:
+        """
+        Return the cumulative value percentile of the key.
+
+        Return value if not found.
+        """
+        i = self.__index.get(key)
+        if i is None:
+            return value
+        return self.__value_percentiles[i]
+
+    def elem(self, i: int) -> RankingElement[K]:
+        """Return the element at i, place is i + 1."""
+        return RankingElement(
+            key=self.__keys[i],
+            value=self.__values[i],
+            place=i + 1,
+            percentile=100 * (i + 1) / len(self.__keys),
+            value_percentile=self.__value_percentiles[i],
+        )
+
+    @property
+    def elems(self) -> list[RankingElement[K]]:
+        return [self.elem(i) for i in range(len(self.__keys))]
+
+    @property
+    def elem_map(self) -> dict[K, RankingElement[K]]:
+        return {x.key: x for x in self.elems}
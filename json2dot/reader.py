@@ -0,0 +1,122 @@
+"""
+Read lines from an input file.
+
+Plain regular files are memory-mapped, gzip and zstd compressed files are decompressed as streams.
+Pipes, FIFOs and other files that cannot be mapped are read as buffered streams.
+The compression is detected by peeking the magic number, not by the suffix, so a pipe is read only once.
+"""
+
+import gzip
+import mmap
+import os
+import stat
+from contextlib import contextmanager
+from io import BufferedReader
+from pathlib import Path
+from typing import IO, Iterator
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class ReaderException(Exception):
+    pass
+
+
+def is_regular(path: Path) -> bool:
+    """Return True if path is a regular file, not a pipe, FIFO or device."""
+    return stat.S_ISREG(os.stat(path).st_mode)
+
+
+def detect_compression(f: BufferedReader) -> str | None:
+    """Return gzip or zstd if f is compressed, or None, without consuming f."""
+    head = f.peek(4)[:4]
+    if head.startswith(GZIP_MAGIC):
+        return "gzip"
+    if head.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return None
+
+
+def compression(path: Path) -> str | None:
+    """
+    Return gzip or zstd if path is compressed, or None.
+
+    This opens path, so reading a pipe or FIFO after this loses the data, use detect_compression for them.
+    """
+    with open(path, "rb") as f:
+        return detect_compression(f)
+
+
+def open_zstd(f: IO[bytes]) -> IO[bytes]:
+    """
+    Open zstd compressed stream as a binary stream.
+
+    Use compression.zstd of the standard library (Python 3.14+) or zstandard.
+    Raise ReaderException if neither is available.
+    """
+    try:
+        from compression import zstd
+
+        return zstd.open(f, "rb")  # type: ignore[no-any-return]
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ReaderException(f"{f.name} is zstd compressed, install zstandard to read it") from e
+    return zstandard.open(f, "rb")  # type: ignore[no-any-return]
+
+
+def mmap_lines(mm: mmap.mmap, start: int = 0, end: int | None = None) -> Iterator[bytes]:
+    """Yield lines of mm from start, until the line that contains end - 1."""
+    end = len(mm) if end is None else end
+    mm.seek(start)
+    readline = mm.readline
+    while mm.tell() < end:
+        yield readline()
+
+
+def __map(f: BufferedReader) -> mmap.mmap | None:
+    """Memory-map f read-only, return None if f is not a regular file, is empty or cannot be mapped."""
+    if not stat.S_ISREG(os.fstat(f.fileno()).st_mode):
+        return None
+    try:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (ValueError, OSError):  # empty, or the file system does not support mmap
+        return None
+    if hasattr(mm, "madvise"):
+        mm.madvise(mmap.MADV_SEQUENTIAL)
+    return mm
+
+
+@contextmanager
+def open_mmap(path: Path) -> Iterator[mmap.mmap | bytes]:
+    """Memory-map path read-only, yield the content as bytes if path cannot be mapped, e.g. it is empty."""
+    with open(path, "rb") as f:
+        mm = __map(f)
+        if mm is None:
+            yield f.read()
+            return
+        with mm:
+            yield mm
+
+
+@contextmanager
+def open_lines(path: Path) -> Iterator[Iterator[bytes]]:
+    """Yield an iterator of lines of path."""
+    with open(path, "rb") as f:
+        match detect_compression(f):
+            case "gzip":
+                with gzip.open(f, "rb") as g:
+                    yield iter(g)
+            case "zstd":
+                with open_zstd(f) as z:
+                    yield iter(z)
+            case _:
+                mm = __map(f)
+                if mm is None:
+                    yield iter(f)
+                    return
+                with mm:
+                    yield mmap_lines(mm)
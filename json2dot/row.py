@@ -1,12 +1,37 @@
 import json
 from dataclasses import dataclass, field
-from typing import Any
+from enum import Enum
+from typing import Any, Collection
 
 
 class RowException(Exception):
     pass
 
 
+class MergePolicy(Enum):
+    """How to merge descriptions of nodes with the same id."""
+
+    LAST = "last"  # later values win
+    FIRST = "first"  # the first non-empty description wins, later ones are ignored
+    NEW = "new"  # only keys not seen yet are added
+
+
+def parse_weight(value: Any) -> int:
+    """
+    Return the weight of a row from value, a non-negative integer.
+
+    None is 1, integral floats are accepted.
+    Raise RowException if value is not a non-negative integer.
+    """
+    if value is None:
+        return 1
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+        raise RowException(f"weight should be non-negative int, {value}")
+    return value
+
+
 @dataclass
 class Node:
     """Graph node."""
@@ -33,6 +58,22 @@ class Node:
             raise RowException(f"cannot join Node, {self.id} != {other.id}")
         return Node(id=self.id, desc={**self.desc, **other.desc})
 
+    def merge(self, other: "Node", policy: MergePolicy = MergePolicy.LAST) -> None:
+        """Merge the description of other into this node in place."""
+        if self.id != other.id:
+            raise RowException(f"cannot merge Node, {self.id} != {other.id}")
+        if not other.desc:
+            return
+        match policy:
+            case MergePolicy.LAST:
+                self.desc.update(other.desc)
+            case MergePolicy.FIRST:
+                if not self.desc:
+                    self.desc.update(other.desc)
+            case MergePolicy.NEW:
+                for k, v in other.desc.items():
+                    self.desc.setdefault(k, v)
+
 
 @dataclass
 class Row:
@@ -40,10 +81,21 @@ class Row:
 
     src: Node
     dst: Node
+    attrs: dict[str, Any] = field(default_factory=dict)  # other selected values of row
+
+    @classmethod
+    def loads(cls, s: str | bytes, keys: Collection[str] = ()) -> "Row":
+        return cls.new(json.loads(s), keys)
 
     @classmethod
-    def loads(cls, s: str) -> "Row":
-        obj = json.loads(s)
+    def new(cls, obj: Any, keys: Collection[str] = ()) -> "Row":
+        """
+        Build a new Row from decoded object.
+
+        Values of keys other than src and dst are kept in attrs if found.
+        """
+        if not isinstance(obj, dict):
+            raise RowException(f"row should be dict, {obj}")
         if "src" not in obj:
             raise RowException('"src" required')
         src = obj["src"]
@@ -54,15 +106,33 @@ class Row:
         dst = obj["dst"]
         if not isinstance(dst, dict):
             raise RowException(f'"dst" should be dict, {dst}')
-        return Row(src=Node.new(src), dst=Node.new(dst))
+        return cls.from_nodes(src, dst, {k: obj[k] for k in keys if k in obj})
+
+    @classmethod
+    def from_nodes(cls, src: dict[str, Any], dst: dict[str, Any], attrs: dict[str, Any] | None = None) -> "Row":
+        """Build a new Row from src and dst objects."""
+        return Row(src=Node.new(src), dst=Node.new(dst), attrs=attrs if attrs is not None else {})
+
+    def weight(self, key: str | None = None) -> int:
+        """Return the weight of the row, the value of key in attrs, 1 if key is None or not found."""
+        if key is None:
+            return 1
+        return parse_weight(self.attrs.get(key))
 
 
 class NodeMap:
-    """node_id to Node map."""
+    """
+    node_id to Node map.
+
+    If not keep_source, added rows are not kept and source is always empty.
+    Descriptions of nodes with the same id are merged in place according to policy.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, keep_source: bool = True, policy: MergePolicy = MergePolicy.LAST) -> None:
         self.__map: dict[str, Node] = {}
         self.__source: list[Row] = []
+        self.__keep_source = keep_source
+        self.__policy = policy
 
     @property
     def map(self) -> dict[str, Node]:
@@ -72,19 +142,44 @@ class NodeMap:
     def source(self) -> list[Row]:
         return self.__source
 
+    @property
+    def keep_source(self) -> bool:
+        return self.__keep_source
+
+    @property
+    def policy(self) -> MergePolicy:
+        return self.__policy
+
+    def add_node(self, node: Node) -> None:
+        """Add a node without an edge, merge if the id is already added."""
+        self.__add_node(node)
+
     def __add_node(self, node: Node) -> None:
         n = self.__map.get(node.id)
         if n is None:
-            self.__map[node.id] = node
+            # copy once so that merging in place does not modify the kept row
+            self.__map[node.id] = Node(id=node.id, desc=dict(node.desc)) if self.__keep_source else node
             return
-        self.__map[node.id] = n.join(node)
+        n.merge(node, self.__policy)
 
     def add(self, row: Row) -> None:
         """
         Add an edge to map.
 
-        Nodes with duplicated ids will be joined.
+        Nodes with duplicated ids will be merged.
         """
-        self.__source.append(row)
+        if self.__keep_source:
+            self.__source.append(row)
         self.__add_node(row.src)
         self.__add_node(row.dst)
+
+    def merge(self, other: "NodeMap") -> None:
+        """
+        Add all nodes of other to map.
+
+        Descriptions of other are merged as if they were added after the ones of this, according to the policy of this.
+        """
+        if self.__keep_source:
+            self.__source.extend(other.source)
+        for node in other.map.values():
+            self.__add_node(node)
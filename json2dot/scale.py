@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from typing import Sequence
 
+from . import vector
 from .mathx import Clamp
 from .stat import Ranking
 
@@ -12,6 +14,10 @@ class Setting(ABC):
     def __call__(self, percentile: float) -> float:
         """Return scaled value."""
 
+    def scale_all(self, percentiles: Sequence[float]) -> list[float]:
+        """Return scaled values."""
+        return [self(x) for x in percentiles]
+
 
 class ClampSetting(Setting):
     """Scale range using clamp."""
@@ -24,6 +30,16 @@ class ClampSetting(Setting):
         v = (self.clamp.maximum - self.clamp.minimum) * percentile / 100 + self.clamp.minimum
         return self.clamp(v)
 
+    def scale_all(self, percentiles: Sequence[float]) -> list[float]:
+        """Return scaled values, vectorized if possible."""
+        np = vector.use(len(percentiles))
+        if np is None:
+            return super().scale_all(percentiles)
+        v = (self.clamp.maximum - self.clamp.minimum) * np.asarray(percentiles, dtype=np.float64) / 100
+        v += self.clamp.minimum
+        r: list[float] = np.clip(v, self.clamp.minimum, self.clamp.maximum).tolist()
+        return r
+
 
 class FixedSetting(Setting):
     """Fixed scale."""
@@ -35,6 +51,10 @@ class FixedSetting(Setting):
         """Return scaled value."""
         return self.clamp.maximum
 
+    def scale_all(self, percentiles: Sequence[float]) -> list[float]:
+        """Return scaled values."""
+        return [self.clamp.maximum] * len(percentiles)
+
 
 @dataclass
 class Scaler:
@@ -46,36 +66,41 @@ class Scaler:
     weight: Setting
     fontsize: Setting
 
-    @property
-    def __node_top_percentile(self) -> float:
-        return self.ranking.nodes.elems[0].value_percentile
-
-    @property
-    def __edge_top_percentile(self) -> float:
-        return self.ranking.edges.elems[0].value_percentile
-
-    def __get_node_percentile(self, node_id: str) -> float:
-        if node_id not in self.ranking.nodes.elem_map:
-            return 100  # lowest
-        return self.ranking.nodes.elem_map[node_id].value_percentile
-
-    def __get_edge_percentile(self, src_node_id: str, dst_node_id: str) -> float:
-        key = (src_node_id, dst_node_id)
-        if key not in self.ranking.edges.elem_map:
-            return 100  # lowest
-        return self.ranking.edges.elem_map[key].value_percentile
+    def __post_init__(self) -> None:
+        """Scale all nodes and edges at once in the order of ranking."""
+        node_percentiles = self.__reverse(self.ranking.nodes.value_percentiles)
+        edge_percentiles = self.__reverse(self.ranking.edges.value_percentiles)
+        self.__fontsizes = self.fontsize.scale_all(node_percentiles)
+        self.__penwidths = self.penwidth.scale_all(edge_percentiles)
+        self.__arrowsizes = self.arrowsize.scale_all(edge_percentiles)
+        self.__weights = self.weight.scale_all(edge_percentiles)
+
+    @staticmethod
+    def __reverse(value_percentiles: Sequence[float]) -> Sequence[float]:
+        """Return 100 - x for each, the higher the rank, the larger the value."""
+        np = vector.use(len(value_percentiles))
+        if np is None:
+            return [100 - x for x in value_percentiles]
+        r: Sequence[float] = 100 - np.asarray(value_percentiles, dtype=np.float64)
+        return r
 
     def get_fontsize(self, node_id: str) -> float:
-        return self.fontsize(100 - self.__get_node_percentile(node_id))
+        i = self.ranking.node_index(node_id)
+        if i is None:
+            return self.fontsize(0)  # lowest
+        return self.__fontsizes[i]
 
-    def __get_edge(self, src: str, dst: str, setting: Setting) -> float:
-        return setting(100 - self.__get_edge_percentile(src, dst))
+    def __get_edge(self, src: str, dst: str, setting: Setting, values: list[float]) -> float:
+        i = self.ranking.edge_index(src, dst)
+        if i is None:
+            return setting(0)  # lowest
+        return values[i]
 
     def get_penwidth(self, src_node_id: str, dst_node_id: str) -> float:
-        return self.__get_edge(src_node_id, dst_node_id, self.penwidth)
+        return self.__get_edge(src_node_id, dst_node_id, self.penwidth, self.__penwidths)
 
     def get_arrowsize(self, src_node_id: str, dst_node_id: str) -> float:
-        return self.__get_edge(src_node_id, dst_node_id, self.arrowsize)
+        return self.__get_edge(src_node_id, dst_node_id, self.arrowsize, self.__arrowsizes)
 
     def get_weight(self, src_node_id: str, dst_node_id: str) -> float:
-        return self.__get_edge(src_node_id, dst_node_id, self.weight)
+        return self.__get_edge(src_node_id, dst_node_id, self.weight, self.__weights)
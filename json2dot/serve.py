@@ -0,0 +1,290 @@
+"""
+Keep the graph resident and redraw it as rows arrive.
+
+Rows are read from stdin, --input, a FIFO, a Unix socket or a followed file and folded into an Accumulator.
+A background thread redraws the graph when new rows arrive, at most once per debounce seconds,
+and every interval seconds if given.
+Ingestion and drawing the source share a lock, rendering the source runs the dot subprocess outside of it,
+so ingestion never waits for dot.
+"""
+
+import io
+import os
+import socketserver
+import stat
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import IO, Callable, Iterable, Iterator
+
+from .build import Accumulator
+from .cache import RenderCache
+from .cli import new_accumulator, new_draw, new_parser, reduce
+from .columnar import detect_format
+from .dot import render_all
+from .reader import open_lines
+from .row import Row, RowException
+from .timings import Timings
+from .window import WindowAccumulator
+
+
+class Server:
+    """
+    Fold rows into acc and redraw on a background thread.
+
+    draw returns the dot source of acc, called with the lock held.
+    render saves the source, called without the lock.
+    """
+
+    def __init__(
+        self,
+        acc: Accumulator,
+        draw: Callable[[Accumulator], str],
+        render: Callable[[str], None],
+        debounce: float = 1.0,
+        interval: float | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.__acc = acc
+        self.__draw = draw
+        self.__render = render
+        self.__debounce = debounce
+        self.__interval = interval
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__wake = threading.Event()
+        self.__stopped = threading.Event()
+        self.__thread: threading.Thread | None = None
+        self.__version = 0
+        self.__rendered = 0
+        self.__renders = 0
+
+    @property
+    def renders(self) -> int:
+        """Return the number of renders so far."""
+        return self.__renders
+
+    def feed(self, lines: Iterable[str | bytes]) -> int:
+        """Fold rows from text, skip invalid rows with a notice to stderr, return the number of folded rows."""
+        loads = self.__acc.decoder.loads
+        n = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                row = loads(line)
+                self.__add(row)
+            except (RowException, ValueError) as e:
+                print(f"skip row, {e}", file=sys.stderr)
+                continue
+            n += 1
+            self.__wake.set()
+        return n
+
+    def __add(self, row: Row) -> None:
+        with self.__lock:
+            self.__acc.add(row)
+            self.__version += 1
+
+    def render(self) -> None:
+        """Draw and render the graph now."""
+        with self.__lock:
+            if isinstance(self.__acc, WindowAccumulator):
+                self.__acc.window.expire(self.__clock())
+            version = self.__version
+            source = self.__draw(self.__acc)
+        self.__render(source)
+        self.__rendered = version
+        self.__renders += 1
+
+    def start(self) -> None:
+        """Start the render thread."""
+        self.__thread = threading.Thread(target=self.__loop, name="json2dot-render", daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """Stop the render thread and render rows not rendered yet."""
+        self.__stopped.set()
+        self.__wake.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+        if self.__version != self.__rendered or self.__renders == 0:
+            self.render()
+
+    def __loop(self) -> None:
+        while True:
+            self.__wake.wait(self.__interval)
+            self.__wake.clear()
+            # coalesce rows arriving within debounce into one render
+            if self.__stopped.is_set() or self.__stopped.wait(self.__debounce):
+                return
+            try:
+                self.render()
+            except Exception as e:
+                print(f"render failed, {e}", file=sys.stderr)
+
+
+def save(outs: list[Path], source: str, engine: str = "dot", cache: RenderCache | None = None) -> None:
+    """
+    Save source to each of outs.
+
+    Write dot source atomically if the suffix is .dot or .gv, render the others from a single layout,
+    through cache if given.
+    """
+    rest = []
+    for out in outs:
+        if out.suffix not in (".dot", ".gv"):
+            rest.append(out)
+            continue
+        tmp = out.with_name(f".{out.name}.tmp")
+        with open(tmp, "w") as f:
+            f.write(source)
+        os.replace(tmp, out)
+    if rest:
+        render = render_all if cache is None else cache.render_all
+        render(source, rest, engine=engine)
+
+
+def follow(path: Path, poll: float = 0.5, stopped: threading.Event | None = None) -> Iterator[bytes]:
+    """
+    Yield lines of path from the beginning, like tail -F.
+
+    Wait poll seconds for more data at the end of the file.
+    Start over if the file is truncated, reopen it if it is replaced.
+    Stop when stopped is set.
+    """
+    stopped = stopped if stopped is not None else threading.Event()
+    while not path.exists():
+        if stopped.wait(poll):
+            return
+    f = open(path, "rb")
+    try:
+        partial = b""
+        while True:
+            line = f.readline()
+            if line.endswith(b"\n"):
+                yield partial + line
+                partial = b""
+                continue
+            partial += line
+            if stopped.wait(poll):
+                return
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            if st.st_ino != os.fstat(f.fileno()).st_ino:
+                f.close()
+                f = open(path, "rb")
+                partial = b""
+            elif st.st_size < f.tell():
+                f.seek(0)
+                partial = b""
+    finally:
+        f.close()
+
+
+def fifo(path: Path) -> Iterator[bytes]:
+    """Yield lines of the FIFO, make it if not exists, reopen it when writers close it."""
+    if not path.exists():
+        os.mkfifo(path)
+    while True:
+        with open(path, "rb") as f:
+            yield from f
+
+
+def unix_server(path: Path, server: Server) -> socketserver.ThreadingUnixStreamServer:
+    """Return a new server that feeds lines from the clients connected to the Unix socket path into server."""
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            server.feed(self.rfile)
+
+    if path.exists() and stat.S_ISSOCK(path.stat().st_mode):
+        path.unlink()
+    s = socketserver.ThreadingUnixStreamServer(str(path), Handler)
+    s.daemon_threads = True
+    return s
+
+
+def dumps(draw: Callable[[io.StringIO], None]) -> str:
+    """Return what draw writes."""
+    buf = io.StringIO()
+    draw(buf)
+    return buf.getvalue()
+
+
+def main(argv: list[str] | None = None, stdin: IO[bytes] | None = None) -> int:
+    """
+    Entry point of json2dot serve.
+
+    argv defaults to sys.argv[1:].
+    """
+    parser = new_parser("json2dot serve")
+    parser.description = (
+        "Keep the graph in memory, fold rows from stdin, a FIFO, a Unix socket or a followed file, "
+        "and redraw it to --out as rows arrive. Options other than below are the same as json2dot."
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--fifo", action="store", type=Path, help="read rows from the FIFO, make it if not exists")
+    source.add_argument("--socket", action="store", type=Path, help="read rows from clients of the Unix socket")
+    source.add_argument("--follow", action="store", type=Path, help="read rows appended to the file, like tail -F")
+    parser.add_argument(
+        "--debounce",
+        action="store",
+        type=float,
+        default=1.0,
+        help="seconds to wait for more rows before redrawing. Default: 1",
+    )
+    parser.add_argument("--interval", action="store", type=float, help="redraw every INTERVAL seconds")
+    args = parser.parse_args(argv)
+
+    if args.out is None:
+        parser.error("--out is required")
+    if (
+        args.jobs != 1
+        or args.snapshot is not None
+        or args.debug
+        or args.export is not None
+        or args.timings
+        or args.profile is not None
+        or args.render_timeout is not None
+    ):
+        parser.error(
+            "--jobs, --snapshot, --debug, --export, --timings, --profile and --render_timeout cannot be used with serve"
+        )
+    if (args.input_format if args.input_format != "auto" else detect_format(args.input)) != "jsonl":
+        parser.error("serve reads only jsonl")
+
+    timings = Timings.disabled()
+    cache = RenderCache(args.cache, args.cache_size << 20) if args.cache is not None else None
+    server = Server(
+        acc=new_accumulator(args),
+        draw=lambda acc: dumps(new_draw(args, acc.nodes, reduce(args, acc.stat, timings), timings).write),
+        render=lambda source: save(args.out, source, args.engine, cache),
+        debounce=args.debounce,
+        interval=args.interval,
+    )
+    server.start()
+    try:
+        if args.socket is not None:
+            with unix_server(args.socket, server) as s:
+                s.serve_forever()
+        elif args.fifo is not None:
+            server.feed(fifo(args.fifo))
+        elif args.follow is not None:
+            server.feed(follow(args.follow))
+        elif args.input is not None:
+            with open_lines(args.input) as lines:
+                server.feed(lines)
+        else:
+            server.feed(stdin if stdin is not None else sys.stdin.buffer)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        if cache is not None:
+            print(cache.dumps(), file=sys.stderr)
+    return 0
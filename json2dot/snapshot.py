@@ -0,0 +1,131 @@
+"""
+Snapshot of folded rows.
+
+A snapshot is a gzip compressed json object:
+
+  {
+    "version": 1,
+    "ignore_selfloop": IGNORE_SELFLOOP,
+    "merge_policy": MERGE_POLICY,
+    "weight_key": WEIGHT_KEY,
+    "nodes": {NODE_ID: DESC, ...},
+    "names": [NODE_ID, ...],
+    "edges": [SRC, DST, WEIGHT, ...]
+  }
+
+nodes are the merged node descriptions in the order of NodeMap.
+names are the node ids of the stat in the order of indexes.
+weight_key is null if rows are not weighted, it may be absent.
+edges are flattened triples of src node index, dst node index and weight in the order of the stat.
+Node degrees and group maps are not stored, they are derived from edges and descriptions.
+Description values that are not json, e.g. timestamps and bytes of parquet and arrow input, are stored as strings.
+"""
+
+import gzip
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+from .build import Accumulator
+from .decoder import Decoder
+from .row import MergePolicy, Node
+
+version = 1
+
+
+class SnapshotException(Exception):
+    pass
+
+
+def dumps(acc: Accumulator) -> bytes:
+    """Return the snapshot of acc, source rows are not included."""
+    edges: list[int] = []
+    for s, d, w in acc.stat.edges.indexes():
+        edges.extend((s, d, w))
+    obj = {
+        "version": version,
+        "ignore_selfloop": acc.ignore_selfloop,
+        "merge_policy": acc.nodes.policy.value,
+        "weight_key": acc.weight_key,
+        "nodes": {k: v.desc for k, v in acc.nodes.map.items()},
+        "names": acc.stat.interner.names,
+        "edges": edges,
+    }
+    return gzip.compress(json.dumps(obj, separators=(",", ":"), default=str).encode(), mtime=0)
+
+
+def loads(
+    data: bytes,
+    ignore_selfloop: bool = False,
+    keep_source: bool = False,
+    policy: MergePolicy = MergePolicy.LAST,
+    decoder: Decoder | None = None,
+    weight_key: str | None = None,
+) -> Accumulator:
+    """
+    Return a new Accumulator that has folded the rows of the snapshot.
+
+    Raise SnapshotException if the snapshot is broken or was built with another ignore_selfloop, policy or weight_key.
+    """
+    try:
+        obj: dict[str, Any] = json.loads(gzip.decompress(data))
+    except (OSError, EOFError, ValueError) as e:
+        raise SnapshotException(f"broken snapshot, {e}") from e
+    if obj.get("version") != version:
+        raise SnapshotException(f"unsupported snapshot version {obj.get('version')}, want {version}")
+    if obj.get("ignore_selfloop") != ignore_selfloop:
+        raise SnapshotException(f"snapshot was built with ignore_selfloop={obj.get('ignore_selfloop')}")
+    if obj.get("merge_policy") != policy.value:
+        raise SnapshotException(f"snapshot was built with merge_policy={obj.get('merge_policy')}")
+    if obj.get("weight_key") != weight_key:
+        raise SnapshotException(f"snapshot was built with weight_key={obj.get('weight_key')}")
+
+    acc = Accumulator(
+        ignore_selfloop=ignore_selfloop, keep_source=keep_source, policy=policy, decoder=decoder, weight_key=weight_key
+    )
+    for k, v in obj["nodes"].items():
+        acc.nodes.add_node(Node(id=k, desc=v))
+    interner = acc.stat.interner
+    for x in obj["names"]:
+        interner.intern(x)
+    edges: list[int] = obj["edges"]
+    n = len(interner)
+    if len(edges) % 3 != 0:
+        raise SnapshotException("broken snapshot, invalid edges")
+    for i in range(0, len(edges), 3):
+        s, d, w = edges[i : i + 3]
+        if not all(isinstance(x, int) for x in (s, d, w)) or not (0 <= s < n and 0 <= d < n):
+            raise SnapshotException(f"broken snapshot, invalid edge {s} {d}")
+        if w <= 0:
+            raise SnapshotException(f"broken snapshot, invalid weight {w} of edge {s} {d}")
+        acc.stat.add_index(s, d, w)
+    return acc
+
+
+def load(
+    path: Path,
+    ignore_selfloop: bool = False,
+    keep_source: bool = False,
+    policy: MergePolicy = MergePolicy.LAST,
+    decoder: Decoder | None = None,
+    weight_key: str | None = None,
+) -> Accumulator:
+    """Load the snapshot from path, see loads."""
+    with open(path, "rb") as f:
+        return loads(
+            f.read(),
+            ignore_selfloop=ignore_selfloop,
+            keep_source=keep_source,
+            policy=policy,
+            decoder=decoder,
+            weight_key=weight_key,
+        )
+
+
+def save(acc: Accumulator, path: Path) -> None:
+    """Save the snapshot of acc to path, replace the file atomically."""
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(dumps(acc))
+    os.replace(tmp, path)
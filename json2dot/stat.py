@@ -1,23 +1,117 @@
-from collections import defaultdict
+from array import array
 from dataclasses import dataclass
+from itertools import repeat
+from typing import Iterator, Sequence
 
 from .ranking import Ranking as RawRanking
 
 
-class NodeStat:
-    """Node degree map."""
+class Interner:
+    """Map node ids to dense indexes."""
+
+    def __init__(self) -> None:
+        self.__index: dict[str, int] = {}
+        self.__names: list[str] = []
+
+    def __len__(self) -> int:
+        """Return the number of node ids."""
+        return len(self.__names)
+
+    @property
+    def names(self) -> list[str]:
+        """Return node ids by index."""
+        return self.__names
+
+    def intern(self, name: str) -> int:
+        """Return the index of the node id, assign a new one if not found."""
+        i = self.__index.get(name)
+        if i is None:
+            i = len(self.__names)
+            self.__index[name] = i
+            self.__names.append(name)
+        return i
+
+    def get(self, name: str) -> int | None:
+        """Return the index of the node id, or None if not found."""
+        return self.__index.get(name)
+
+
+class Counts:
+    """Counts by dense index, missing indexes are 0."""
 
     def __init__(self) -> None:
-        self.__nodes: dict[str, int] = defaultdict(int)
+        self.__counts = array("q")
+
+    def __len__(self) -> int:
+        """Return the number of indexes."""
+        return len(self.__counts)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterate counts by index."""
+        return iter(self.__counts)
+
+    def add(self, index: int, count: int = 1) -> int:
+        """Add count to index and return the new count."""
+        if index >= len(self.__counts):
+            self.__counts.extend(repeat(0, index + 1 - len(self.__counts)))
+        self.__counts[index] += count
+        return self.__counts[index]
+
+    def get(self, index: int) -> int:
+        """Return the count of index."""
+        if index < len(self.__counts):
+            return self.__counts[index]
+        return 0
+
+
+class NodeStat:
+    """
+    Node degree map.
+
+    Degrees are kept by node index of interner, nodes with no degree are absent.
+    """
 
-    def add(self, node_id: str) -> None:
+    def __init__(self, interner: Interner | None = None) -> None:
+        self.__interner = interner if interner is not None else Interner()
+        self.__counts = Counts()
+
+    @property
+    def interner(self) -> Interner:
+        return self.__interner
+
+    def add(self, node_id: str, count: int = 1) -> None:
         """Add a node to stat."""
-        self.__nodes[node_id] += 1
+        self.add_index(self.__interner.intern(node_id), count)
+
+    def add_index(self, index: int, count: int = 1) -> None:
+        """Add a node to stat by node index."""
+        self.__counts.add(index, count)
+
+    def merge(self, other: "NodeStat") -> None:
+        """Add all nodes of other to stat."""
+        for node_id, c in other.items():
+            self.add(node_id, c)
+
+    def indexes(self) -> Iterator[tuple[int, int]]:
+        """Iterate node index and degree."""
+        for i, c in enumerate(self.__counts):
+            if c:
+                yield i, c
+
+    def items(self) -> Iterator[tuple[str, int]]:
+        """Iterate node_id and degree."""
+        names = self.__interner.names
+        for i, c in self.indexes():
+            yield names[i], c
 
     @property
     def nodes(self) -> dict[str, int]:
-        """Return the stat as dict (node_id to degree)."""
-        return self.__nodes
+        """Return the stat as a new dict (node_id to degree)."""
+        return dict(self.items())
+
+    def get_index(self, index: int) -> int:
+        """Get the degree of the node by node index, 0 if not found."""
+        return self.__counts.get(index)
 
     def get(self, node_id: str, value: int = -1) -> int:
         """
@@ -25,23 +119,91 @@ class NodeStat:
 
         Return value if not found.
         """
-        return self.__nodes.get(node_id, value)
+        i = self.__interner.get(node_id)
+        if i is None:
+            return value
+        c = self.__counts.get(i)
+        return c if c else value
 
 
 class EdgeStat:
-    """Edge weight map."""
+    """
+    Edge weight map.
 
-    def __init__(self) -> None:
-        self.__edges: dict[tuple[str, str], int] = defaultdict(int)
+    An edge is keyed by a pair of node indexes of interner packed into an int.
+    """
+
+    def __init__(self, interner: Interner | None = None) -> None:
+        self.__interner = interner if interner is not None else Interner()
+        self.__edges: dict[int, int] = {}
+
+    @property
+    def interner(self) -> Interner:
+        return self.__interner
+
+    @staticmethod
+    def pack(src_index: int, dst_index: int) -> int:
+        """Pack node indexes into an edge key."""
+        return src_index << 32 | dst_index
+
+    @staticmethod
+    def unpack(key: int) -> tuple[int, int]:
+        """Unpack an edge key into node indexes."""
+        return key >> 32, key & 0xFFFFFFFF
+
+    def __len__(self) -> int:
+        """Return the number of edges."""
+        return len(self.__edges)
 
-    def add(self, src_node_id: str, dst_node_id: str) -> None:
+    def add(self, src_node_id: str, dst_node_id: str, count: int = 1) -> None:
         """Add an edge to stat."""
-        self.__edges[(src_node_id, dst_node_id)] += 1
+        self.add_index(self.__interner.intern(src_node_id), self.__interner.intern(dst_node_id), count)
+
+    def add_index(self, src_index: int, dst_index: int, count: int = 1) -> int:
+        """
+        Add an edge to stat by node indexes, return the new weight.
+
+        count can be negative to remove the edge partially, the edge is removed when the weight becomes 0.
+        Raise ValueError if the weight becomes negative.
+        """
+        key = self.pack(src_index, dst_index)
+        w = self.__edges.get(key, 0) + count
+        if w > 0:
+            self.__edges[key] = w
+        elif w == 0:
+            self.__edges.pop(key, None)
+        else:
+            raise ValueError(f"negative weight {w} of edge {src_index} {dst_index}")
+        return w
+
+    def merge(self, other: "EdgeStat") -> None:
+        """Add all edges of other to stat."""
+        for (src, dst), c in other.items():
+            self.add(src, dst, c)
+
+    def keys(self) -> Iterator[tuple[int, int]]:
+        """Iterate edge key and weight."""
+        return iter(self.__edges.items())
+
+    def indexes(self) -> Iterator[tuple[int, int, int]]:
+        """Iterate src node index, dst node index and weight."""
+        for k, c in self.__edges.items():
+            yield k >> 32, k & 0xFFFFFFFF, c
+
+    def items(self) -> Iterator[tuple[tuple[str, str], int]]:
+        """Iterate edge (src node_id, dst node_id) and weight."""
+        names = self.__interner.names
+        for s, d, c in self.indexes():
+            yield (names[s], names[d]), c
 
     @property
     def edges(self) -> dict[tuple[str, str], int]:
-        """Return the stat as dict (edge to weight)."""
-        return self.__edges
+        """Return the stat as a new dict (edge to weight)."""
+        return dict(self.items())
+
+    def get_index(self, src_index: int, dst_index: int) -> int:
+        """Get the weight of the edge by node indexes, 0 if not found."""
+        return self.__edges.get(self.pack(src_index, dst_index), 0)
 
     def get(self, src_node_id: str, dst_node_id: str, value: int = -1) -> int:
         """
@@ -49,7 +211,11 @@ class EdgeStat:
 
         Return value if not found.
         """
-        return self.__edges.get((src_node_id, dst_node_id), value)
+        s = self.__interner.get(src_node_id)
+        d = self.__interner.get(dst_node_id)
+        if s is None or d is None:
+            return value
+        return self.__edges.get(self.pack(s, d), value)
 
 
 @dataclass
@@ -64,22 +230,97 @@ class Report:
 
 
 class Stat:
-    """Graph stat."""
+    """
+    Graph stat.
+
+    Nodes and edges share the interner, node ids are mapped to strings only on output.
+    If edges have another interner, e.g. Stat(NodeStat(), EdgeStat()), they are copied into the interner of nodes.
+    """
 
     def __init__(self, nodes: NodeStat, edges: EdgeStat) -> None:
+        if nodes.interner is not edges.interner:
+            shared = EdgeStat(nodes.interner)
+            shared.merge(edges)
+            edges = shared
+        self.__interner = nodes.interner
         self.__nodes = nodes
         self.__edges = edges
+        # adjacency index by node index, kept in sync by add() so that report() does not scan edges
+        self.__in_deg = Counts()
+        self.__out_deg = Counts()
+        self.__in_uniq = Counts()
+        self.__out_uniq = Counts()
+        for s, d, c in edges.indexes():
+            self.__index(s, d, c, 1)
+
+    def __index(self, src_index: int, dst_index: int, count: int, uniq: int) -> None:
+        self.__out_deg.add(src_index, count)
+        self.__in_deg.add(dst_index, count)
+        if uniq:
+            self.__out_uniq.add(src_index, uniq)
+            self.__in_uniq.add(dst_index, uniq)
 
     @staticmethod
     def default() -> "Stat":
         """Return a new default Stat."""
-        return Stat(NodeStat(), EdgeStat())
+        interner = Interner()
+        return Stat(NodeStat(interner), EdgeStat(interner))
 
-    def add(self, src_node_id: str, dst_node_id: str) -> None:
-        """Add an edge to stat."""
-        self.__nodes.add(src_node_id)
-        self.__nodes.add(dst_node_id)
-        self.__edges.add(src_node_id, dst_node_id)
+    @property
+    def interner(self) -> Interner:
+        """Return node id interner."""
+        return self.__interner
+
+    def add(self, src_node_id: str, dst_node_id: str, count: int = 1) -> None:
+        """Add an edge to stat count times."""
+        self.add_index(self.__interner.intern(src_node_id), self.__interner.intern(dst_node_id), count)
+
+    def add_index(self, src_index: int, dst_index: int, count: int = 1) -> None:
+        """
+        Add an edge to stat count times by node indexes.
+
+        count can be negative to remove the edge, see EdgeStat.add_index.
+        """
+        before = self.__edges.get_index(src_index, dst_index)
+        after = self.__edges.add_index(src_index, dst_index, count)
+        self.__nodes.add_index(src_index, count)
+        self.__nodes.add_index(dst_index, count)
+        self.__index(src_index, dst_index, count, (after > 0) - (before > 0))
+
+    def merge(self, other: "Stat") -> None:
+        """
+        Add all edges of other to stat.
+
+        The order of nodes and edges is kept as if the edges of other were added after the ones of this.
+        """
+        index = [self.__interner.intern(x) for x in other.interner.names]
+        for s, d, c in other.edges.indexes():
+            self.add_index(index[s], index[d], c)
+
+    def collapse(self, groups: Sequence[int], names: Sequence[str], ignore_selfloop: bool = False) -> "Stat":
+        """
+        Build a new stat by replacing each node with its group.
+
+        The group of node index i is names[groups[i]].
+        Visit distinct edges instead of rows, group names are interned in the order of edges.
+        If ignore_selfloop, ignore edges between nodes of the same group.
+        """
+        s = Stat.default()
+        index = [-1] * len(names)  # group to node index of s
+        intern = s.interner.intern
+        for src, dst, c in self.__edges.indexes():
+            sg = groups[src]
+            dg = groups[dst]
+            if ignore_selfloop and sg == dg:
+                continue
+            si = index[sg]
+            if si < 0:
+                si = index[sg] = intern(names[sg])
+            di = index[dg]
+            if di < 0:
+                di = index[dg] = intern(names[dg])
+            s.add_index(si, di, c)
+        return s
 
     @property
     def nodes(self) -> NodeStat:
@@ -93,31 +334,80 @@ class Stat:
 
     def report(self, node_id: str) -> Report:
         """Build a new node report."""
-        in_deg = 0
-        out_deg = 0
-        in_uniq = set()
-        out_uniq = set()
-        for (src, dst), c in self.edges.edges.items():
-            if src == node_id:
-                out_uniq.add(dst)
-                out_deg += c
-            if dst == node_id:
-                in_uniq.add(src)
-                in_deg += c
-        return Report(node_id=node_id, in_deg=in_deg, out_deg=out_deg, in_uniq=len(in_uniq), out_uniq=len(out_uniq))
+        i = self.__interner.get(node_id)
+        if i is None:
+            return Report(node_id=node_id, in_deg=0, out_deg=0, in_uniq=0, out_uniq=0)
+        return Report(
+            node_id=node_id,
+            in_deg=self.__in_deg.get(i),
+            out_deg=self.__out_deg.get(i),
+            in_uniq=self.__in_uniq.get(i),
+            out_uniq=self.__out_uniq.get(i),
+        )
 
 
 @dataclass
 class Ranking:
-    """Ranking of degrees and weights."""
+    """
+    Ranking of degrees and weights.
+
+    Nodes are ranked by node index and edges by edge key of stat.
+    """
 
     stat: Stat
-    nodes: RawRanking[str]
-    edges: RawRanking[tuple[str, str]]
+    nodes: RawRanking[int]
+    edges: RawRanking[int]
 
     @staticmethod
     def new(stat: Stat) -> "Ranking":
         """Build a new Ranking."""
-        nodes = RawRanking.build(stat.nodes.nodes)
-        edges = RawRanking.build(stat.edges.edges)
-        return Ranking(stat=stat, nodes=nodes, edges=edges)
+        nodes = list(stat.nodes.indexes())
+        edges = list(stat.edges.keys())
+        return Ranking(
+            stat=stat,
+            nodes=RawRanking.new([x[0] for x in nodes], [x[1] for x in nodes]),
+            edges=RawRanking.new([x[0] for x in edges], [x[1] for x in edges]),
+        )
+
+    def node_index(self, node_id: str) -> int | None:
+        """Return the index of the node in the ranking of nodes, or None if not found."""
+        i = self.stat.interner.get(node_id)
+        if i is None:
+            return None
+        return self.nodes.index(i)
+
+    def edge_index(self, src_node_id: str, dst_node_id: str) -> int | None:
+        """Return the index of the edge in the ranking of edges, or None if not found."""
+        s = self.stat.interner.get(src_node_id)
+        d = self.stat.interner.get(dst_node_id)
+        if s is None or d is None:
+            return None
+        return self.edges.index(self.stat.edges.pack(s, d))
+
+    def node_value_percentile(self, node_id: str) -> float:
+        """Return the cumulative value percentile of the node, 100 (lowest) if not found."""
+        i = self.node_index(node_id)
+        if i is None:
+            return 100
+        return self.nodes.value_percentiles[i]
+
+    def edge_value_percentile(self, src_node_id: str, dst_node_id: str) -> float:
+        """Return the cumulative value percentile of the edge, 100 (lowest) if not found."""
+        i = self.edge_index(src_node_id, dst_node_id)
+        if i is None:
+            return 100
+        return self.edges.value_percentiles[i]
+
+    def named_nodes(self) -> RawRanking[str]:
+        """Return the ranking of nodes by node_id."""
+        return self.nodes.map_keys(self.stat.interner.names.__getitem__)
+
+    def named_edges(self) -> RawRanking[tuple[str, str]]:
+        """Return the ranking of edges by (src node_id, dst node_id)."""
+        names = self.stat.interner.names
+
+        def name(key: int) -> tuple[str, str]:
+            s, d = self.stat.edges.unpack(key)
+            return names[s], names[d]
+
+        return self.edges.map_keys(name)
@@ -0,0 +1,116 @@
+import json
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Iterator
+
+
+@dataclass
+class Phase:
+    """
+    Resource usage of a phase.
+
+    max_rss is the peak RSS of the process up to the end of the phase, in bytes.
+    tracemalloc_peak is the peak size of memory blocks traced during the phase, in bytes, 0 if not traced.
+    """
+
+    name: str
+    wall: float
+    cpu: float
+    max_rss: int
+    tracemalloc_peak: int
+
+
+def max_rss() -> int:
+    """Return the peak RSS of the process in bytes, 0 if not available."""
+    try:
+        import resource
+    except ImportError:  # not on unix
+        return 0
+    r = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return r if sys.platform == "darwin" else r * 1024  # KiB on linux
+
+
+class Timings:
+    """
+    Recorder of resource usage of phases.
+
+    Wrap a phase by phase(name) to record it.
+    If trace_malloc, trace memory allocations by tracemalloc, this slows down phases.
+    If profile, run cProfile during the phase named profile and dump the stats to profile_out.
+    on_phase is called when a phase ends.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        trace_malloc: bool = True,
+        profile: str | None = None,
+        profile_out: Path | None = None,
+        on_phase: Callable[[Phase], None] | None = None,
+    ) -> None:
+        self.__enabled = enabled
+        self.__trace_malloc = trace_malloc
+        self.__profile = profile
+        self.__profile_out = profile_out if profile_out is not None else Path(f"{profile}.prof")
+        self.__on_phase = on_phase
+        self.__phases: list[Phase] = []
+
+    @staticmethod
+    def disabled() -> "Timings":
+        """Return a new Timings that records nothing."""
+        return Timings(enabled=False)
+
+    @property
+    def enabled(self) -> bool:
+        return self.__enabled
+
+    @property
+    def phases(self) -> list[Phase]:
+        """Return recorded phases in order."""
+        return self.__phases
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Record the resource usage of the block as name."""
+        if not self.__enabled:
+            yield
+            return
+        import cProfile
+        import tracemalloc
+
+        tracing = self.__trace_malloc and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        elif self.__trace_malloc:
+            tracemalloc.reset_peak()
+        profiler = cProfile.Profile() if name == self.__profile else None
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+            p = Phase(
+                name=name,
+                wall=time.perf_counter() - wall,
+                cpu=time.process_time() - cpu,
+                max_rss=max_rss(),
+                tracemalloc_peak=tracemalloc.get_traced_memory()[1] if self.__trace_malloc else 0,
+            )
+            if tracing:
+                tracemalloc.stop()
+            if profiler:
+                profiler.dump_stats(self.__profile_out)
+            self.__phases.append(p)
+            if self.__on_phase:
+                self.__on_phase(p)
+
+    def dumps(self) -> str:
+        """Return phases as a json object, keyed by phase name in order."""
+        return json.dumps({x.name: {k: v for k, v in asdict(x).items() if k != "name"} for x in self.__phases})
@@ -0,0 +1,24 @@
+"""Optional NumPy acceleration."""
+
+from functools import cache
+from importlib import import_module
+from types import ModuleType
+
+THRESHOLD = 1024  # minimum size to vectorize, smaller ones are faster in pure python
+
+
+@cache
+def numpy() -> ModuleType | None:
+    """Return numpy if installed."""
+    try:
+        # import_module is typed ModuleType whether or not numpy is installed
+        return import_module("numpy")
+    except ImportError:
+        return None
+
+
+def use(size: int) -> ModuleType | None:
+    """Return numpy if installed and size is large enough to vectorize."""
+    if size < THRESHOLD:
+        return None
+    return numpy()
@@ -0,0 +1,147 @@
+import math
+from datetime import datetime
+from typing import Any
+
+from .build import Accumulator
+from .columnar import Batch
+from .decoder import Decoder, JSONDecoder
+from .row import MergePolicy, Row, RowException
+from .stat import EdgeStat, Stat
+
+
+def timestamp(value: Any) -> float:
+    """Return epoch seconds of value, a number or an ISO 8601 string."""
+    if isinstance(value, bool):
+        raise RowException(f"time should be number or ISO 8601 string, {value}")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError as e:
+            raise RowException(f"time should be number or ISO 8601 string, {value}") from e
+    raise RowException(f"time should be number or ISO 8601 string, {value}")
+
+
+class WindowStat:
+    """
+    Stat over a sliding window of time.
+
+    Edges are bucketed by time slot, slot seconds each, and stat holds the sum of the buckets in the window.
+    The window ends at the latest slot seen and spans window seconds, rounded up to slots.
+    When the window moves, expired buckets are subtracted from stat,
+    so the cost of expiry is proportional to the distinct edges of the expired buckets, not to the rows.
+    Edges older than the window are ignored.
+    """
+
+    def __init__(self, window: float, slot: float, stat: Stat | None = None) -> None:
+        if window <= 0 or slot <= 0:
+            raise ValueError(f"window and slot should be positive, {window} {slot}")
+        self.__slot = slot
+        self.__slots = math.ceil(window / slot)
+        self.__stat = stat if stat is not None else Stat.default()
+        self.__buckets: dict[int, EdgeStat] = {}
+        self.__latest: int | None = None
+
+    @property
+    def stat(self) -> Stat:
+        """Return the stat of the window."""
+        return self.__stat
+
+    @property
+    def slots(self) -> int:
+        """Return the number of slots of the window."""
+        return self.__slots
+
+    @property
+    def buckets(self) -> dict[int, EdgeStat]:
+        """Return edges by slot in the window."""
+        return self.__buckets
+
+    def slot(self, time: float) -> int:
+        """Return the slot of time."""
+        return math.floor(time / self.__slot)
+
+    def add(self, src_node_id: str, dst_node_id: str, time: float, count: int = 1) -> bool:
+        """Add an edge at time to stat count times, return False if it is older than the window."""
+        slot = self.slot(time)
+        if self.__latest is not None and slot <= self.__latest - self.__slots:
+            return False
+        interner = self.__stat.interner
+        s = interner.intern(src_node_id)
+        d = interner.intern(dst_node_id)
+        bucket = self.__buckets.get(slot)
+        if bucket is None:
+            bucket = self.__buckets[slot] = EdgeStat(interner)
+        bucket.add_index(s, d, count)
+        self.__stat.add_index(s, d, count)
+        if self.__latest is None or slot > self.__latest:
+            self.__latest = slot
+            self.__expire()
+        return True
+
+    def expire(self, now: float) -> None:
+        """Move the end of the window to now if later, and remove expired edges from stat."""
+        slot = self.slot(now)
+        if self.__latest is None or slot > self.__latest:
+            self.__latest = slot
+            self.__expire()
+
+    def __expire(self) -> None:
+        if self.__latest is None:
+            return
+        oldest = self.__latest - self.__slots
+        for slot in [x for x in self.__buckets if x <= oldest]:
+            for s, d, c in self.__buckets.pop(slot).indexes():
+                self.__stat.add_index(s, d, -c)
+
+
+class WindowAccumulator(Accumulator):
+    """
+    Accumulator over a sliding window of time.
+
+    The time of a row is the value of time_key of the row, see timestamp.
+    decoder should keep time_key (and weight_key) in Row.attrs.
+    """
+
+    def __init__(
+        self,
+        window: float,
+        slot: float,
+        time_key: str,
+        ignore_selfloop: bool = False,
+        keep_source: bool = False,
+        policy: MergePolicy = MergePolicy.LAST,
+        decoder: Decoder | None = None,
+        weight_key: str | None = None,
+    ) -> None:
+        super().__init__(
+            ignore_selfloop=ignore_selfloop,
+            keep_source=keep_source,
+            policy=policy,
+            decoder=decoder if decoder is not None else JSONDecoder([time_key, *([weight_key] if weight_key else [])]),
+            weight_key=weight_key,
+        )
+        self.__window = WindowStat(window, slot, self.stat)
+        self.__time_key = time_key
+
+    @property
+    def window(self) -> WindowStat:
+        return self.__window
+
+    def add_batch(self, batch: Batch) -> None:
+        """Fold rows of a batch, time_key should be in Batch.attrs."""
+        for row in batch.rows():
+            self.add(row)
+
+    def add(self, row: Row) -> None:
+        """Fold a row."""
+        if self.__time_key not in row.attrs:
+            raise RowException(f'"{self.__time_key}" required')
+        time = timestamp(row.attrs[self.__time_key])
+        count = row.weight(self.weight_key)
+        self.nodes.add(row)
+        if self.ignore_selfloop and row.src.id == row.dst.id:
+            return
+        if count:
+            self.__window.add(row.src.id, row.dst.id, time, count)
@@ -0,0 +1,149 @@
+import json
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, ContextManager, Iterable, Iterator, Protocol, TextIO
+
+__HTML_STRING = re.compile(r"<.*>$", re.DOTALL)
+__ID = re.compile(r"([a-zA-Z_][a-zA-Z0-9_]*|-?(\.[0-9]+|[0-9]+(\.[0-9]*)?))$")
+__KEYWORDS = {"node", "edge", "graph", "digraph", "subgraph", "strict"}
+__QUOTE_WITH_OPTIONAL_BACKSLASHES = re.compile(r"(?P<escaped_backslashes>(?:\\{2})*)\\?(?P<literal_quote>\")")
+
+
+def quote(identifier: str) -> str:
+    """Return DOT identifier, quote if needed in the same way as graphviz package."""
+    if __HTML_STRING.match(identifier):
+        return identifier
+    if not __ID.match(identifier) or identifier.lower() in __KEYWORDS:
+        escaped = __QUOTE_WITH_OPTIONAL_BACKSLASHES.sub(r"\g<escaped_backslashes>\\\g<literal_quote>", identifier)
+        return f'"{escaped}"'
+    return identifier
+
+
+def quote_edge(identifier: str) -> str:
+    """Return DOT node id of edge statement, NODE[:PORT[:COMPASS]]."""
+    node, _, rest = identifier.partition(":")
+    parts = [quote(node)]
+    if rest:
+        port, _, compass = rest.partition(":")
+        parts.append(quote(port))
+        if compass:
+            parts.append(compass)
+    return ":".join(parts)
+
+
+def attr_list(label: str | None = None, attrs: dict[str, str] | None = None) -> str:
+    """Return DOT attribute list, label first and the others sorted by key."""
+    r = [f"label={quote(label)}"] if label is not None else []
+    if attrs:
+        r += [f"{quote(k)}={quote(v)}" for k, v in sorted(attrs.items()) if v is not None]
+    return f" [{' '.join(r)}]" if r else ""
+
+
+class Sink(Protocol):
+    """Statement receiver of a directed graph, implemented by graphviz.Digraph and DotWriter."""
+
+    def node(self, name: str, label: str | None = None, **attrs: str) -> None:
+        """Add a node."""
+
+    def edge(self, tail_name: str, head_name: str, label: str | None = None, **attrs: str) -> None:
+        """Add an edge."""
+
+    def subgraph(self, *, name: str, graph_attr: dict[str, str]) -> ContextManager["Sink"]:
+        """Add a subgraph."""
+
+
+class DotWriter:
+    """
+    Streaming writer of DOT source of a directed graph.
+
+    Statements are written to out as soon as they are added,
+    the output is the same as graphviz.Digraph.source given the same statements.
+    """
+
+    def __init__(self, out: TextIO, strict: bool = False, depth: int = 0) -> None:
+        self.__out = out
+        self.__strict = strict
+        self.__depth = depth
+
+    def __enter__(self) -> "DotWriter":
+        """Write the head of the graph."""
+        self.__out.write(f"{'strict ' if self.__strict else ''}digraph {{\n")
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, *args: object) -> None:
+        """Write the tail of the graph, unless drawing failed."""
+        if exc_type is None:
+            self.__out.write("}\n")
+
+    def __write(self, stmt: str) -> None:
+        self.__out.write("\t" * (self.__depth + 1))
+        self.__out.write(stmt)
+        self.__out.write("\n")
+
+    def node(self, name: str, label: str | None = None, **attrs: str) -> None:
+        """Write a node."""
+        self.__write(f"{quote(name)}{attr_list(label, attrs)}")
+
+    def edge(self, tail_name: str, head_name: str, label: str | None = None, **attrs: str) -> None:
+        """Write an edge."""
+        self.__write(f"{quote_edge(tail_name)} -> {quote_edge(head_name)}{attr_list(label, attrs)}")
+
+    @contextmanager
+    def subgraph(self, *, name: str, graph_attr: dict[str, str]) -> Iterator["DotWriter"]:
+        """Write a subgraph, statements of the yielded writer are written into it."""
+        self.__write(f"subgraph {quote(name)} {{")
+        c = DotWriter(self.__out, depth=self.__depth + 1)
+        if graph_attr:
+            c.__write(f"graph{attr_list(attrs=graph_attr)}")
+        yield c
+        self.__write("}")
+
+
+@dataclass
+class Streamed:
+    """Object (key and value pairs) or array of a json document, written while iterating items."""
+
+    items: Iterable[Any]
+    array: bool = False
+
+
+def __dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"))
+
+
+def write_json(out: TextIO, value: Any) -> None:
+    """Write value as compact json to out, Streamed values are written item by item."""
+    if not isinstance(value, Streamed):
+        out.write(__dumps(value))
+        return
+    out.write("[" if value.array else "{")
+    for i, x in enumerate(value.items):
+        if i:
+            out.write(",")
+        if value.array:
+            write_json(out, x)
+            continue
+        k, v = x
+        out.write(__dumps(k))
+        out.write(":")
+        write_json(out, v)
+    out.write("]" if value.array else "}")
+
+
+def write_jsonl(out: TextIO, value: Streamed, section: str = "") -> None:
+    """
+    Write a record per line for each value of Streamed value that is not Streamed.
+
+    A record is {"section":PATH,"key":KEY,"value":VALUE}, PATH is the keys (and indexes of arrays) joined by dots,
+    records of arrays have no key.
+    """
+    for i, x in enumerate(value.items):
+        k, v = (i, x) if value.array else x
+        if isinstance(v, Streamed):
+            write_jsonl(out, v, f"{section}.{k}" if section else str(k))
+            continue
+        out.write(
+            __dumps({"section": section, "value": v} if value.array else {"section": section, "key": k, "value": v})
+        )
+        out.write("\n")
@@ -0,0 +1,27 @@
+import json
+from collections import Counter
+from unittest import TestCase
+
+from benchmarks.bench import compare
+from benchmarks.generate import generate
+
+
+class TestBenchmarks(TestCase):
+    def test_generate(self):
+        lines = list(generate(2000, nodes=100, seed=1))
+        self.assertEqual(2000, len(lines))
+        self.assertEqual(lines, list(generate(2000, nodes=100, seed=1)))
+        degrees = Counter()
+        for x in lines:
+            r = json.loads(x)
+            degrees[r["src"]["id"]] += 1
+            degrees[r["dst"]["id"]] += 1
+            self.assertEqual(f"node{r['src']['id'][1:]}", r["src"]["name"])
+        top = degrees.most_common()
+        self.assertGreater(top[0][1], 10 * top[-1][1], "should have hubs")
+
+    def test_compare(self):
+        baseline = {"100": {"plain": {"fast": 1.0, "slow": 1.0, "tiny": 0.001}}}
+        result = {"100": {"plain": {"fast": 0.5, "slow": 1.5, "tiny": 0.002, "new": 1.0}}}
+        got = compare(baseline, result, tolerance=0.2, min_delta=0.005)
+        self.assertEqual(["100 plain slow: 1.0000s -> 1.5000s (1.50x)"], got)
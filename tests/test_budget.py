@@ -0,0 +1,75 @@
+import io
+import sys
+import tempfile
+from contextlib import redirect_stderr
+from pathlib import Path
+from textwrap import dedent
+from unittest import TestCase
+
+import json2dot.budget as budget
+from json2dot.stat import Stat
+
+
+def engine(d: Path, name: str, max_lines: int) -> str:
+    """Write a fake layout engine that copies the source to -o, or hangs if the source has more than max_lines."""
+    p = d / name
+    p.write_text(dedent(f"""\
+        #!{sys.executable}
+        import sys, time
+        source = sys.stdin.read()
+        if len(source.splitlines()) > {max_lines}:
+            time.sleep(10)
+        with open(sys.argv[sys.argv.index("-o") + 1], "w") as f:
+            f.write(source)
+        """))
+    p.chmod(0o755)
+    return str(p)
+
+
+def draw(stat: Stat) -> str:
+    return "\n".join(f"{s} {d}" for (s, d), _ in stat.edges.items())
+
+
+class TestBudget(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.stat = Stat.default()
+        for i in range(20):
+            for j in range(i % 4 + 1):
+                cls.stat.add(f"n{i}", f"n{(i + j + 1) % 20}", j + 1)
+
+    def test_coarsen(self):
+        cases = [
+            ("fits", budget.Budget(max_nodes=20, max_edges=50), (20, 50)),
+            ("nodes", budget.Budget(max_nodes=10), (10, 31)),
+            ("edges", budget.Budget(max_edges=10), (11, 10)),
+            ("nodes and edges", budget.Budget(max_nodes=10, max_edges=5), (6, 5)),
+        ]
+        for c in cases:
+            with self.subTest(c[0]):
+                self.assertEqual((20, 50), budget.size(self.stat))
+                got = c[1].coarsen(self.stat, ignore_selfloop=True)
+                self.assertEqual(c[2], budget.size(got))
+                self.assertTrue(c[1].fits(got))
+
+    def test_render(self):
+        with tempfile.TemporaryDirectory() as d:
+            out = Path(d) / "out.svg"
+            cases = [
+                ("first engine", [engine(Path(d), "fast", 100)], 50),
+                ("fallback", [engine(Path(d), "slow", 0), engine(Path(d), "fast", 100)], 50),
+                ("coarsen", [engine(Path(d), "slow", 0), engine(Path(d), "small", 30)], 25),
+            ]
+            for c in cases:
+                with self.subTest(c[0]):
+                    b = budget.Budget(timeout=0.5, engines=c[1])
+                    with redirect_stderr(io.StringIO()):
+                        got = b.render(self.stat, draw, [out], ignore_selfloop=True)
+                    self.assertEqual(c[2], budget.size(got)[1])
+                    self.assertEqual(draw(got), out.read_text())
+
+            with self.subTest("timeout"):
+                b = budget.Budget(timeout=0.2, engines=[engine(Path(d), "slow", 0)], attempts=2)
+                with redirect_stderr(io.StringIO()):
+                    with self.assertRaises(budget.RenderTimeout):
+                        b.render(self.stat, draw, [out])
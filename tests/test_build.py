@@ -0,0 +1,188 @@
+import json
+from pathlib import Path
+from unittest import TestCase
+
+import json2dot.build as build
+from json2dot.columnar import Batch
+from json2dot.row import Node, RowException
+
+
+class TestBuild(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(Path(__file__).parent / "test.json") as f:
+            cls.source = f.read().splitlines()
+
+    def test_accumulator(self):
+        for ignore_selfloop in [True, False]:
+            with self.subTest(f"ignore_selfloop={ignore_selfloop}"):
+                nodes = build.build_nodemap(iter(self.source))
+                want = build.build_stat(nodes.source, ignore_selfloop=ignore_selfloop)
+                acc = build.Accumulator(ignore_selfloop=ignore_selfloop).consume(iter(self.source))
+                self.assertEqual(want.nodes.nodes, acc.stat.nodes.nodes)
+                self.assertEqual(want.edges.edges, acc.stat.edges.edges)
+                self.assertEqual(nodes.map, acc.nodes.map)
+                self.assertEqual([], acc.nodes.source)
+
+        with self.subTest("keep_source"):
+            acc = build.Accumulator(keep_source=True).consume(iter(self.source))
+            self.assertEqual(len(self.source), len(acc.nodes.source))
+
+    def test_weight_key(self):
+        rows = [json.loads(x) for x in self.source]
+        weighted = []
+        expanded = []
+        for i, r in enumerate(rows):
+            if i % 4 == 3:  # no weight
+                weighted.append(json.dumps(r))
+                expanded.append(json.dumps(r))
+                continue
+            weighted.append(json.dumps({**r, "count": i % 4}))
+            expanded.extend([json.dumps(r)] * (i % 4))
+
+        def key(node: Node) -> str | None:
+            return node.desc.get("group")
+
+        for ignore_selfloop in [True, False]:
+            with self.subTest(f"ignore_selfloop={ignore_selfloop}"):
+                want = build.Accumulator(ignore_selfloop=ignore_selfloop).consume(expanded)
+                got = build.Accumulator(ignore_selfloop=ignore_selfloop, weight_key="count").consume(weighted)
+                self.assertEqual(want.stat.nodes.nodes, got.stat.nodes.nodes)
+                self.assertEqual(want.stat.edges.edges, got.stat.edges.edges)
+                self.assertEqual(["count"], list(got.decoder.keys))
+
+                source = build.Accumulator(keep_source=True, weight_key="count").consume(weighted).nodes
+                self.assertEqual(
+                    want.stat.edges.edges,
+                    build.build_stat(source.source, ignore_selfloop=ignore_selfloop, weight_key="count").edges.edges,
+                )
+                self.assertEqual(
+                    build.GroupNameMap.build_stat(
+                        build.build_nodemap(iter(expanded)), key=key, ignore_selfloop=ignore_selfloop
+                    ).edges.edges,
+                    build.GroupNameMap.build_stat(
+                        source, key=key, ignore_selfloop=ignore_selfloop, weight_key="count"
+                    ).edges.edges,
+                )
+
+    def test_invalid_weight(self):
+        for keep_source in [True, False]:
+            with self.subTest(f"keep_source={keep_source}"):
+                acc = build.Accumulator(keep_source=keep_source, weight_key="count")
+                acc.consume(['{"src":{"id":"a"},"dst":{"id":"b"}}'])
+                with self.assertRaises(RowException):
+                    acc.consume(['{"src":{"id":"a","n":1},"dst":{"id":"c"},"count":-1}'])
+                self.assertEqual({"a": Node(id="a"), "b": Node(id="b")}, acc.nodes.map)
+                self.assertEqual(1 if keep_source else 0, len(acc.nodes.source))
+                self.assertEqual({("a", "b"): 1}, acc.stat.edges.edges)
+
+        with self.subTest("batch"):
+            acc = build.Accumulator(weight_key="count")
+            batch = Batch(src=["a", "c"], dst=["b", "d"], attrs={"count": [1, "x"]})
+            with self.assertRaises(RowException):
+                acc.add_batch(batch)
+            self.assertEqual({}, acc.nodes.map)
+            self.assertEqual({}, acc.stat.edges.edges)
+
+    def test_desc_map_from_nodes(self):
+        nodes = build.build_nodemap(iter(self.source))
+        for key in ["group", "another", None]:
+            with self.subTest(f"key={key}"):
+                want = build.GroupNameMap(nodes.source, key)
+                got = build.GroupNameMap.from_nodes(nodes, key)
+                self.assertEqual(want.map, got.map)
+                self.assertEqual(want.key, got.key)
+
+    def test_group_collapse_stat(self):
+        def key(node: Node) -> str | None:
+            return node.desc.get("group")
+
+        for ignore_selfloop in [True, False]:
+            with self.subTest(f"ignore_selfloop={ignore_selfloop}"):
+                nodes = build.build_nodemap(iter(self.source))
+                want = build.GroupNameMap.build_stat(nodes, key=key, ignore_selfloop=ignore_selfloop)
+                stat = build.build_stat(nodes.source, ignore_selfloop=ignore_selfloop)
+                got = build.GroupNameMap.from_nodes(nodes, "group").collapse_stat(stat, ignore_selfloop=ignore_selfloop)
+                self.assertEqual(list(want.nodes.nodes.items()), list(got.nodes.nodes.items()))
+                self.assertEqual(list(want.edges.edges.items()), list(got.edges.edges.items()))
+
+    def test_group_hierarchy(self):
+        rows = [
+            ("a1", {"team": "t1", "svc": "s1"}, "a2", {"team": "t1", "svc": "s2"}),
+            ("a2", {}, "b1", {"team": "t2", "svc": "s1"}),
+            ("b1", {}, "c1", {"team": "t2"}),
+            ("c1", {}, "x", {"svc": "s9"}),
+            ("x", {}, "a1", {}),
+            ("a1", {}, "a1", {}),
+            ("a1", {}, "a2", {}),
+        ]
+        source = [json.dumps({"src": {"id": s, **sd}, "dst": {"id": d, **dd}}) for s, sd, d, dd in rows]
+        nodes = build.build_nodemap(iter(source))
+        h = build.GroupHierarchy.from_nodes(nodes, ["team", "svc"])
+        nil = build.GroupNameMap.nil_group
+
+        with self.subTest("path"):
+            self.assertEqual(["t1", "s1"], h.path("a1"))
+            self.assertEqual(["t2"], h.path("c1"))
+            self.assertEqual([], h.path("x"))
+            self.assertEqual({"a1": "t1/s1", "a2": "t1/s2", "b1": "t2/s1"}, h.level_map(1))
+
+        cases = [
+            (
+                "keep selfloop",
+                False,
+                [
+                    [(("t1", "t1"), 3), (("t1", "t2"), 1), (("t2", "t2"), 1), (("t2", nil), 1), ((nil, "t1"), 1)],
+                    [
+                        (("t1/s1", "t1/s2"), 2),
+                        (("t1/s2", "t2/s1"), 1),
+                        (("t2/s1", "t2"), 1),
+                        (("t2", nil), 1),
+                        ((nil, "t1/s1"), 1),
+                        (("t1/s1", "t1/s1"), 1),
+                    ],
+                ],
+            ),
+            (
+                "ignore selfloop",
+                True,
+                [
+                    [(("t1", "t2"), 1), (("t2", nil), 1), ((nil, "t1"), 1)],
+                    [
+                        (("t1/s1", "t1/s2"), 2),
+                        (("t1/s2", "t2/s1"), 1),
+                        (("t2/s1", "t2"), 1),
+                        (("t2", nil), 1),
+                        ((nil, "t1/s1"), 1),
+                    ],
+                ],
+            ),
+        ]
+        for name, ignore_selfloop, want in cases:
+            with self.subTest(name):
+                stat = build.build_stat(nodes.source)
+                got = h.collapse_stat(stat, ignore_selfloop=ignore_selfloop)
+                self.assertEqual(want, [list(x.edges.edges.items()) for x in got])
+
+        with self.subTest("single level"):
+            stat = build.build_stat(nodes.source)
+            want = build.GroupNameMap.from_nodes(nodes, "team").collapse_stat(stat, ignore_selfloop=True)
+            got = build.GroupHierarchy.from_nodes(nodes, ["team"]).collapse_stat(stat, ignore_selfloop=True)
+            self.assertEqual(1, len(got))
+            self.assertEqual(list(want.nodes.nodes.items()), list(got[0].nodes.nodes.items()))
+            self.assertEqual(list(want.edges.edges.items()), list(got[0].edges.edges.items()))
+
+        with self.subTest("separator in group name"):
+            rows = [
+                ("n1", {"team": "a/b"}, "n2", {"team": "a", "svc": "b"}),
+                ("n2", {}, "n3", {"team": "a\\", "svc": "/b"}),
+            ]
+            source = [json.dumps({"src": {"id": s, **sd}, "dst": {"id": d, **dd}}) for s, sd, d, dd in rows]
+            nodes = build.build_nodemap(iter(source))
+            h = build.GroupHierarchy.from_nodes(nodes, ["team", "svc"])
+            self.assertEqual(
+                {"n1": "a\\/b", "n2": "a/b", "n3": "a\\\\/\\/b"}, {x: h.key(h.path(x), 1) for x in nodes.map}
+            )
+            got = h.collapse_stat(build.build_stat(nodes.source))
+            self.assertEqual([(("a\\/b", "a"), 1), (("a", "a\\\\"), 1)], list(got[0].edges.edges.items()))
+            self.assertEqual([(("a\\/b", "a/b"), 1), (("a/b", "a\\\\/\\/b"), 1)], list(got[1].edges.edges.items()))
@@ -0,0 +1,66 @@
+import io
+import os
+import tempfile
+import time
+from contextlib import redirect_stderr
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from json2dot.cache import RenderCache
+
+from .test_dot import fake_graphviz
+
+
+class TestCache(TestCase):
+    def test_key(self):
+        k = RenderCache.key("src", "svg", "dot")
+        self.assertEqual(k, RenderCache.key("src", "svg", "dot"))
+        for x in [("src2", "svg", "dot"), ("src", "png", "dot"), ("src", "svg", "sfdp")]:
+            with self.subTest(str(x)):
+                self.assertNotEqual(k, RenderCache.key(*x))
+
+    def test_render_all(self):
+        with tempfile.TemporaryDirectory() as d:
+            fake_graphviz(Path(d))
+            cache = RenderCache(Path(d) / "cache", 1 << 20)
+            log = Path(d) / "log"
+            cases = [
+                ("miss", "src", ["out.svg"], (0, 1), ["dot -Tsvg -o"], ["-Tsvg src"]),
+                ("hit", "src", ["out.svg"], (1, 1), [], ["-Tsvg src"]),
+                ("another format", "src", ["out.svg", "out.png"], (2, 2), ["dot -Tpng -o"], ["-Tsvg src", "-Tpng src"]),
+                (
+                    "another source",
+                    "src2",
+                    ["out.svg", "out.png"],
+                    (2, 4),
+                    ["dot -Tdot", "neato -n2 -Tpng -o", "neato -n2 -Tsvg -o"],
+                    ["-Tsvg layout src2", "-Tpng layout src2"],
+                ),
+                ("hits", "src", ["out.png", "out.svg"], (4, 4), [], ["-Tpng src", "-Tsvg src"]),
+            ]
+            with patch.dict(os.environ, {"PATH": f"{d}{os.pathsep}{os.environ['PATH']}"}):
+                for c in cases:
+                    with self.subTest(c[0]):
+                        log.write_text("")
+                        with redirect_stderr(io.StringIO()):
+                            cache.render_all(c[1], [Path(d) / x for x in c[2]])
+                        self.assertEqual(c[3], (cache.hits, cache.misses))
+                        self.assertEqual(c[4], sorted(log.read_text().splitlines()))
+                        self.assertEqual(c[5], [(Path(d) / x).read_text() for x in c[2]])
+            self.assertEqual(4, len(list((Path(d) / "cache").iterdir())))
+
+    def test_evict(self):
+        with tempfile.TemporaryDirectory() as d:
+            image = Path(d) / "image"
+            image.write_bytes(b"x" * 100)
+            cache = RenderCache(Path(d) / "cache", 250)
+            now = time.time()
+            for i, k in enumerate(["k1", "k2"]):
+                cache.put(k, "svg", image)
+                os.utime(Path(d) / "cache" / f"{k}.svg", (now - 100 + i, now - 100 + i))
+            self.assertTrue(cache.get("k1", "svg", Path(d) / "out.svg"))  # k2 is the least recently used now
+            cache.put("k3", "svg", image)
+            self.assertEqual(["k1.svg", "k3.svg"], sorted(x.name for x in (Path(d) / "cache").iterdir()))
+            self.assertFalse(cache.get("k2", "svg", Path(d) / "out.svg"))
+            self.assertEqual((1, 1), (cache.hits, cache.misses))
@@ -0,0 +1,144 @@
+import json
+import tempfile
+from pathlib import Path
+from typing import Any
+from unittest import TestCase, skipUnless
+
+import json2dot.columnar as columnar
+from json2dot.build import Accumulator
+from json2dot.row import MergePolicy, RowException
+from json2dot.window import WindowAccumulator
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+def to_columns(rows: list[dict[str, Any]]) -> dict[str, list[Any]]:
+    """Return columns of rows, src_id, dst_id, src_KEY and dst_KEY."""
+    keys = sorted({f"{x}_{k}" for r in rows for x in ["src", "dst"] for k in r[x]})
+    return {k: [r[k[:3]].get(k[4:]) for r in rows] for k in keys}
+
+
+class TestColumnar(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(Path(__file__).parent / "test.json") as f:
+            cls.source = f.read().splitlines()
+        cls.columns = to_columns([json.loads(x) for x in cls.source])
+
+    def assert_same(self, want: Accumulator, got: Accumulator):
+        self.assertEqual(list(want.nodes.map.items()), list(got.nodes.map.items()))
+        self.assertEqual(want.nodes.source, got.nodes.source)
+        self.assertEqual(list(want.stat.nodes.items()), list(got.stat.nodes.items()))
+        self.assertEqual(list(want.stat.edges.items()), list(got.stat.edges.items()))
+
+    def test_detect_format(self):
+        cases = [
+            ("stdin", None, "jsonl"),
+            ("jsonl", Path("a.jsonl"), "jsonl"),
+            ("no suffix", Path("a"), "jsonl"),
+            ("tsv", Path("a.tsv"), "tsv"),
+            ("gzip tsv", Path("a.tsv.gz"), "tsv"),
+            ("parquet", Path("a.parquet"), "parquet"),
+            ("feather", Path("a.b.feather"), "arrow"),
+        ]
+        for c in cases:
+            with self.subTest(c[0]):
+                self.assertEqual(c[2], columnar.detect_format(c[1]))
+
+    def test_tsv_batches(self):
+        lines = [b"a\tb\n", b"\n", b"b\tc\textra\n", b"c\ta\r\n", b"a\td"]
+        got = list(columnar.tsv_batches(lines, size=2))
+        self.assertEqual([(["a", "b"], ["b", "c"]), (["c", "a"], ["a", "d"])], [(x.src, x.dst) for x in got])
+        with self.assertRaises(RowException):
+            list(columnar.tsv_batches([b"a b\n"]))
+
+    def test_add_batch(self):
+        batch = columnar.Batch(
+            src=self.columns["src_id"],
+            dst=self.columns["dst_id"],
+            src_desc={k[4:]: v for k, v in self.columns.items() if k.startswith("src_") and k != "src_id"},
+            dst_desc={k[4:]: v for k, v in self.columns.items() if k.startswith("dst_") and k != "dst_id"},
+        )
+        for ignore_selfloop in [True, False]:
+            for keep_source in [True, False]:
+                for policy in MergePolicy:
+                    with self.subTest(f"ignore_selfloop={ignore_selfloop} keep_source={keep_source} policy={policy}"):
+                        kwargs = {"ignore_selfloop": ignore_selfloop, "keep_source": keep_source, "policy": policy}
+                        want = Accumulator(**kwargs).consume(self.source)
+                        got = Accumulator(**kwargs).consume_batches([batch])
+                        self.assert_same(want, got)
+
+    def test_add_batch_weight_key(self):
+        batch = columnar.Batch(src=["a", "b", "a", "c"], dst=["b", "c", "b", "c"], attrs={"count": [2, None, 3, 4]})
+        cases = [
+            ("no weight_key", {}, {("a", "b"): 2, ("b", "c"): 1, ("c", "c"): 1}),
+            ("weight_key", {"weight_key": "count"}, {("a", "b"): 5, ("b", "c"): 1, ("c", "c"): 4}),
+            (
+                "keep_source",
+                {"weight_key": "count", "keep_source": True},
+                {("a", "b"): 5, ("b", "c"): 1, ("c", "c"): 4},
+            ),
+            ("ignore_selfloop", {"weight_key": "count", "ignore_selfloop": True}, {("a", "b"): 5, ("b", "c"): 1}),
+        ]
+        for c in cases:
+            with self.subTest(c[0]):
+                acc = Accumulator(**c[1]).consume_batches([batch])
+                self.assertEqual(c[2], acc.stat.edges.edges)
+
+    def test_add_batch_order(self):
+        edges = [("a", "b", 0), ("c", "d", 1), ("a", "b", 2), ("d", "d", 1), ("b", "a", 1), ("a", "b", 1)]
+        batches = [
+            columnar.Batch(src=[x[0] for x in b], dst=[x[1] for x in b], attrs={"count": [x[2] for x in b]})
+            for b in [edges[:4], edges[4:]]
+        ]
+        lines = [json.dumps({"src": {"id": s}, "dst": {"id": d}, "count": w}) for s, d, w in edges]
+        for ignore_selfloop in [True, False]:
+            for weight_key in ["count", None]:
+                with self.subTest(f"ignore_selfloop={ignore_selfloop} weight_key={weight_key}"):
+                    kwargs = {"ignore_selfloop": ignore_selfloop, "weight_key": weight_key}
+                    want = Accumulator(**kwargs).consume(lines)
+                    got = Accumulator(**kwargs).consume_batches(batches)
+                    self.assert_same(want, got)
+                    self.assertEqual(want.stat.interner.names, got.stat.interner.names)
+
+    def test_window_add_batch(self):
+        batch = columnar.Batch(src=["a", "b", "a"], dst=["b", "c", "c"], attrs={"time": [0, 70, 130]})
+        acc = WindowAccumulator(window=120, slot=60, time_key="time").consume_batches([batch])
+        self.assertEqual({("a", "c"): 1, ("b", "c"): 1}, acc.stat.edges.edges)
+
+    @skipUnless(pyarrow, "pyarrow is not installed")
+    def test_arrow_batches(self):
+        table = pyarrow.table({**self.columns, "time": list(range(len(self.source)))})
+        want = Accumulator().consume(self.source)
+        with tempfile.TemporaryDirectory() as d:
+            parquet = Path(d) / "input.parquet"
+            pyarrow.parquet.write_table(table, parquet)
+            arrow_file = Path(d) / "input.arrow"
+            with pyarrow.ipc.new_file(arrow_file, table.schema) as w:
+                w.write_table(table, max_chunksize=4)
+            arrow_stream = Path(d) / "input.ipc"
+            with pyarrow.ipc.new_stream(arrow_stream, table.schema) as w:
+                w.write_table(table, max_chunksize=4)
+            cases = [
+                ("parquet", parquet, "parquet"),
+                ("arrow file", arrow_file, "arrow"),
+                ("arrow stream", arrow_stream, "arrow"),
+            ]
+            for c in cases:
+                with self.subTest(c[0]):
+                    batches = list(columnar.arrow_batches(c[1], c[2], keys=["time"], size=3))
+                    self.assertEqual([3, 3, 3, 2] if c[2] == "parquet" else [3, 1, 3, 1, 3], [len(x) for x in batches])
+                    self.assertEqual(list(range(len(self.source))), [t for x in batches for t in x.attrs["time"]])
+                    got = Accumulator().consume_batches(batches)
+                    self.assert_same(want, got)
+
+            with self.subTest("no src_id"):
+                p = Path(d) / "invalid.parquet"
+                pyarrow.parquet.write_table(table.drop_columns(["src_id"]), p)
+                with self.assertRaises(RowException):
+                    list(columnar.arrow_batches(p, "parquet"))
@@ -0,0 +1,106 @@
+from unittest import TestCase
+
+import json2dot.decoder as decoder
+import json2dot.row as row
+
+
+class TestDecoder(TestCase):
+    def new_decoders(self) -> list[decoder.Decoder]:
+        r = []
+        for d in decoder.decoders.values():
+            try:
+                r.append(d(()))
+            except ImportError:
+                pass
+        return r
+
+    def test_new_decoder(self):
+        with self.assertRaises(ValueError):
+            decoder.new_decoder("unknown")
+        self.assertIsInstance(decoder.new_decoder("json"), decoder.JSONDecoder)
+        self.assertIsInstance(decoder.new_decoder("auto"), decoder.Decoder)
+
+    def test_loads(self):
+        failures = [
+            (
+                "malformed",
+                '{"src":{"id":"a"},"dst":',
+            ),
+            (
+                "not json",
+                "src a dst b",
+            ),
+            (
+                "row should be dict",
+                '[{"id":"a"},{"id":"b"}]',
+            ),
+            (
+                "src required",
+                '{"dst":{"id":"b"}}',
+            ),
+            (
+                "src should be dict",
+                '{"src":"a","dst":{"id":"b"}}',
+            ),
+            (
+                "dst required",
+                '{"src":{"id":"a"}}',
+            ),
+            (
+                "id should be str",
+                '{"src":{"id":"a"},"dst":{"id":[]}}',
+            ),
+        ]
+        cases = [
+            (
+                "id",
+                '{"src":{"id":"a"},"dst":{"id":"b"}}',
+                row.Row(row.Node(id="a"), row.Node(id="b")),
+            ),
+            (
+                "desc",
+                '{"src":{"id":"a","n":0},"dst":{"id":"b","n":1}}',
+                row.Row(row.Node(id="a", desc={"n": 0}), row.Node(id="b", desc={"n": 1})),
+            ),
+            (
+                "ignore other keys",
+                '{"src":{"id":"a"},"dst":{"id":"b"},"other":1}',
+                row.Row(row.Node(id="a"), row.Node(id="b")),
+            ),
+        ]
+        for d in self.new_decoders():
+            for c in failures:
+                with self.subTest(f"{d.name} {c[0]}"):
+                    with self.assertRaises(row.RowException):
+                        d.loads(c[1])
+            for c in cases:
+                for s in [c[1], c[1].encode()]:
+                    with self.subTest(f"{d.name} {c[0]} {type(s)}"):
+                        self.assertEqual(c[2], d.loads(s))
+
+    def test_loads_keys(self):
+        cases = [
+            (
+                "found",
+                '{"src":{"id":"a"},"dst":{"id":"b"},"time":1,"other":2}',
+                {"time": 1},
+            ),
+            (
+                "not found",
+                '{"src":{"id":"a"},"dst":{"id":"b"},"other":2}',
+                {},
+            ),
+            (
+                "any value",
+                '{"src":{"id":"a"},"dst":{"id":"b"},"time":"2024-01-01T00:00:00"}',
+                {"time": "2024-01-01T00:00:00"},
+            ),
+        ]
+        for name, d in decoder.decoders.items():
+            try:
+                dec = d(["time"])
+            except ImportError:
+                continue
+            for c in cases:
+                with self.subTest(f"{name} {c[0]}"):
+                    self.assertEqual(row.Row(row.Node(id="a"), row.Node(id="b"), c[2]), dec.loads(c[1]))
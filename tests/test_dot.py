@@ -0,0 +1,65 @@
+import io
+import os
+import sys
+import tempfile
+from contextlib import redirect_stderr
+from pathlib import Path
+from textwrap import dedent
+from unittest import TestCase
+from unittest.mock import patch
+
+import json2dot.dot as dot
+
+
+def fake_graphviz(d: Path) -> None:
+    """
+    Write fake dot and neato into d.
+
+    Both append their name and arguments to d/log.
+    dot -Tdot prefixes the source with "layout", the others write the format and the source to -o.
+    """
+    for name in ["dot", "neato"]:
+        p = d / name
+        p.write_text(dedent(f"""\
+            #!{sys.executable}
+            import sys
+            args = sys.argv[1:]
+            with open({str(d / "log")!r}, "a") as f:
+                f.write(" ".join([{name!r}, *[x for x in args if not x.startswith("/")]]) + "\\n")
+            source = sys.stdin.read()
+            if "-o" not in args:
+                sys.stdout.write("layout " + source)
+                sys.exit()
+            with open(args[args.index("-o") + 1], "w") as f:
+                f.write(args[-3] + " " + source)
+            """))
+        p.chmod(0o755)
+
+
+class TestDot(TestCase):
+    def test_render_all(self):
+        cases = [
+            (
+                "single",
+                ["out.svg"],
+                ["dot -Tsvg -o"],
+                {"out.svg": "-Tsvg src"},
+            ),
+            (
+                "layout once",
+                ["out.svg", "out.png", "out.pdf"],
+                ["dot -Tdot", "neato -n2 -Tpdf -o", "neato -n2 -Tpng -o", "neato -n2 -Tsvg -o"],
+                {"out.svg": "-Tsvg layout src", "out.png": "-Tpng layout src", "out.pdf": "-Tpdf layout src"},
+            ),
+        ]
+        for c in cases:
+            with self.subTest(c[0]):
+                with tempfile.TemporaryDirectory() as d:
+                    fake_graphviz(Path(d))
+                    with patch.dict(os.environ, {"PATH": f"{d}{os.pathsep}{os.environ['PATH']}"}):
+                        with redirect_stderr(io.StringIO()):
+                            dot.render_all("src", [Path(d) / x for x in c[1]])
+                    log = (Path(d) / "log").read_text().splitlines()
+                    self.assertEqual(c[2], sorted(log))
+                    for name, want in c[3].items():
+                        self.assertEqual(want, (Path(d) / name).read_text())
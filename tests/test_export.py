@@ -0,0 +1,83 @@
+import io
+import tempfile
+from array import array
+from pathlib import Path
+from unittest import TestCase, skipUnless
+
+import json2dot.export as export
+from json2dot.build import Accumulator, GroupHierarchy
+from json2dot.stat import Ranking
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestExport(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(Path(__file__).parent / "test.json") as f:
+            acc = Accumulator(ignore_selfloop=True).consume(f.read().splitlines())
+        cls.ranking = Ranking.new(acc.stat)
+        cls.grouped = [Ranking.new(x) for x in GroupHierarchy.from_nodes(acc.nodes, ["group"]).collapse_stat(acc.stat)]
+
+    def test_npy(self):
+        cases = [
+            ("i8", array("q", [1, -2, 3 << 40])),
+            ("f8", array("d", [100.0, 0.5])),
+            ("u1", array("B", "ノード".encode())),
+            ("empty", array("q")),
+        ]
+        for c in cases:
+            with self.subTest(c[0]):
+                data = export.npy(c[1])
+                self.assertEqual(0, (len(data) - len(c[1]) * c[1].itemsize) % 64)
+                self.assertEqual(c[1], export.from_npy(data))
+        with self.subTest("broken"):
+            with self.assertRaises(export.ExportException):
+                export.from_npy(b"{}")
+
+    def test_arrays(self):
+        got = export.arrays(self.ranking)
+        stat = self.ranking.stat
+        names = [bytes(got["names"][s:e]).decode() for s, e in zip(got["name_offsets"], got["name_offsets"][1:])]
+        self.assertEqual(stat.interner.names, names)
+        self.assertEqual(stat.nodes.nodes, {names[i]: c for i, c in enumerate(got["degrees"]) if c})
+        edges = list(zip(got["edge_src"], got["edge_dst"], got["edge_weights"]))
+        self.assertEqual(stat.edges.edges, {(names[s], names[d]): w for s, d, w in edges})
+        self.assertEqual(
+            [(x.key, x.value_percentile) for x in self.ranking.named_nodes().elems],
+            [(names[i], p) for i, p in zip(got["node_ranking"], got["node_value_percentiles"])],
+        )
+        self.assertEqual(
+            [(x.key, x.value_percentile) for x in self.ranking.named_edges().elems],
+            [
+                ((names[edges[i][0]], names[edges[i][1]]), p)
+                for i, p in zip(got["edge_ranking"], got["edge_value_percentiles"])
+            ],
+        )
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as d:
+            p = Path(d) / "export.npz"
+            export.save(p, self.ranking, self.grouped)
+            got = export.load(p)
+            self.assertEqual(export.arrays(self.ranking), {k: v for k, v in got.items() if not k.startswith("group")})
+            self.assertEqual(
+                export.arrays(self.grouped[0], "group0_"), {k: v for k, v in got.items() if k.startswith("group0_")}
+            )
+            with self.assertRaises(export.ExportException):
+                export.load(Path(__file__))
+
+    @skipUnless(numpy, "numpy is not installed")
+    def test_numpy_load(self):
+        f = io.BytesIO()
+        export.dump(f, self.ranking, self.grouped)
+        f.seek(0)
+        want = export.arrays(self.ranking)
+        with numpy.load(f) as got:
+            self.assertEqual(set(want) | set(export.arrays(self.grouped[0], "group0_")), set(got.files))
+            for k, v in want.items():
+                with self.subTest(k):
+                    self.assertEqual(v.tolist(), got[k].tolist())
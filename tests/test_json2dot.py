@@ -1,10 +1,13 @@
+import gzip
 import json
 import os
 import subprocess
+import tempfile
 from contextlib import contextmanager
 from pathlib import Path
 from unittest import TestCase
 
+import json2dot.export as export
 from json2dot.__version__ import __version__
 
 
@@ -55,6 +58,45 @@ class TestEndToEnd(TestCase):
             capture_output=True,
         )
 
+    def test_startup(self):
+        rendering = ["graphviz", "subprocess", "concurrent.futures", "multiprocessing", "zipfile", "json2dot.dot"]
+        optional = ["numpy", "pyarrow", "orjson", "msgspec"]
+        cases = [
+            (
+                "version",
+                ["--version"],
+                None,
+                [
+                    *rendering,
+                    *optional,
+                    "json2dot.build",
+                    "json2dot.stat",
+                    "json2dot.command",
+                    "json2dot.timings",
+                    "tracemalloc",
+                ],
+            ),
+            (
+                "dot source",
+                [],
+                self.source,
+                # the decoder backend is needed to parse, numpy only for large graphs
+                [*rendering, "numpy", "pyarrow", "json2dot.parallel", "json2dot.export", "tracemalloc"],
+            ),
+        ]
+        for c in cases:
+            with self.subTest(c[0]):
+                r = run(
+                    cmd=["python", "-X", "importtime", "-m", "json2dot.cli", *c[1]],
+                    dir=self.pwd,
+                    input=c[2],
+                    capture_output=True,
+                    text=True,
+                )
+                # import time: SELF_US | CUMULATIVE_US | MODULE, nested imports are indented
+                imported = {x.split("|")[2].strip() for x in r.stderr.splitlines()[1:]}
+                self.assertEqual([], [x for x in c[3] if x in imported])
+
     def test_run(self):
         cases = [
             (
@@ -69,6 +111,18 @@ class TestEndToEnd(TestCase):
                 "groupkey",
                 ["-g", "group"],
             ),
+            (
+                "nested groupkey",
+                ["-g", "group", "-g", "another"],
+            ),
+            (
+                "prune",
+                ["-g", "group", "--top_nodes", "3", "--edge_percentile", "90", "--min_count", "1", "--other", "x"],
+            ),
+            (
+                "budget",
+                ["-g", "group", "--max_nodes", "4", "--max_edges", "3"],
+            ),
         ]
         for c in cases:
             with self.subTest(c[0]):
@@ -80,21 +134,187 @@ class TestEndToEnd(TestCase):
                     capture_output=True,
                 )
 
+    def test_other(self):
+        args = ["python", "-m", "json2dot.cli", "--top_nodes", "2", "--other", "n11"]
+        got = run(cmd=args, dir=self.pwd, input=self.source, capture_output=True, text=True).stdout
+        self.assertIn("\tn11 [label=<", got)
+        self.assertIn("\t__json2dot__prune__fold__n11 [label=n11 ", got)
+
+    def test_timings(self):
+        cases = [
+            (
+                "draw",
+                ["--timings"],
+                ["parse", "ranking", "scale", "draw"],
+            ),
+            (
+                "groupkey",
+                ["--timings", "-g", "group"],
+                ["parse", "ranking", "group", "scale", "draw"],
+            ),
+            (
+                "prune",
+                ["--timings", "--top_edges", "3"],
+                ["parse", "prune", "ranking", "scale", "draw"],
+            ),
+            (
+                "debug",
+                ["--timings", "--debug"],
+                ["parse", "ranking", "debug"],
+            ),
+        ]
+        for c in cases:
+            with self.subTest(c[0]):
+                r = run(
+                    cmd=["python", "-m", "json2dot.cli", *c[1]],
+                    dir=self.pwd,
+                    input=self.source,
+                    capture_output=True,
+                    text=True,
+                ).stderr
+                got = json.loads(r)
+                self.assertEqual(c[2], list(got.keys()))
+
+    def test_snapshot(self):
+        lines = self.source.splitlines(keepends=True)
+        args = ["python", "-m", "json2dot.cli", "-g", "group"]
+        want = run(cmd=args, dir=self.pwd, input=self.source, capture_output=True, text=True).stdout
+        with tempfile.TemporaryDirectory() as d:
+            p = str(Path(d) / "snapshot.gz")
+            for i in [0, len(lines) // 2]:
+                with self.subTest(f"split at {i}"):
+                    run(
+                        cmd=[*args, "--snapshot", p],
+                        dir=self.pwd,
+                        input="".join(lines[:i]),
+                        capture_output=True,
+                        text=True,
+                    )
+                    got = run(
+                        cmd=[*args, "--snapshot", p],
+                        dir=self.pwd,
+                        input="".join(lines[i:]),
+                        capture_output=True,
+                        text=True,
+                    ).stdout
+                    os.remove(p)
+                    self.assertEqual(want, got)
+
+    def test_input(self):
+        args = ["python", "-m", "json2dot.cli", "-g", "group"]
+        want = run(cmd=args, dir=self.pwd, input=self.source, capture_output=True, text=True).stdout
+        with tempfile.TemporaryDirectory() as d:
+            gz = Path(d) / "test.json.gz"
+            gz.write_bytes(gzip.compress(self.source.encode()))
+            for name, path in [("plain", str(self.pwd / "tests" / "test.json")), ("gzip", str(gz))]:
+                for jobs in ["1", "2"]:
+                    with self.subTest(f"{name} jobs={jobs}"):
+                        got = run(
+                            cmd=[*args, "--input", path, "-j", jobs],
+                            dir=self.pwd,
+                            capture_output=True,
+                            text=True,
+                        ).stdout
+                        self.assertEqual(want, got)
+            # /dev/stdin is a pipe here, it can be read only once and cannot be mapped
+            for name, data in [("pipe", self.source.encode()), ("gzip pipe", gz.read_bytes())]:
+                for jobs in ["1", "2"]:
+                    with self.subTest(f"{name} jobs={jobs}"):
+                        got = run(
+                            cmd=[*args, "--input", "/dev/stdin", "-j", jobs],
+                            dir=self.pwd,
+                            input=data,
+                            capture_output=True,
+                        ).stdout.decode()
+                        self.assertEqual(want, got)
+
+    def test_tsv(self):
+        rows = [json.loads(x) for x in self.source.splitlines()]
+        args = ["python", "-m", "json2dot.cli"]
+        want = run(
+            cmd=args,
+            dir=self.pwd,
+            input="\n".join(json.dumps({"src": {"id": r["src"]["id"]}, "dst": {"id": r["dst"]["id"]}}) for r in rows),
+            capture_output=True,
+            text=True,
+        ).stdout
+        tsv = "".join(f"{r['src']['id']}\t{r['dst']['id']}\n" for r in rows)
+        with tempfile.TemporaryDirectory() as d:
+            p = Path(d) / "test.tsv"
+            p.write_text(tsv)
+            for name, extra, input in [("stdin", ["--input_format", "tsv"], tsv), ("file", ["--input", str(p)], None)]:
+                with self.subTest(name):
+                    got = run(cmd=[*args, *extra], dir=self.pwd, input=input, capture_output=True, text=True).stdout
+                    self.assertEqual(want, got)
+
+        with self.subTest("window"):
+            with self.assertRaises(subprocess.CalledProcessError):
+                run(
+                    cmd=[*args, "--input_format", "tsv", "--window", "60"],
+                    dir=self.pwd,
+                    input=tsv,
+                    capture_output=True,
+                    text=True,
+                )
+
+    def test_weight_key(self):
+        rows = [json.loads(x) for x in self.source.splitlines()]
+        expanded = "\n".join(json.dumps(r) for i, r in enumerate(rows) for _ in range(i % 3 + 1))
+        weighted = "\n".join(json.dumps({**r, "count": i % 3 + 1}) for i, r in enumerate(rows))
+        for extra in [[], ["-g", "group"]]:
+            with self.subTest(str(extra)):
+                args = ["python", "-m", "json2dot.cli", *extra]
+                want = run(cmd=args, dir=self.pwd, input=expanded, capture_output=True, text=True).stdout
+                got = run(
+                    cmd=[*args, "--weight_key", "count"], dir=self.pwd, input=weighted, capture_output=True, text=True
+                ).stdout
+                self.assertEqual(want, got)
+
+    def test_export(self):
+        with tempfile.TemporaryDirectory() as d:
+            p = Path(d) / "graph.npz"
+            r = run(
+                cmd=["python", "-m", "json2dot.cli", "-g", "group", "--export", str(p), "--timings"],
+                dir=self.pwd,
+                input=self.source,
+                capture_output=True,
+                text=True,
+            )
+            self.assertEqual("", r.stdout)
+            self.assertEqual(["parse", "ranking", "group", "export"], list(json.loads(r.stderr).keys()))
+            got = export.load(p)
+            self.assertIn("degrees", got)
+            self.assertIn("group0_degrees", got)
+
+    def test_serve(self):
+        args = ["python", "-m", "json2dot.cli", "-g", "group"]
+        want = run(cmd=args, dir=self.pwd, input=self.source, capture_output=True, text=True).stdout
+        with tempfile.TemporaryDirectory() as d:
+            p = Path(d) / "out.dot"
+            run(
+                cmd=["python", "-m", "json2dot.cli", "serve", "-g", "group", "-o", str(p)],
+                dir=self.pwd,
+                input=self.source,
+                capture_output=True,
+                text=True,
+            )
+            self.assertEqual(want, p.read_text())
+
     def test_debug_golden(self):
         cases = [
             (
                 "debug",
-                ["--debug"],
+                ["--debug", "--keep_source"],
                 self.debug,
             ),
             (
                 "namekey",
-                ["--debug", "-k", "another"],
+                ["--debug", "--keep_source", "-k", "another"],
                 self.debug_name_another,
             ),
             (
                 "groupkey",
-                ["--debug", "-g", "group"],
+                ["--debug", "--keep_source", "-g", "group"],
                 self.debug_group,
             ),
         ]
@@ -109,3 +329,40 @@ class TestEndToEnd(TestCase):
                 ).stdout
                 got = json.loads(r)
                 self.assertEqual(c[2], got)
+
+    def test_debug_sections(self):
+        args = ["python", "-m", "json2dot.cli", "--debug", "--keep_source", "-g", "group"]
+        cases = [
+            ("stat", ["--debug_section", "stat"], {"stat": self.debug_group["stat"]}),
+            (
+                "nodes",
+                ["--debug_section", "map", "--debug_section", "source", "--debug_source_limit", "2"],
+                {"nodes": {"map": self.debug_group["nodes"]["map"], "source": self.debug_group["nodes"]["source"][:2]}},
+            ),
+        ]
+        for c in cases:
+            with self.subTest(c[0]):
+                r = run(cmd=[*args, *c[1]], dir=self.pwd, input=self.source, capture_output=True, text=True).stdout
+                self.assertEqual(c[2], json.loads(r))
+
+        with self.subTest("jsonl"):
+            r = run(
+                cmd=[*args, "--debug_format", "jsonl"], dir=self.pwd, input=self.source, capture_output=True, text=True
+            ).stdout
+            got: dict = {}
+            for line in r.splitlines():
+                x = json.loads(line)
+                d = got
+                for k in x["section"].split("."):
+                    d = d.setdefault(k, {})
+                if "key" in x:
+                    d[x["key"]] = x["value"]
+                else:
+                    d[len(d)] = x["value"]
+            want = self.debug_group
+            self.assertEqual(want["stat"], got["stat"])
+            self.assertEqual(want["group"]["stat"], got["group"]["stat"])
+            self.assertEqual(want["nodes"]["map"], got["nodes"]["map"])
+            self.assertEqual(want["nodes"]["source"], list(got["nodes"]["source"].values()))
+            self.assertEqual(want["ranking"]["nodes"], list(got["ranking"]["nodes"].values()))
+            self.assertEqual(want["ranking"]["edges"], got["ranking"]["edges"])
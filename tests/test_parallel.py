@@ -0,0 +1,86 @@
+import gzip
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+import json2dot.parallel as parallel
+from json2dot.build import Accumulator
+
+
+class TestParallel(TestCase):
+    def test_split_lines(self):
+        cases = [
+            (
+                "empty",
+                b"",
+                3,
+                [],
+            ),
+            (
+                "1 chunk",
+                b"a\nb\n",
+                1,
+                [(0, 4)],
+            ),
+            (
+                "lines",
+                b"a\nb\nc\nd\n",
+                2,
+                [(0, 6), (6, 8)],
+            ),
+            (
+                "more chunks than lines",
+                b"aaa\nb",
+                4,
+                [(0, 4), (4, 5)],
+            ),
+        ]
+        for c in cases:
+            with self.subTest(c[0]):
+                got = parallel.split_lines(c[1], c[2])
+                self.assertEqual(c[3], got)
+
+    def test_consume(self):
+        with open(Path(__file__).parent / "test.json", "rb") as f:
+            data = f.read()
+        want = Accumulator(ignore_selfloop=True, keep_source=True).consume(data.splitlines())
+        for jobs in [1, 2, 3]:
+            with self.subTest(f"jobs={jobs}"):
+                got = parallel.consume(data, jobs, ignore_selfloop=True, keep_source=True, decoder="json")
+                self.assertEqual(list(want.nodes.map.items()), list(got.nodes.map.items()))
+                self.assertEqual(want.nodes.source, got.nodes.source)
+                self.assertEqual(list(want.stat.nodes.nodes.items()), list(got.stat.nodes.nodes.items()))
+                self.assertEqual(list(want.stat.edges.edges.items()), list(got.stat.edges.edges.items()))
+
+    def test_consume_weight_key(self):
+        data = b"".join(
+            b'{"src":{"id":"%s"},"dst":{"id":"%s"},"count":%d}\n' % (s, d, c)
+            for s, d, c in [(b"a", b"b", 2), (b"b", b"c", 3), (b"a", b"b", 4), (b"c", b"a", 0)]
+        )
+        for jobs in [1, 2, 3]:
+            with self.subTest(f"jobs={jobs}"):
+                got = parallel.consume(data, jobs, decoder="json", keys=["count"], weight_key="count")
+                self.assertEqual({("a", "b"): 6, ("b", "c"): 3}, got.stat.edges.edges)
+                self.assertEqual(["a", "b", "c"], list(got.nodes.map.keys()))
+
+    def test_consume_file(self):
+        p = Path(__file__).parent / "test.json"
+        with open(p, "rb") as f:
+            data = f.read()
+        want = Accumulator(ignore_selfloop=True, keep_source=True).consume(data.splitlines())
+        with tempfile.TemporaryDirectory() as d:
+            gz = Path(d) / "test.json.gz"
+            gz.write_bytes(gzip.compress(data))
+            empty = Path(d) / "empty.json"
+            empty.touch()
+            for name, path in [("plain", p), ("gzip", gz)]:
+                for jobs in [1, 2, 3]:
+                    with self.subTest(f"{name} jobs={jobs}"):
+                        got = parallel.consume_file(path, jobs, ignore_selfloop=True, keep_source=True, decoder="json")
+                        self.assertEqual(list(want.nodes.map.items()), list(got.nodes.map.items()))
+                        self.assertEqual(want.nodes.source, got.nodes.source)
+                        self.assertEqual(list(want.stat.edges.edges.items()), list(got.stat.edges.edges.items()))
+            for jobs in [1, 2]:
+                with self.subTest(f"empty jobs={jobs}"):
+                    got = parallel.consume_file(empty, jobs)
+                    self.assertEqual(0, len(got.stat.edges))
@@ -0,0 +1,127 @@
+from unittest import TestCase
+
+import json2dot.prune as prune
+from json2dot.stat import Ranking, Stat
+
+
+class TestPrune(TestCase):
+    def test_select(self):
+        items = [(0, 1), (1, 4), (2, 2), (3, 2), (4, 1)]  # 10 in total
+        cases = [
+            ("nothing", None, None, {0, 1, 2, 3, 4}),
+            ("top", 2, None, {1, 2}),
+            ("top ties in order", 4, None, {0, 1, 2, 3}),
+            ("top all", 10, None, {0, 1, 2, 3, 4}),
+            ("top 0", 0, None, set()),
+            ("percentile", None, 60, {1, 2}),
+            ("percentile below first", None, 30, set()),
+            ("percentile 100", None, 100, {0, 1, 2, 3, 4}),
+            ("top and percentile", 1, 80, {1}),
+            ("percentile and top", 3, 60, {1, 2}),
+        ]
+        for c in cases:
+            with self.subTest(c[0]):
+                self.assertEqual(c[3], prune.select(items, c[1], c[2]))
+
+    def test_select_as_ranking(self):
+        s = Stat.default()
+        for x, y in [("n1", "n2"), ("n1", "n2"), ("n2", "n3"), ("n3", "n1"), ("n3", "n4"), ("n3", "n4")]:
+            s.add(x, y)
+        r = Ranking.new(s)
+        for p in [0, 25, 50, 75, 100]:
+            with self.subTest(f"percentile {p}"):
+                want = {k for k, v in zip(r.edges.keys, r.edges.value_percentiles) if v <= p}
+                self.assertEqual(want, prune.select(s.edges.keys(), percentile=p))
+
+    def test_pruning(self):
+        s = Stat.default()
+        for x, y in [("n1", "n2"), ("n1", "n2"), ("n1", "n2"), ("n2", "n3"), ("n3", "n4"), ("n4", "n5"), ("n5", "n4")]:
+            s.add(x, y)
+        # degrees: n1 3, n2 4, n3 2, n4 3, n5 2
+        other = prune.fold_id("other")
+        cases = [
+            (
+                "top edges",
+                prune.Pruning(top_edges=2),
+                [(("n1", "n2"), 3), (("n2", "n3"), 1)],
+            ),
+            (
+                "min count",
+                prune.Pruning(min_count=2),
+                [(("n1", "n2"), 3)],
+            ),
+            (
+                "top nodes",
+                prune.Pruning(top_nodes=3),
+                [(("n1", "n2"), 3)],
+            ),
+            (
+                "top nodes and other",
+                prune.Pruning(top_nodes=3, other="other"),
+                [(("n1", "n2"), 3), (("n2", other), 1), ((other, "n4"), 2), (("n4", other), 1)],
+            ),
+            (
+                "top nodes and top edges",
+                prune.Pruning(top_nodes=3, top_edges=4, other="other"),
+                [(("n1", "n2"), 3), (("n2", other), 1), ((other, "n4"), 1), (("n4", other), 1)],
+            ),
+        ]
+        for c in cases:
+            with self.subTest(c[0]):
+                got = c[1].run(s)
+                self.assertEqual(c[2], list(got.edges.items()))
+
+        with self.subTest("ignore selfloop of other"):
+            got = prune.Pruning(top_nodes=1, other="other").run(s, ignore_selfloop=True)
+            self.assertEqual([((other, "n2"), 3), (("n2", other), 1)], list(got.edges.items()))
+
+        with self.subTest("disabled"):
+            self.assertIs(s, prune.Pruning(other="other").run(s))
+
+        with self.subTest("node named other"):
+            t = Stat.default()
+            for x, y in [("n1", "other"), ("n1", "other"), ("n2", "n3")]:
+                t.add(x, y)
+            got = prune.Pruning(top_nodes=2, other="other").run(t, ignore_selfloop=True)
+            self.assertEqual([(("n1", "other"), 2)], list(got.edges.items()))
+            got = prune.Pruning(top_nodes=3, other="other").run(t)
+            self.assertEqual([(("n1", "other"), 2), (("n2", other), 1)], list(got.edges.items()))
+            self.assertEqual("other", prune.fold_label(other))
+            self.assertIsNone(prune.fold_label("other"))
+
+    def test_fold_leaves(self):
+        s = Stat.default()
+        for x, y in [("h", "a"), ("b", "h"), ("h", "c"), ("h", "x"), ("x", "y"), ("y", "x"), ("p", "q"), ("a", "a")]:
+            s.add(x, y)
+        h3 = prune.fold_id("h (+3)")
+        cases = [
+            (
+                "keep selfloop",
+                False,
+                [
+                    (("h", h3), 2),
+                    ((h3, "h"), 1),
+                    (("h", "x"), 1),
+                    (("x", "y"), 1),
+                    (("y", "x"), 1),
+                    (("p", "q"), 1),
+                    ((h3, h3), 1),
+                ],
+            ),
+            (
+                "ignore selfloop",
+                True,
+                [
+                    (("h", h3), 2),
+                    ((h3, "h"), 1),
+                    (("h", "x"), 1),
+                    (("x", "y"), 1),
+                    (("y", "x"), 1),
+                    (("p", "q"), 1),
+                ],
+            ),
+        ]
+        for c in cases:
+            with self.subTest(c[0]):
+                got = prune.fold_leaves(s, ignore_selfloop=c[1])
+                self.assertEqual(c[2], list(got.edges.items()))
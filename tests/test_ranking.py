@@ -1,7 +1,9 @@
 from typing import TypeVar
 from unittest import TestCase
+from unittest.mock import patch
 
 import json2dot.ranking as ranking
+import json2dot.vector as vector
 
 K = TypeVar("K")
 
@@ -32,3 +34,35 @@ class TestRanking(TestCase):
         self.assertEqual(want.place, got.place)
         self.assertAlmostEqual(want.percentile, got.percentile)
         self.assertAlmostEqual(want.value_percentile, got.value_percentile)
+
+    def test_ranking_lookup(self):
+        got = ranking.Ranking.build({"a": 1, "b": 3})
+        self.assertEqual(["b", "a"], got.keys)
+        self.assertAlmostEqual(75, got.value_percentile("b"))
+        self.assertAlmostEqual(100, got.value_percentile("a"))
+        self.assertAlmostEqual(-1, got.value_percentile("c", -1))
+        self.assertEqual(["B", "A"], got.map_keys(str.upper).keys)
+
+    def test_ranking_vectorized(self):
+        if vector.numpy() is None:
+            self.skipTest("numpy is not installed")
+        cases = [
+            (
+                "empty",
+                {},
+            ),
+            (
+                "ties",
+                {"b": 2, "c": 3, "a": 2, "d": 4, "e": 3, "f": 1},
+            ),
+            (
+                "many",
+                {f"k{i}": (i * 7919) % 13 + 1 for i in range(100)},
+            ),
+        ]
+        for c in cases:
+            with self.subTest(c[0]):
+                want = ranking.Ranking.build(c[1])
+                with patch.object(vector, "THRESHOLD", 0):
+                    got = ranking.Ranking.build(c[1])
+                self.assertEqual(want.elems, got.elems)
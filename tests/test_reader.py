@@ -0,0 +1,79 @@
+import gzip
+import os
+import tempfile
+import threading
+from pathlib import Path
+from unittest import TestCase
+
+import json2dot.reader as reader
+
+
+class TestReader(TestCase):
+    def test_open_lines(self):
+        cases = [
+            ("empty", b"", []),
+            ("lines", b"a\nb\n", [b"a\n", b"b\n"]),
+            ("no trailing newline", b"a\nb", [b"a\n", b"b"]),
+            ("blank line", b"a\n\nb\n", [b"a\n", b"\n", b"b\n"]),
+        ]
+        with tempfile.TemporaryDirectory() as d:
+            for c in cases:
+                for compression in [None, "gzip"]:
+                    with self.subTest(f"{c[0]} {compression}"):
+                        p = Path(d) / "input"
+                        p.write_bytes(gzip.compress(c[1]) if compression == "gzip" else c[1])
+                        self.assertEqual(compression, reader.compression(p))
+                        with reader.open_lines(p) as lines:
+                            self.assertEqual(c[2], list(lines))
+
+    def test_open_lines_fifo(self):
+        cases = [
+            ("plain", b"a\nb\n"),
+            ("gzip", gzip.compress(b"a\nb\n")),
+            ("empty", b""),
+        ]
+        with tempfile.TemporaryDirectory() as d:
+            for c in cases:
+                with self.subTest(c[0]):
+                    p = Path(d) / c[0]
+                    os.mkfifo(p)
+                    self.assertFalse(reader.is_regular(p))
+                    t = threading.Thread(target=p.write_bytes, args=(c[1],))
+                    t.start()
+                    try:
+                        with reader.open_lines(p) as lines:
+                            self.assertEqual([] if c[0] == "empty" else [b"a\n", b"b\n"], list(lines))
+                    finally:
+                        t.join()
+
+    def test_mmap_lines(self):
+        data = b"aa\nbb\ncc\n"
+        cases = [
+            ("all", 0, None, [b"aa\n", b"bb\n", b"cc\n"]),
+            ("range", 3, 6, [b"bb\n"]),
+            ("end in the middle of a line", 0, 4, [b"aa\n", b"bb\n"]),
+            ("empty range", 6, 6, []),
+        ]
+        with tempfile.TemporaryDirectory() as d:
+            p = Path(d) / "input"
+            p.write_bytes(data)
+            with reader.open_mmap(p) as mm:
+                for c in cases:
+                    with self.subTest(c[0]):
+                        self.assertEqual(c[3], list(reader.mmap_lines(mm, c[1], c[2])))
+
+    def test_zstd(self):
+        with tempfile.TemporaryDirectory() as d:
+            p = Path(d) / "input.zst"
+            p.write_bytes(reader.ZSTD_MAGIC + b"\x00\x00")
+            self.assertEqual("zstd", reader.compression(p))
+            try:
+                import zstandard
+            except ImportError:
+                with self.assertRaises(reader.ReaderException):
+                    with reader.open_lines(p):
+                        pass
+                return
+            p.write_bytes(zstandard.ZstdCompressor().compress(b"a\nb\n"))
+            with reader.open_lines(p) as lines:
+                self.assertEqual([b"a\n", b"b\n"], list(lines))
@@ -101,3 +101,106 @@ class TestRow(TestCase):
             with self.subTest(c[0]):
                 got = row.Row.loads(c[1])
                 self.assertEqual(c[2], got)
+
+    def test_weight(self):
+        cases = [
+            ("no key", {"count": 3}, None, 1),
+            ("not found", {}, "count", 1),
+            ("int", {"count": 3}, "count", 3),
+            ("zero", {"count": 0}, "count", 0),
+            ("integral float", {"count": 2.0}, "count", 2),
+        ]
+        for c in cases:
+            with self.subTest(c[0]):
+                r = row.Row(row.Node(id="a"), row.Node(id="b"), attrs=c[1])
+                self.assertEqual(c[3], r.weight(c[2]))
+
+        for name, value in [("negative", -1), ("float", 1.5), ("str", "1"), ("bool", True)]:
+            with self.subTest(name):
+                with self.assertRaises(row.RowException):
+                    row.parse_weight(value)
+
+    def test_node_merge(self):
+        with self.subTest("other id mismatch"):
+            with self.assertRaises(row.RowException):
+                row.Node(id="a").merge(row.Node(id="b"))
+
+        cases = [
+            (
+                "identity",
+                row.MergePolicy.LAST,
+                row.Node(id="a"),
+                row.Node(id="a"),
+                row.Node(id="a"),
+            ),
+            (
+                "last",
+                row.MergePolicy.LAST,
+                row.Node(id="a", desc={"n": 0, "m": 1}),
+                row.Node(id="a", desc={"n": 10, "l": 2}),
+                row.Node(id="a", desc={"n": 10, "m": 1, "l": 2}),
+            ),
+            (
+                "first",
+                row.MergePolicy.FIRST,
+                row.Node(id="a", desc={"n": 0, "m": 1}),
+                row.Node(id="a", desc={"n": 10, "l": 2}),
+                row.Node(id="a", desc={"n": 0, "m": 1}),
+            ),
+            (
+                "first empty",
+                row.MergePolicy.FIRST,
+                row.Node(id="a"),
+                row.Node(id="a", desc={"n": 10}),
+                row.Node(id="a", desc={"n": 10}),
+            ),
+            (
+                "new",
+                row.MergePolicy.NEW,
+                row.Node(id="a", desc={"n": 0, "m": 1}),
+                row.Node(id="a", desc={"n": 10, "l": 2}),
+                row.Node(id="a", desc={"n": 0, "m": 1, "l": 2}),
+            ),
+        ]
+        for c in cases:
+            with self.subTest(c[0]):
+                got = c[2]
+                got.merge(c[3], c[1])
+                self.assertEqual(c[4], got)
+
+    def test_nodemap_keep_source(self):
+        rows = [
+            row.Row.loads('{"src":{"id":"a","n":0},"dst":{"id":"b"}}'),
+            row.Row.loads('{"src":{"id":"a","n":1},"dst":{"id":"b","m":2}}'),
+        ]
+        m = row.NodeMap()
+        for r in rows:
+            m.add(r)
+        self.assertEqual(row.Node(id="a", desc={"n": 1}), m.map["a"])
+        self.assertEqual(row.Node(id="b", desc={"m": 2}), m.map["b"])
+        self.assertEqual(row.Node(id="a", desc={"n": 0}), m.source[0].src)
+        self.assertEqual(row.Node(id="b"), m.source[0].dst)
+
+    def test_nodemap_merge(self):
+        rows = [
+            '{"src":{"id":"a"},"dst":{"id":"b","n":0}}',
+            '{"src":{"id":"a","n":1},"dst":{"id":"c"}}',
+            '{"src":{"id":"b","n":2,"m":3},"dst":{"id":"a","m":4}}',
+            '{"src":{"id":"d"},"dst":{"id":"c","n":5}}',
+        ]
+        for policy in row.MergePolicy:
+            for keep_source in [True, False]:
+                want = row.NodeMap(keep_source=keep_source, policy=policy)
+                for r in rows:
+                    want.add(row.Row.loads(r))
+                for i in range(len(rows) + 1):
+                    with self.subTest(f"{policy} keep_source={keep_source} split at {i}"):
+                        got = row.NodeMap(keep_source=keep_source, policy=policy)
+                        other = row.NodeMap(keep_source=keep_source, policy=policy)
+                        for r in rows[:i]:
+                            got.add(row.Row.loads(r))
+                        for r in rows[i:]:
+                            other.add(row.Row.loads(r))
+                        got.merge(other)
+                        self.assertEqual(list(want.map.items()), list(got.map.items()))
+                        self.assertEqual(want.source, got.source)
@@ -0,0 +1,53 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+import json2dot.scale as scale
+import json2dot.vector as vector
+from json2dot.mathx import Clamp
+from json2dot.stat import Ranking, Stat
+
+
+class TestScale(TestCase):
+    def new_scaler(self, ranking: Ranking) -> scale.Scaler:
+        return scale.Scaler(
+            ranking=ranking,
+            penwidth=scale.ClampSetting(Clamp.new(1, 5)),
+            arrowsize=scale.ClampSetting(Clamp.new(1, 2)),
+            weight=scale.FixedSetting(Clamp.new(1, 100)),
+            fontsize=scale.ClampSetting(Clamp.new(8, 48)),
+        )
+
+    def test_scaler(self):
+        s = Stat.default()
+        for x, y in [("n1", "n2"), ("n1", "n2"), ("n2", "n3"), ("n3", "n1")]:
+            s.add(x, y)
+        got = self.new_scaler(Ranking.new(s))
+        cases = [
+            ("fontsize n1", got.get_fontsize("n1"), 48 - 40 * 3 / 8),
+            ("fontsize n3", got.get_fontsize("n3"), 8),
+            ("fontsize unknown", got.get_fontsize("unknown"), 8),
+            ("penwidth n1 n2", got.get_penwidth("n1", "n2"), 5 - 4 * 2 / 4),
+            ("penwidth n3 n1", got.get_penwidth("n3", "n1"), 1),
+            ("penwidth unknown", got.get_penwidth("n2", "n1"), 1),
+            ("arrowsize n1 n2", got.get_arrowsize("n1", "n2"), 2 - 2 / 4),
+            ("weight n1 n2", got.get_weight("n1", "n2"), 100),
+            ("weight unknown", got.get_weight("n2", "n1"), 100),
+        ]
+        for c in cases:
+            with self.subTest(c[0]):
+                self.assertAlmostEqual(c[2], c[1])
+
+    def test_scaler_vectorized(self):
+        if vector.numpy() is None:
+            self.skipTest("numpy is not installed")
+        s = Stat.default()
+        for i in range(200):
+            s.add(f"n{i % 17}", f"n{(i * 31) % 23}")
+        want = self.new_scaler(Ranking.new(s))
+        with patch.object(vector, "THRESHOLD", 0):
+            got = self.new_scaler(Ranking.new(s))
+        for (x, y), _ in s.edges.items():
+            self.assertEqual(want.get_fontsize(x), got.get_fontsize(x))
+            self.assertEqual(want.get_penwidth(x, y), got.get_penwidth(x, y))
+            self.assertEqual(want.get_arrowsize(x, y), got.get_arrowsize(x, y))
+            self.assertEqual(want.get_weight(x, y), got.get_weight(x, y))
@@ -0,0 +1,138 @@
+import io
+import socket
+import tempfile
+import threading
+import time
+from contextlib import redirect_stderr
+from pathlib import Path
+from unittest import TestCase
+
+import json2dot.decoder as decoder
+import json2dot.serve as serve
+from json2dot.build import Accumulator
+
+
+def draw(acc: Accumulator) -> str:
+    return "\n".join(f"{s} {d} {w}" for (s, d), w in sorted(acc.stat.edges.edges.items()))
+
+
+def wait_until(f, timeout: float = 5) -> bool:
+    deadline = time.monotonic() + timeout
+    while not f():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.sources: list[str] = []
+
+    def __call__(self, source: str) -> None:
+        self.sources.append(source)
+
+
+class TestServe(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(Path(__file__).parent / "test.json") as f:
+            cls.source = f.read().splitlines(keepends=True)
+        cls.want = draw(Accumulator().consume(cls.source))
+
+    def test_feed(self):
+        r = Recorder()
+        s = serve.Server(Accumulator(), draw, r, debounce=0.05)
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            n = s.feed(["", "{", '{"src":{}}', *self.source])
+        self.assertEqual(len(self.source), n)
+        self.assertEqual(2, stderr.getvalue().count("skip row"))
+        s.stop()
+        self.assertEqual([self.want], r.sources)
+
+    def test_feed_malformed(self):
+        for name, d in decoder.decoders.items():
+            try:
+                dec = d(())
+            except ImportError:
+                continue
+            with self.subTest(name):
+                r = Recorder()
+                s = serve.Server(Accumulator(decoder=dec), draw, r, debounce=0.05)
+                stderr = io.StringIO()
+                with redirect_stderr(stderr):
+                    n = s.feed(['{"src":{"id":"a"},"dst":', b"not json\n", *self.source])
+                self.assertEqual(len(self.source), n)
+                self.assertEqual(2, stderr.getvalue().count("skip row"))
+                s.stop()
+                self.assertEqual([self.want], r.sources)
+
+    def test_debounce(self):
+        r = Recorder()
+        s = serve.Server(Accumulator(), draw, r, debounce=0.3)
+        s.start()
+        for line in self.source:
+            s.feed([line])
+        self.assertTrue(wait_until(lambda: s.renders > 0))
+        time.sleep(0.1)
+        self.assertEqual([self.want], r.sources)
+        s.stop()
+        self.assertEqual(1, s.renders)
+
+    def test_interval(self):
+        r = Recorder()
+        s = serve.Server(Accumulator(), draw, r, debounce=0, interval=0.01)
+        s.start()
+        self.assertTrue(wait_until(lambda: s.renders >= 3))
+        s.stop()
+
+    def test_follow(self):
+        with tempfile.TemporaryDirectory() as d:
+            p = Path(d) / "source.jsonl"
+            stopped = threading.Event()
+            got: list[bytes] = []
+            t = threading.Thread(target=lambda: got.extend(serve.follow(p, poll=0.01, stopped=stopped)))
+            t.start()
+            try:
+                with open(p, "w") as f:
+                    f.write("a\nb")
+                self.assertTrue(wait_until(lambda: got == [b"a\n"]))
+                with open(p, "a") as f:
+                    f.write("c\n")
+                self.assertTrue(wait_until(lambda: got == [b"a\n", b"bc\n"]))
+                with open(p, "w") as f:  # truncate
+                    f.write("d\n")
+                self.assertTrue(wait_until(lambda: got == [b"a\n", b"bc\n", b"d\n"]))
+            finally:
+                stopped.set()
+                t.join()
+
+    def test_socket(self):
+        r = Recorder()
+        s = serve.Server(Accumulator(), draw, r, debounce=0.05)
+        s.start()
+        with tempfile.TemporaryDirectory() as d:
+            p = Path(d) / "json2dot.sock"
+            with serve.unix_server(p, s) as u:
+                t = threading.Thread(target=u.serve_forever)
+                t.start()
+                try:
+                    half = len(self.source) // 2
+                    for lines in [self.source[:half], self.source[half:]]:
+                        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as c:
+                            c.connect(str(p))
+                            c.sendall("".join(lines).encode())
+                    self.assertTrue(wait_until(lambda: r.sources[-1:] == [self.want]))
+                finally:
+                    u.shutdown()
+                    t.join()
+        s.stop()
+
+    def test_save(self):
+        with tempfile.TemporaryDirectory() as d:
+            p = Path(d) / "out.dot"
+            serve.save([p], "digraph {\n}\n")
+            serve.save([p], "digraph {\n\tn1\n}\n")
+            self.assertEqual([p], list(Path(d).iterdir()))
+            self.assertEqual("digraph {\n\tn1\n}\n", p.read_text())
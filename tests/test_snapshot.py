@@ -0,0 +1,76 @@
+import gzip
+from datetime import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+import json2dot.snapshot as snapshot
+from json2dot.build import Accumulator
+from json2dot.row import MergePolicy, Node
+
+
+class TestSnapshot(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(Path(__file__).parent / "test.json") as f:
+            cls.source = f.read().splitlines()
+
+    def test_incremental(self):
+        for ignore_selfloop in [True, False]:
+            for policy in MergePolicy:
+                want = Accumulator(ignore_selfloop=ignore_selfloop, policy=policy).consume(self.source)
+                for i in [0, 1, len(self.source) // 2, len(self.source)]:
+                    with self.subTest(f"ignore_selfloop={ignore_selfloop} policy={policy} split at {i}"):
+                        acc = Accumulator(ignore_selfloop=ignore_selfloop, policy=policy).consume(self.source[:i])
+                        data = snapshot.dumps(acc)
+                        got = snapshot.loads(data, ignore_selfloop=ignore_selfloop, policy=policy)
+                        got.consume(self.source[i:])
+                        self.assertEqual(list(want.nodes.map.items()), list(got.nodes.map.items()))
+                        self.assertEqual(list(want.stat.nodes.items()), list(got.stat.nodes.items()))
+                        self.assertEqual(list(want.stat.edges.items()), list(got.stat.edges.items()))
+                        for node_id in want.nodes.map:
+                            self.assertEqual(want.stat.report(node_id), got.stat.report(node_id))
+
+    def test_save_load(self):
+        acc = Accumulator(ignore_selfloop=True).consume(self.source)
+        with TemporaryDirectory() as d:
+            p = Path(d) / "snapshot.gz"
+            snapshot.save(acc, p)
+            snapshot.save(acc, p)  # overwrite
+            self.assertEqual([p], list(Path(d).iterdir()))
+            got = snapshot.load(p, ignore_selfloop=True)
+        self.assertEqual(acc.stat.edges.edges, got.stat.edges.edges)
+
+    def test_not_json_desc(self):
+        acc = Accumulator().consume(self.source)
+        acc.nodes.add_node(Node(id="t", desc={"time": datetime(2024, 1, 2, 3, 4, 5), "raw": b"x"}))
+        got = snapshot.loads(snapshot.dumps(acc))
+        self.assertEqual({"time": "2024-01-02 03:04:05", "raw": "b'x'"}, got.nodes.map["t"].desc)
+
+    def test_mismatch(self):
+        data = snapshot.dumps(Accumulator(ignore_selfloop=True).consume(self.source))
+        cases = [
+            ("ignore_selfloop", data, {"ignore_selfloop": False}),
+            ("policy", data, {"ignore_selfloop": True, "policy": MergePolicy.NEW}),
+            ("weight_key", data, {"ignore_selfloop": True, "weight_key": "count"}),
+            ("not gzip", b"{}", {"ignore_selfloop": True}),
+            ("version", gzip.compress(b'{"version":0}'), {"ignore_selfloop": True}),
+            (
+                "edges",
+                gzip.compress(
+                    b'{"version":1,"ignore_selfloop":true,"merge_policy":"last","nodes":{},"names":["a"],"edges":[0,1,1]}'
+                ),
+                {"ignore_selfloop": True},
+            ),
+            (
+                "weight",
+                gzip.compress(
+                    b'{"version":1,"ignore_selfloop":true,"merge_policy":"last","nodes":{},"names":["a"],"edges":[0,0,0]}'
+                ),
+                {"ignore_selfloop": True},
+            ),
+        ]
+        for c in cases:
+            with self.subTest(c[0]):
+                with self.assertRaises(snapshot.SnapshotException):
+                    snapshot.loads(c[1], **c[2])
@@ -73,3 +73,143 @@ class TestStat(TestCase):
                 for x in c[1]:
                     s.add(x)
                 self.assertEqual(c[2], s.nodes)
+
+    def test_stat_report(self):
+        s = stat.Stat.default()
+        for x, y in [("n1", "n2"), ("n1", "n2"), ("n1", "n3"), ("n2", "n3"), ("n3", "n3")]:
+            s.add(x, y)
+        cases = [
+            (
+                "n1",
+                stat.Report(node_id="n1", in_deg=0, out_deg=3, in_uniq=0, out_uniq=2),
+            ),
+            (
+                "n2",
+                stat.Report(node_id="n2", in_deg=2, out_deg=1, in_uniq=1, out_uniq=1),
+            ),
+            (
+                "n3",
+                stat.Report(node_id="n3", in_deg=3, out_deg=1, in_uniq=3, out_uniq=1),
+            ),
+            (
+                "unknown",
+                stat.Report(node_id="unknown", in_deg=0, out_deg=0, in_uniq=0, out_uniq=0),
+            ),
+        ]
+        for c in cases:
+            with self.subTest(c[0]):
+                self.assertEqual(c[1], s.report(c[0]))
+
+        with self.subTest("from existing edges"):
+            got = stat.Stat(s.nodes, s.edges)
+            for c in cases:
+                self.assertEqual(c[1], got.report(c[0]))
+
+    def test_stat_merge(self):
+        edges = [("n1", "n2"), ("n1", "n2"), ("n1", "n3"), ("n2", "n3"), ("n3", "n3"), ("n4", "n1"), ("n3", "n3")]
+        want = stat.Stat.default()
+        for x, y in edges:
+            want.add(x, y)
+        for i in range(len(edges) + 1):
+            with self.subTest(f"split at {i}"):
+                got = stat.Stat.default()
+                other = stat.Stat.default()
+                for x, y in edges[:i]:
+                    got.add(x, y)
+                for x, y in edges[i:]:
+                    other.add(x, y)
+                got.merge(other)
+                self.assertEqual(list(want.nodes.nodes.items()), list(got.nodes.nodes.items()))
+                self.assertEqual(list(want.edges.edges.items()), list(got.edges.edges.items()))
+                for n in ["n1", "n2", "n3", "n4"]:
+                    self.assertEqual(want.report(n), got.report(n))
+
+    def test_stat_collapse(self):
+        s = stat.Stat.default()
+        for x, y in [("n1", "n2"), ("n1", "n2"), ("n2", "n3"), ("n3", "n4"), ("n4", "n3"), ("n4", "n1")]:
+            s.add(x, y)
+        # n1, n2, n3, n4 -> a, b, b, c
+        groups = [2, 0, 0, 1]
+        names = ["b", "c", "a"]
+        cases = [
+            (
+                "keep selfloop",
+                False,
+                [("a", 3), ("b", 6), ("c", 3)],
+                [(("a", "b"), 2), (("b", "b"), 1), (("b", "c"), 1), (("c", "b"), 1), (("c", "a"), 1)],
+            ),
+            (
+                "ignore selfloop",
+                True,
+                [("a", 3), ("b", 4), ("c", 3)],
+                [(("a", "b"), 2), (("b", "c"), 1), (("c", "b"), 1), (("c", "a"), 1)],
+            ),
+        ]
+        for c in cases:
+            with self.subTest(c[0]):
+                got = s.collapse(groups, names, ignore_selfloop=c[1])
+                self.assertEqual(c[2], list(got.nodes.nodes.items()))
+                self.assertEqual(c[3], list(got.edges.edges.items()))
+                self.assertEqual(stat.Report(node_id="a", in_deg=1, out_deg=2, in_uniq=1, out_uniq=1), got.report("a"))
+
+    def test_stat_remove(self):
+        s = stat.Stat.default()
+        for x, y in [("n1", "n2"), ("n1", "n2"), ("n1", "n3"), ("n3", "n1")]:
+            s.add(x, y)
+        s.add("n1", "n2", -1)
+        s.add("n1", "n3", -1)
+        self.assertEqual({("n1", "n2"): 1, ("n3", "n1"): 1}, s.edges.edges)
+        self.assertEqual({"n1": 2, "n2": 1, "n3": 1}, s.nodes.nodes)
+        self.assertEqual(stat.Report(node_id="n1", in_deg=1, out_deg=1, in_uniq=1, out_uniq=1), s.report("n1"))
+        self.assertEqual(stat.Report(node_id="n3", in_deg=0, out_deg=1, in_uniq=0, out_uniq=1), s.report("n3"))
+        with self.assertRaises(ValueError):
+            s.add("n1", "n2", -2)
+        self.assertEqual(1, s.edges.get("n1", "n2"))
+        self.assertEqual(2, s.nodes.get("n1"))
+        s.add("n1", "n3")
+        self.assertEqual(stat.Report(node_id="n3", in_deg=1, out_deg=1, in_uniq=1, out_uniq=1), s.report("n3"))
+
+    def test_interner(self):
+        s = stat.Interner()
+        self.assertEqual(0, s.intern("n1"))
+        self.assertEqual(1, s.intern("n2"))
+        self.assertEqual(0, s.intern("n1"))
+        self.assertEqual(1, s.get("n2"))
+        self.assertIsNone(s.get("n3"))
+        self.assertEqual(["n1", "n2"], s.names)
+        self.assertEqual(2, len(s))
+
+    def test_stat_separate_interners(self):
+        with self.subTest("empty"):
+            s = stat.Stat(stat.NodeStat(), stat.EdgeStat())
+            s.add("n1", "n2")
+            s.add("n1", "n2")
+            s.add("n2", "n3")
+            self.assertEqual({"n1": 2, "n2": 3, "n3": 1}, s.nodes.nodes)
+            self.assertEqual({("n1", "n2"): 2, ("n2", "n3"): 1}, s.edges.edges)
+            self.assertEqual(stat.Report("n2", in_deg=2, out_deg=1, in_uniq=1, out_uniq=1), s.report("n2"))
+
+        with self.subTest("filled"):
+            nodes = stat.NodeStat()
+            nodes.add("n2", 2)
+            nodes.add("n1", 1)
+            nodes.add("n3", 1)
+            edges = stat.EdgeStat()
+            edges.add("n1", "n2")
+            edges.add("n3", "n2")
+            s = stat.Stat(nodes, edges)
+            self.assertIs(s.interner, s.edges.interner)
+            self.assertEqual({("n1", "n2"): 1, ("n3", "n2"): 1}, s.edges.edges)
+            self.assertEqual(stat.Report("n2", in_deg=2, out_deg=0, in_uniq=2, out_uniq=0), s.report("n2"))
+
+    def test_ranking(self):
+        s = stat.Stat.default()
+        for x, y in [("n1", "n2"), ("n1", "n2"), ("n2", "n3")]:
+            s.add(x, y)
+        r = stat.Ranking.new(s)
+        self.assertEqual(["n2", "n1", "n3"], [x.key for x in r.named_nodes().elems])
+        self.assertEqual([("n1", "n2"), ("n2", "n3")], [x.key for x in r.named_edges().elems])
+        self.assertAlmostEqual(50, r.node_value_percentile("n2"))
+        self.assertAlmostEqual(100, r.node_value_percentile("unknown"))
+        self.assertAlmostEqual(200 / 3, r.edge_value_percentile("n1", "n2"))
+        self.assertAlmostEqual(100, r.edge_value_percentile("n2", "n1"))
@@ -0,0 +1,47 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from json2dot.timings import Phase, Timings
+
+
+class TestTimings(TestCase):
+    def test_phase(self):
+        got: list[Phase] = []
+        t = Timings(on_phase=got.append)
+        with t.phase("alloc"):
+            x = [str(i) for i in range(10000)]
+        with t.phase("empty"):
+            pass
+        self.assertEqual(10000, len(x))
+        self.assertEqual(["alloc", "empty"], [p.name for p in t.phases])
+        self.assertEqual(t.phases, got)
+        self.assertGreater(t.phases[0].tracemalloc_peak, t.phases[1].tracemalloc_peak)
+        for p in t.phases:
+            with self.subTest(p.name):
+                self.assertGreaterEqual(p.wall, 0)
+                self.assertGreaterEqual(p.cpu, 0)
+                self.assertGreater(p.max_rss, 0)
+        self.assertEqual(
+            {"wall", "cpu", "max_rss", "tracemalloc_peak"},
+            set(json.loads(t.dumps())["alloc"].keys()),
+        )
+
+    def test_disabled(self):
+        t = Timings.disabled()
+        with t.phase("p"):
+            pass
+        self.assertEqual([], t.phases)
+
+    def test_profile(self):
+        with tempfile.TemporaryDirectory() as d:
+            out = Path(d) / "p.prof"
+            t = Timings(trace_malloc=False, profile="p", profile_out=out)
+            with t.phase("q"):
+                pass
+            self.assertFalse(out.exists())
+            with t.phase("p"):
+                sorted(range(100))
+            self.assertTrue(out.exists())
+            self.assertEqual(0, t.phases[1].tracemalloc_peak)
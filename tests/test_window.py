@@ -0,0 +1,94 @@
+import random
+from unittest import TestCase
+
+import json2dot.window as window
+from json2dot.row import Node, RowException
+from json2dot.stat import Stat
+
+
+class TestWindow(TestCase):
+    def test_timestamp(self):
+        cases = [
+            ("int", 10, 10.0),
+            ("float", 1.5, 1.5),
+            ("iso", "1970-01-01T00:01:00+00:00", 60.0),
+        ]
+        for c in cases:
+            with self.subTest(c[0]):
+                self.assertEqual(c[2], window.timestamp(c[1]))
+        for x in [True, None, "yesterday", [1]]:
+            with self.subTest(f"invalid {x}"):
+                with self.assertRaises(RowException):
+                    window.timestamp(x)
+
+    def test_window_stat(self):
+        rand = random.Random(0)
+        edges = []
+        for i in range(500):
+            t = i * 2 + rand.randint(-30, 30)  # slightly out of order
+            edges.append((f"n{rand.randint(0, 9)}", f"n{rand.randint(0, 9)}", t))
+
+        w = window.WindowStat(window=100, slot=20)
+        self.assertEqual(5, w.slots)
+        latest = None
+        kept = []
+        for s, d, t in edges:
+            slot = t // 20
+            want_kept = latest is None or slot > latest - 5
+            self.assertEqual(want_kept, w.add(s, d, t))
+            if want_kept:
+                kept.append((s, d, slot))
+            latest = slot if latest is None else max(latest, slot)
+
+            want = Stat.default()
+            for x, y, z in kept:
+                if z > latest - 5:
+                    want.add(x, y)
+            self.assertEqual(sorted(want.edges.items()), sorted(w.stat.edges.items()))
+            self.assertEqual(sorted(want.nodes.items()), sorted(w.stat.nodes.items()))
+            for n in ["n0", "n5", "n9"]:
+                self.assertEqual(want.report(n), w.stat.report(n))
+        self.assertLessEqual(len(w.buckets), 5)
+
+        with self.subTest("expire"):
+            w.expire(0)  # no effect
+            self.assertNotEqual(0, len(w.stat.edges))
+            w.expire(latest * 20 + 100)
+            self.assertEqual(0, len(w.stat.edges))
+            self.assertEqual([], list(w.stat.nodes.items()))
+            self.assertEqual({}, w.buckets)
+
+    def test_window_accumulator(self):
+        source = [
+            '{"src":{"id":"a"},"dst":{"id":"b"},"time":0}',
+            '{"src":{"id":"a"},"dst":{"id":"c"},"time":30}',
+            '{"src":{"id":"b"},"dst":{"id":"c"},"time":"1970-01-01T00:01:10+00:00"}',
+            '{"src":{"id":"c"},"dst":{"id":"c"},"time":80}',
+            '{"src":{"id":"c"},"dst":{"id":"d"},"time":130}',
+            '{"src":{"id":"a"},"dst":{"id":"b"},"time":10}',
+        ]
+        acc = window.WindowAccumulator(window=120, slot=60, time_key="time", ignore_selfloop=True).consume(source)
+        self.assertEqual({("b", "c"): 1, ("c", "d"): 1}, acc.stat.edges.edges)
+        self.assertEqual(["a", "b", "c", "d"], list(acc.nodes.map.keys()))
+        with self.assertRaises(RowException):
+            acc.consume(['{"src":{"id":"a"},"dst":{"id":"b"}}'])
+
+        with self.subTest("weight_key"):
+            acc = window.WindowAccumulator(window=120, slot=60, time_key="time", weight_key="count").consume(
+                [
+                    '{"src":{"id":"a"},"dst":{"id":"b"},"time":0,"count":3}',
+                    '{"src":{"id":"b"},"dst":{"id":"c"},"time":70,"count":5}',
+                    '{"src":{"id":"b"},"dst":{"id":"c"},"time":80}',
+                    '{"src":{"id":"c"},"dst":{"id":"d"},"time":130,"count":2}',
+                ]
+            )
+            self.assertEqual({("b", "c"): 6, ("c", "d"): 2}, acc.stat.edges.edges)
+
+        with self.subTest("invalid weight"):
+            acc = window.WindowAccumulator(
+                window=120, slot=60, time_key="time", weight_key="count", keep_source=True
+            ).consume(['{"src":{"id":"a"},"dst":{"id":"b"},"time":0}'])
+            with self.assertRaises(RowException):
+                acc.consume(['{"src":{"id":"a","n":1},"dst":{"id":"c"},"time":10,"count":-1}'])
+            self.assertEqual({"a": Node(id="a"), "b": Node(id="b")}, acc.nodes.map)
+            self.assertEqual(1, len(acc.nodes.source))
@@ -0,0 +1,100 @@
+import io
+import json
+from unittest import TestCase
+
+import graphviz
+
+from json2dot.writer import DotWriter, Sink, Streamed, write_json, write_jsonl
+
+
+class TestWriter(TestCase):
+    def test_quote(self):
+        cases = [
+            ("plain", "n1"),
+            ("number", "-4.2"),
+            ("fraction", ".42"),
+            ("space", "n 1"),
+            ("empty", ""),
+            ("keyword", "Node"),
+            ("html", "<<b>n1</b>>"),
+            ("quote", 'say "hi"'),
+            ("escaped quote", 'say \\"hi\\"'),
+            ("backslashes", "a\\\\b"),
+            ("newline", "a\nb"),
+            ("unicode", "ノード"),
+        ]
+        for name, x in cases:
+            with self.subTest(name):
+                want = graphviz.Digraph(strict=True)
+                want.node(x, label=x, tooltip=x)
+                want.edge(x, x, label=x, tooltip=x)
+                got = io.StringIO()
+                with DotWriter(got, strict=True) as w:
+                    w.node(x, label=x, tooltip=x)
+                    w.edge(x, x, label=x, tooltip=x)
+                self.assertEqual(want.source, got.getvalue())
+
+    def test_same_as_graphviz(self):
+        def draw(g: Sink) -> None:
+            g.node(name="n1", label="n1", fontsize="8.0", color="white", shape="box")
+            with g.subgraph(name="cluster_g1", graph_attr={"label": "g1", "style": "filled", "tooltip": "a\nb"}) as c:
+                c.node(name="n2", label="name=n2\ngroup=g1", tooltip="in_deg=1")
+                with c.subgraph(name="cluster_g2", graph_attr={}) as d:
+                    d.node(name="n3")
+            g.edge(tail_name="n1", head_name="n2", label="", weight="1.0", arrowsize="1.5")
+            g.edge(tail_name="n1:p1", head_name="n 3:p 2:s", label="2")
+
+        for strict in [True, False]:
+            with self.subTest(f"strict={strict}"):
+                want = graphviz.Digraph(strict=strict)
+                draw(want)
+                got = io.StringIO()
+                with DotWriter(got, strict=strict) as w:
+                    draw(w)
+                self.assertEqual(want.source, got.getvalue())
+
+    def test_exception(self):
+        got = io.StringIO()
+        with self.assertRaises(ValueError):
+            with DotWriter(got) as w:
+                w.node(name="n1")
+                with w.subgraph(name="cluster_g1", graph_attr={}) as c:
+                    c.node(name="n2")
+                    raise ValueError()
+        self.assertEqual("digraph {\n\tn1\n\tsubgraph cluster_g1 {\n\t\tn2\n", got.getvalue())
+
+    def test_write_json(self):
+        doc = Streamed(
+            [
+                ("a", Streamed(iter([("x", 1), ("y", "ノード")]))),
+                ("b", Streamed((Streamed([("k", i)]) for i in range(2)), array=True)),
+                ("c", {"z": [1, 2]}),
+                ("d", Streamed([])),
+                ("e", Streamed([], array=True)),
+            ]
+        )
+        want = {"a": {"x": 1, "y": "ノード"}, "b": [{"k": 0}, {"k": 1}], "c": {"z": [1, 2]}, "d": {}, "e": []}
+        out = io.StringIO()
+        write_json(out, doc)
+        self.assertEqual(json.dumps(want, separators=(",", ":")), out.getvalue())
+
+    def test_write_jsonl(self):
+        doc = Streamed(
+            [
+                ("a", Streamed([("x", 1), ("y", {"v": 2})])),
+                ("b", Streamed([Streamed([("k", 0)]), 3], array=True)),
+                ("c", "top"),
+            ]
+        )
+        out = io.StringIO()
+        write_jsonl(out, doc)
+        self.assertEqual(
+            [
+                {"section": "a", "key": "x", "value": 1},
+                {"section": "a", "key": "y", "value": {"v": 2}},
+                {"section": "b.0", "key": "k", "value": 0},
+                {"section": "b", "value": 3},
+                {"section": "", "key": "c", "value": "top"},
+            ],
+            [json.loads(x) for x in out.getvalue().splitlines()],
+        )